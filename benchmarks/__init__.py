@@ -0,0 +1 @@
+"""Mediciones de rendimiento del tablero sobre datos sintéticos."""
@@ -0,0 +1,305 @@
+"""Mide carga → transformación → preparación de render sobre extractos sintéticos.
+
+Uso::
+
+    python -m benchmarks.medir --tamanos 10000 100000 --guardar
+    python -m benchmarks.medir --tamanos 10000 100000 --comparar
+
+Para cada tamaño se genera (una sola vez) un extracto con
+``benchmarks.sinteticos`` y se mide cada etapa del tablero V4: la carga de los
+CSV, cada agregación y el cruce ``df_of_dem``. El tiempo es el mínimo de
+``--repeticiones`` corridas. La memoria se mide aparte, en un proceso nuevo por
+etapa que corre antes las etapas previas: ``memoria_pico_mb`` es el pico de RSS
+de la etapa sobre el RSS con que empezó (incluye lo que reservan Arrow, NumPy y
+las extensiones en C, que ``tracemalloc`` no ve) y ``arrow_mb`` lo que la etapa
+deja reservado en el pool de memoria de Arrow. En Linux el pico se reinicia
+antes de cada etapa (``/proc/self/clear_refs``); en otros sistemas se usa
+``ru_maxrss``, que solo registra la etapa si supera el pico de las anteriores.
+``--guardar`` escribe la línea base en JSON (``benchmarks/linea_base.json``,
+versionada junto al código) y ``--comparar`` falla si alguna etapa empeora más
+que la tolerancia.
+"""
+import argparse
+import gc
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pyarrow as pa
+
+from benchmarks import sinteticos
+from talento_tic import analitica, brechas, divipola, figuras, fuentes, mapa, snapshot, streaming
+from talento_tic.cubo import NIVEL, construir_cubo
+from talento_tic.indice import construir_indice
+from talento_tic.modelo import normalizar_perfiles
+
+TAMANOS = (10_000, 100_000, 1_000_000, 10_000_000)
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+DIRECTORIO_DATOS = os.path.join(DIRECTORIO, 'datos')
+RUTA_LINEA_BASE = os.path.join(DIRECTORIO, 'linea_base.json')
+
+
+def etapas(directorio):
+    """Etapas del tablero en orden; cada una recibe y amplía el estado compartido."""
+
+    def cargar_csv(estado):
+        estado['perfiles'], estado['formacion'], estado['graduados'] = fuentes.cargar_datos(directorio)
+
+    def cargar_snapshot_frio(estado):
+        for archivo in fuentes.ARCHIVOS:
+            snapshot.construir_snapshot(archivo, directorio)
+
+    def cargar_snapshot(estado):
+        snapshot.cargar_datos(directorio)
+
+    def ingerir_por_bloques(estado):
+        streaming.ingerir_perfiles(directorio)
+
+    def normalizar(estado):
+        estado['modelo'] = normalizar_perfiles(estado['perfiles'])
+        estado['cargos'] = estado['modelo'].cargos
+
+    def demanda_perfil(estado):
+        analitica.demanda_por_perfil(estado['cargos'])
+
+    def demanda_municipio_perfil(estado):
+        estado['demanda_municipio_perfil'] = analitica.demanda_por_municipio_perfil(estado['cargos'])
+
+    def top_k(estado):
+        analitica.top_k_por_municipio(estado['demanda_municipio_perfil'])
+
+    def demanda_municipio(estado):
+        estado['demanda_municipio'] = analitica.demanda_por_municipio(estado['cargos'])
+
+    def graduados(estado):
+        estado['graduados_completos'] = analitica.completar_graduados(estado['graduados'])
+
+    def variacion(estado):
+        analitica.variacion_matricula(estado['formacion'])
+
+    def of_dem(estado):
+        estado['catalogo'] = divipola.construir_catalogo(directorio)
+        analitica.oferta_demanda(estado['demanda_municipio'], estado['graduados_completos'], estado['catalogo'])
+
+    def brechas_municipio(estado):
+        brechas.brechas_por_municipio(estado['cargos'], estado['graduados_completos'], estado['catalogo'])
+
+    def brechas_programa(estado):
+        brechas.brechas_por_programa(estado['cargos'], estado['formacion'], estado['catalogo'])
+
+    def brechas_cargo(estado):
+        brechas.brechas_por_cargo(estado['cargos'], estado['formacion'], estado['catalogo'])
+
+    def cubo(estado):
+        estado['cubo'] = construir_cubo(estado['modelo'])
+
+    def demanda_filtrada(estado):
+        cubo = estado['cubo']
+        analitica.demanda_filtrada(cubo, {NIVEL: cubo.etiquetas[NIVEL][:1].tolist()})
+
+    def indice(estado):
+        estado['indice'] = construir_indice(estado['modelo'])
+
+    def buscar_competencias(estado):
+        indice = estado['indice']
+        indice.buscar(indice.frecuencias().index[:2])
+
+    def celdas_mapa(estado):
+        estado['celdas_mapa'] = mapa.precalcular_celdas(estado['graduados_completos'])
+
+    def celdas_mostrar(estado):
+        mapa.celdas_para_mostrar(estado['celdas_mapa'], mapa.HEXAGONO, 6)
+
+    def figura_top(estado):
+        estado['top'] = analitica.top_k_por_municipio(estado['demanda_municipio_perfil'])
+        estado['cache_figuras'] = figuras.CacheFiguras()
+        estado['cache_figuras'].obtener('top', lambda: figuras.figura_top_municipios(estado['top']))
+
+    def figura_top_cache(estado):
+        estado['cache_figuras'].obtener('top', lambda: figuras.figura_top_municipios(estado['top']))
+
+    return [
+        ('cargar_datos (csv)', cargar_csv),
+        ('cargar_datos (snapshot frío)', cargar_snapshot_frio),
+        ('cargar_datos (snapshot)', cargar_snapshot),
+        ('ingerir_perfiles (por bloques)', ingerir_por_bloques),
+        ('normalizar_perfiles', normalizar),
+        ('demanda_por_perfil', demanda_perfil),
+        ('demanda_por_municipio_perfil', demanda_municipio_perfil),
+        ('top_k_por_municipio', top_k),
+        ('demanda_por_municipio', demanda_municipio),
+        ('completar_graduados', graduados),
+        ('variacion_matricula', variacion),
+        ('oferta_demanda (df_of_dem)', of_dem),
+        ('brechas_por_municipio', brechas_municipio),
+        ('brechas_por_programa', brechas_programa),
+        ('brechas_por_cargo', brechas_cargo),
+        ('figura top (construir)', figura_top),
+        ('figura top (caché)', figura_top_cache),
+        ('construir_cubo', cubo),
+        ('demanda_filtrada (cubo)', demanda_filtrada),
+        ('construir_indice', indice),
+        ('buscar competencias (índice)', buscar_competencias),
+        ('precalcular_celdas (mapa)', celdas_mapa),
+        ('celdas_para_mostrar (mapa)', celdas_mostrar),
+    ]
+
+
+def _rss():
+    """RSS actual del proceso en bytes (``None`` si no hay ``/proc``)."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except OSError:
+        return None
+
+
+def _reiniciar_pico():
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def _pico_rss():
+    """Pico de RSS en bytes: ``VmHWM`` si está disponible, si no ``ru_maxrss``."""
+    try:
+        with open('/proc/self/status') as f:
+            for linea in f:
+                if linea.startswith('VmHWM:'):
+                    return int(linea.split()[1]) * 1024
+    except OSError:
+        pass
+    maximo = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss viene en KiB en Linux y en bytes en macOS
+    return maximo if sys.platform == 'darwin' else maximo * 1024
+
+
+def _memoria_etapa(directorio, numero):
+    """Corre las etapas hasta ``numero`` y mide la memoria de la última.
+
+    Se ejecuta en un proceso nuevo para que ni las etapas previas de otras
+    mediciones ni la memoria que el intérprete no devuelve al sistema se sumen.
+    """
+    estado = {}
+    lista = etapas(directorio)
+    for _, etapa in lista[:numero]:
+        etapa(estado)
+    gc.collect()
+    antes = _rss() if _reiniciar_pico() else _pico_rss()
+    arrow_antes = pa.total_allocated_bytes()
+    lista[numero][1](estado)
+    return {
+        'memoria_pico_mb': max(_pico_rss() - antes, 0) / 2**20,
+        'arrow_mb': (pa.total_allocated_bytes() - arrow_antes) / 2**20,
+    }
+
+
+def medir_memoria(directorio):
+    """``{etapa: {'memoria_pico_mb', 'arrow_mb'}}``, cada etapa en su propio proceso."""
+    contexto = multiprocessing.get_context('spawn')
+    memoria = {}
+    for numero, (nombre, _) in enumerate(etapas(directorio)):
+        with ProcessPoolExecutor(max_workers=1, mp_context=contexto) as pool:
+            memoria[nombre] = pool.submit(_memoria_etapa, directorio, numero).result()
+    return memoria
+
+
+def medir_tamano(filas, repeticiones):
+    directorio = os.path.join(DIRECTORIO_DATOS, str(filas))
+    if not os.path.exists(fuentes.ruta(fuentes.ARCHIVO_PERFILES, directorio)):
+        sinteticos.generar(directorio, filas)
+
+    resultados = {}
+    for nombre, _ in etapas(directorio):
+        resultados[nombre] = {'segundos': float('inf')}
+    for _ in range(repeticiones):
+        estado = {}
+        for nombre, etapa in etapas(directorio):
+            inicio = time.perf_counter()
+            etapa(estado)
+            resultados[nombre]['segundos'] = min(resultados[nombre]['segundos'], time.perf_counter() - inicio)
+
+    for nombre, memoria in medir_memoria(directorio).items():
+        resultados[nombre].update(memoria)
+    return resultados
+
+
+def imprimir(filas, resultados, linea_base=None):
+    print(f'\n== {filas:,} filas de perfiles')
+    print(f'{"etapa":<32} {"segundos":>10} {"pico MB":>10} {"Arrow MB":>10} {"vs base":>9}')
+    for nombre, r in resultados.items():
+        cambio = ''
+        base = (linea_base or {}).get(str(filas), {}).get(nombre)
+        if base and base['segundos'] > 0:
+            cambio = f'{r["segundos"] / base["segundos"] - 1:+.0%}'
+        print(f'{nombre:<32} {r["segundos"]:>10.4f} {r["memoria_pico_mb"]:>10.1f} {r["arrow_mb"]:>10.1f} {cambio:>9}')
+
+
+def regresiones(resultados, linea_base, tolerancia, minimo_segundos=0.005):
+    """Etapas que empeoraron más que ``tolerancia`` frente a la línea base.
+
+    Además del cambio relativo se exige que el tiempo crezca al menos
+    ``minimo_segundos``: en las etapas de pocos milisegundos el ruido es mayor
+    que cualquier cambio real.
+    """
+    encontradas = []
+    for filas, etapas_tamano in resultados.items():
+        for nombre, r in etapas_tamano.items():
+            base = linea_base.get(filas, {}).get(nombre)
+            if not base:
+                continue
+            if r['segundos'] - base['segundos'] > max(base['segundos'] * tolerancia, minimo_segundos):
+                encontradas.append((filas, nombre, 'segundos', base['segundos'], r['segundos']))
+            if r['memoria_pico_mb'] > base['memoria_pico_mb'] * (1 + tolerancia) + 1:
+                encontradas.append((filas, nombre, 'memoria_pico_mb', base['memoria_pico_mb'], r['memoria_pico_mb']))
+    return encontradas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tamanos', type=int, nargs='+', default=list(TAMANOS))
+    parser.add_argument('--repeticiones', type=int, default=3)
+    parser.add_argument('--guardar', action='store_true', help='guardar los resultados como línea base')
+    parser.add_argument('--comparar', action='store_true', help='fallar si hay regresiones frente a la línea base')
+    parser.add_argument('--tolerancia', type=float, default=0.25)
+    parser.add_argument('--linea-base', default=RUTA_LINEA_BASE)
+    args = parser.parse_args()
+
+    linea_base = {}
+    if os.path.exists(args.linea_base):
+        with open(args.linea_base, encoding='utf-8') as f:
+            linea_base = json.load(f)['resultados']
+
+    resultados = {}
+    for filas in args.tamanos:
+        resultados[str(filas)] = medir_tamano(filas, args.repeticiones)
+        imprimir(filas, resultados[str(filas)], linea_base)
+
+    if args.guardar:
+        with open(args.linea_base, 'w', encoding='utf-8') as f:
+            json.dump({
+                'python': platform.python_version(),
+                'maquina': platform.platform(),
+                'resultados': resultados,
+            }, f, indent=2)
+        print(f'\nLínea base guardada en {args.linea_base}')
+
+    if args.comparar:
+        encontradas = regresiones(resultados, linea_base, args.tolerancia)
+        for filas, nombre, medida, antes, ahora in encontradas:
+            print(f'REGRESIÓN {filas} filas · {nombre} · {medida}: {antes:.4f} → {ahora:.4f}')
+        if encontradas:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+"""Generador de extractos sintéticos con el esquema de los CSV reales.
+
+Las distribuciones se toman de los archivos del proyecto: atributos de cargo,
+número de competencias por cargo, frecuencia de cada competencia y filas de
+formación. Los municipios reales se conservan y se completan con municipios
+sintéticos (distribución de Zipf) hasta llegar a ~1.100 en los extractos más
+grandes.
+
+* perfiles: ``filas`` filas (una por cargo y competencia).
+* formación: ``filas // 15`` filas.
+* graduados: una fila por municipio, porque el cruce oferta-demanda exige que
+  ``MUNICIPIO`` sea único.
+* ``divipola.csv``: códigos 9xxxx para los municipios sintéticos, de modo que
+  los cruces por código DIVIPOLA cubran todos los municipios.
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from talento_tic import divipola, fuentes
+from talento_tic.analitica import FILA_BARRANQUILLA
+from talento_tic.modelo import normalizar_perfiles
+
+MAX_MUNICIPIOS = 1100
+FILAS_POR_BLOQUE = 1_000_000
+
+# Recuadro aproximado del territorio colombiano
+LATITUD = (-4.2, 12.5)
+LONGITUD = (-79.0, -67.0)
+
+
+def _municipios(filas, reales):
+    n = int(min(MAX_MUNICIPIOS, max(len(reales), filas // 1000)))
+    sinteticos = [f'MUNICIPIO {i:04d}' for i in range(len(reales), n)]
+    return list(reales) + sinteticos
+
+
+def _pesos_municipios(municipios, frecuencia_real):
+    pesos = np.array([frecuencia_real.get(m, 0.0) for m in municipios])
+    if len(municipios) > len(frecuencia_real):
+        # La cola sintética sigue una ley de Zipf y se lleva un tercio de la demanda
+        cola = 1.0 / np.arange(1, len(municipios) - len(frecuencia_real) + 1)
+        pesos[len(frecuencia_real):] = cola / cola.sum() * 0.5 * pesos.sum()
+    return pesos / pesos.sum()
+
+
+def generar(directorio, filas, semilla=0):
+    """Escribe los tres CSV sintéticos en ``directorio`` (se crea si no existe)."""
+    rng = np.random.default_rng(semilla)
+    os.makedirs(directorio, exist_ok=True)
+    df_perfiles, df_formacion, df_graduados = fuentes.cargar_datos()
+    modelo = normalizar_perfiles(df_perfiles)
+    cargos = modelo.cargos
+    competencias = modelo.cargo_competencia[['Competencias', 'Tipo_de_Competencia']].astype(str)
+    frecuencia_competencias = competencias.value_counts(normalize=True)
+    n_competencias = cargos['n_competencias'].to_numpy()
+
+    frecuencia_municipios = df_perfiles.drop_duplicates('ID_CARGO')['Municipio'].astype(str).value_counts(normalize=True)
+    municipios = _municipios(filas, frecuencia_municipios.index)
+    pesos_municipios = _pesos_municipios(municipios, frecuencia_municipios.to_dict())
+
+    atributos = cargos.drop(columns=['ID_CARGO', 'n_competencias', 'Municipio']).astype(str)
+    ruta_perfiles = fuentes.ruta(fuentes.ARCHIVO_PERFILES, directorio)
+    escritas, siguiente_id, primera = 0, 1, True
+    while escritas < filas:
+        bloque = min(FILAS_POR_BLOQUE, filas - escritas)
+        n_cargos = max(1, int(bloque / n_competencias.mean()))
+        por_cargo = rng.choice(n_competencias, n_cargos)
+        # Se ajusta el último cargo para no pasarse de las filas pedidas
+        acumulado = np.cumsum(por_cargo)
+        n_cargos = int(np.searchsorted(acumulado, bloque)) + 1
+        por_cargo = por_cargo[:n_cargos]
+        por_cargo[-1] -= max(0, int(por_cargo.sum()) - bloque)
+
+        plantilla = atributos.iloc[rng.integers(0, len(atributos), n_cargos)].reset_index(drop=True)
+        plantilla.insert(0, 'ID_CARGO', np.arange(siguiente_id, siguiente_id + n_cargos))
+        plantilla['Municipio'] = rng.choice(municipios, n_cargos, p=pesos_municipios)
+        df = plantilla.loc[plantilla.index.repeat(por_cargo)].reset_index(drop=True)
+        elegidas = rng.choice(len(frecuencia_competencias), len(df), p=frecuencia_competencias.to_numpy())
+        pares = frecuencia_competencias.index[elegidas]
+        df['Competencias'] = pares.get_level_values(0)
+        df['Tipo_de_Competencia'] = pares.get_level_values(1)
+        df = df[list(df_perfiles.columns)]
+        df.to_csv(ruta_perfiles, mode='w' if primera else 'a', header=primera, index=False)
+        escritas += len(df)
+        siguiente_id += n_cargos
+        primera = False
+
+    n_formacion = max(len(df_formacion), filas // 15)
+    formacion = df_formacion.iloc[rng.integers(0, len(df_formacion), n_formacion)].reset_index(drop=True)
+    formacion['MUNICIPIO'] = rng.choice(municipios, n_formacion, p=pesos_municipios)
+    formacion['TOTAL_MATRICULADOS_2017'] = rng.permutation(formacion['TOTAL_MATRICULADOS_2017'].to_numpy())
+    formacion['TOTAL_MATRICULADOS_2018'] = rng.permutation(formacion['TOTAL_MATRICULADOS_2018'].to_numpy())
+    formacion['VARIACION_PORCENTUAL_2018_2017'] = (
+        formacion['TOTAL_MATRICULADOS_2018'] / formacion['TOTAL_MATRICULADOS_2017'].where(formacion['TOTAL_MATRICULADOS_2017'] > 0) - 1
+    ).fillna(0)
+    formacion.to_csv(fuentes.ruta(fuentes.ARCHIVO_FORMACION, directorio), index=False)
+
+    # Barranquilla se excluye porque el tablero la agrega a mano a los graduados
+    con_graduados = [m for m in municipios if m != FILA_BARRANQUILLA[1]]
+    reales = df_graduados.set_index('MUNICIPIO')
+    graduados = pd.DataFrame({'MUNICIPIO': con_graduados})
+    graduados['Latitud'] = graduados['MUNICIPIO'].map(reales['Latitud']).fillna(pd.Series(rng.uniform(*LATITUD, len(graduados))))
+    graduados['Longitud'] = graduados['MUNICIPIO'].map(reales['Longitud']).fillna(pd.Series(rng.uniform(*LONGITUD, len(graduados))))
+    graduados['graduados_2023'] = graduados['MUNICIPIO'].map(reales['graduados_2023']).fillna(
+        pd.Series(rng.choice(reales['graduados_2023'].to_numpy(), len(graduados)))
+    ).astype(int)
+    graduados.insert(0, 'Unnamed: 0', np.arange(len(graduados)))
+    graduados.rename(columns={'Unnamed: 0': ''}).to_csv(fuentes.ruta(fuentes.ARCHIVO_GRADUADOS, directorio), index=False)
+
+    sinteticos = [m for m in municipios if m not in divipola.MUNICIPIOS.values()]
+    pd.DataFrame({'codigo': 90000 + np.arange(len(sinteticos)), 'municipio': sinteticos}).to_csv(
+        fuentes.ruta(divipola.ARCHIVO_DIVIPOLA, directorio), index=False
+    )
+    return directorio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('directorio')
+    parser.add_argument('--filas', type=int, default=100_000)
+    parser.add_argument('--semilla', type=int, default=0)
+    args = parser.parse_args()
+    generar(args.directorio, args.filas, args.semilla)
+
+
+if __name__ == '__main__':
+    main()
@@ -8,18 +8,31 @@
 
 
 # Paso Importar las bibliotecas necesarias
+import hmac
+import os
+
 import pandas as pd
 import streamlit as st
 import pydeck as pdk
-import plotly.express as px
 import matplotlib.pyplot as plt
 
+from talento_tic import (calidad, cargos_con_competencias, compartido, demanda_filtrada, figuras,
+                         filtrar_top_municipios, filtros_demanda, incremental, instrumentacion, mapa,
+                         matricula, registro, series, snapshot)
+from talento_tic.analitica import OPCION_TODOS
+from talento_tic.cubo import NIVEL, TIPO
+from talento_tic.ranking import K_MAX
+
 #Configuración página
 st.set_page_config(
     layout="wide",
     initial_sidebar_state="expanded"
 )
 
+# Cada rerun queda registrado como una traza con el tiempo de cada paso
+# (talento_tic.instrumentacion); se consulta en el panel de rendimiento.
+instrumentacion.iniciar_traza()
+
 # Configuración de encabezado
 st.title("Análisis del Talento Humano en Ciencia, Tecnología e Innovación en Colombia")
 st.markdown("""
@@ -30,67 +43,147 @@ Los datos fueron tomados del portal web datos abiertos (Cargos TIC referenciados
 """)
 
 # Cargar las bases de datos desde los enlaces proporcionados
-
+# Los CSV se convierten una vez a snapshots Arrow que se abren con memoria mapeada.
+# Cada fuente se versiona por su contenido (talento_tic.registro) y cada tabla,
+# figura e índice se guarda con la versión de las fuentes de las que depende:
+# si solo cambia graduados se recalculan el mapa y las brechas, y lo que sale
+# únicamente de perfiles sigue en caché.
+
+# Si el extracto de perfiles no cabe en memoria (o se pide el modo incremental)
+# perfiles se ingiere por bloques y en lugar del DataFrame crudo se obtiene el
+# modelo con la tabla de cargos. Cuando se agregan filas a perfiles o graduados
+# solo se leen las nuevas y se pliegan en los acumulados guardados.
+modo_incremental = incremental.usar_incremental()
+modo = 'incremental' if modo_incremental else 'completo'
+
+# Los agregados se guardan con st.cache_resource: todas las sesiones del
+# proceso reciben el mismo objeto (de solo lectura) en lugar de una copia, y se
+# mapean desde el almacén compartido por todos los workers del equipo. Solo se
+# cargan las fuentes de los grupos de agregados que falte calcular.
+
+@st.cache_resource(max_entries=1)
+def cargar_agregados(versiones, modo):
+
+    instrumentacion.fallo_cache('cargar_agregados')
+    cargar_archivos = incremental.cargar_archivos if modo == 'incremental' else snapshot.cargar_archivos
+    return compartido.obtener_agregados_compartidos(dict(versiones), cargar_archivos, modo)
+
+with instrumentacion.tramo('versiones_fuentes', 'carga'):
+    versiones = registro.versiones()
+with instrumentacion.tramo('cargar_agregados', 'carga', cache='cargar_agregados'):
+    agregados = cargar_agregados(tuple(versiones.items()), modo)
+
+# Las series anuales se actualizan una vez por cambio en sus CSV, no en cada rerun
+@st.cache_resource(max_entries=1)
+def actualizar_series(firma):
+
+    instrumentacion.fallo_cache('actualizar_series')
+    return series.actualizar_series()
+
+with instrumentacion.tramo('actualizar_series', 'carga', cache='actualizar_series'):
+    actualizar_series(series.firma_fuentes())
+
+# Versión de cada grupo de agregados: es la llave de las figuras de Plotly
+# (talento_tic.figuras) y de los cachés de las vistas que dependen de ese grupo
+version_grupo = compartido.versiones_grupos(versiones, modo)
+
+# Calidad de datos (nulos, duplicados y cambios de esquema). Se calcula una sola
+# vez al ingerir cada fuente; aquí solo se lee el reporte guardado.
 @st.cache_data
-def cargar_datos():
-    
-    df_perfiles = pd.read_csv('perfiles_referenciados.csv')
-    df_formacion = pd.read_csv('formacion_2017_1018.csv')
-    df_graduados_tic = pd.read_csv('graduados_tic_2023.csv')
-    return df_perfiles, df_formacion, df_graduados_tic
-
-df_perfiles, df_formacion, df_graduados_tic= cargar_datos()
-
-# Visualización de datos nulos o erroneos
-df_perfiles.head()
-df_perfiles.info()
-nulos_perfiles = df_perfiles.isnull().sum()
-duplicados_perfiles = df_perfiles.duplicated().sum()
-print('los valores nulos son:'+ str(nulos_perfiles))
-print('los valores duplicados son:'+ str(duplicados_perfiles))
-
-df_formacion.head()
-df_formacion.info()
-nulos_formacion = df_formacion.isnull().sum()
-duplicados_formacion = df_formacion.duplicated().sum()
-print('los valores nulos son:'+ str(nulos_formacion))
-print('los valores duplicados son:'+ str(duplicados_formacion))
-
-df_graduados_tic.head()
-df_graduados_tic.info()
-
-# Definición de elemntos navegacionales
-tab1,tab2, tab3,tab5, tab4, tab6 = st.tabs(['Demanda TIC 2023', 'Top 5 demanda por municipio 2023', 'Demanda Total por municipio','Matricula programas TIC 2017-18', 'Mapa talento humano graduado 2023','Comparación oferta demanda TIC' ])
-
-# Transformaciones
+def cargar_calidad(versiones):
+
+    # No se vuelve a ingerir nada: los reportes los deja en disco el proceso que
+    # calculó los agregados publicados, y ``vigente`` marca los desactualizados.
+    instrumentacion.fallo_cache('cargar_calidad')
+    return calidad.leer_reportes()
+
+if st.sidebar.toggle('Ver calidad de datos', value=False):
+     with st.sidebar:
+          st.header('Calidad de datos')
+          with instrumentacion.tramo('cargar_calidad', 'carga', cache='cargar_calidad'):
+               reportes = cargar_calidad(tuple(versiones.items()))
+          if not reportes:
+               st.info('Aún no hay reportes de calidad para las fuentes actuales.')
+          for archivo, reporte in reportes.items():
+               with st.expander(archivo, expanded=True):
+                    if not reporte['vigente']:
+                         st.warning('El reporte corresponde a una versión anterior del archivo.')
+                    aproximado = '≈ ' if reporte['duplicados_aproximados'] else ''
+                    col1, col2 = st.columns(2)
+                    col1.metric('Filas', f"{reporte['filas']:,}")
+                    col2.metric('Duplicados', f"{aproximado}{reporte['duplicados']:,}")
+                    esquema = reporte['esquema']
+                    if esquema['faltantes']:
+                         st.error('Columnas faltantes: ' + ', '.join(esquema['faltantes']))
+                    if esquema['adicionales']:
+                         st.info('Columnas nuevas: ' + ', '.join(esquema['adicionales']))
+                    for columna, tipos in esquema['tipo_distinto'].items():
+                         st.warning(f"{columna}: se esperaba {tipos['esperado']} y llegó {tipos['encontrado']}")
+                    st.dataframe(pd.Series(reporte['nulos'], name='Nulos').rename_axis('Columna').reset_index(),
+                                 hide_index=True)
+
+# Filtros de demanda por nivel educativo y tipo de competencia. Se responden
+# desde el cubo precalculado (talento_tic.cubo), sin recorrer los cargos.
+cubo = agregados.cubo
+with st.sidebar:
+     st.header('Filtros de demanda')
+     niveles = cubo.etiquetas[NIVEL].tolist()
+     niveles_seleccionados = st.multiselect('Nivel educativo', niveles + [OPCION_TODOS], default=OPCION_TODOS)
+     tipo_seleccionado = OPCION_TODOS
+     # Con la ingesta por bloques el cubo no tiene el tipo de competencia
+     if cubo.tiene_tipo:
+          tipo_seleccionado = st.radio('Tipo de competencia', [OPCION_TODOS] + cubo.etiquetas[TIPO].tolist(), horizontal=True)
+filtros = filtros_demanda(niveles_seleccionados or [OPCION_TODOS], tipo_seleccionado)
+estado_filtros = figuras.estado_filtros(filtros)
+
+# Por encima de estos puntos el mapa arranca agregado en celdas
+UMBRAL_PUNTOS_MAPA = 2000
+
+# Navegación: por defecto solo se ejecuta la vista elegida, así el costo de un
+# rerun es el de la vista visible. Con TALENTO_TIC_NAVEGACION=pestanas se usan
+# pestañas (st.tabs), que ejecutan todas las vistas en cada rerun.
+navegacion_pestanas = os.environ.get('TALENTO_TIC_NAVEGACION') == 'pestanas'
+
+# Transformaciones (precalculadas en talento_tic.agregados). Las que dependen de
+# los filtros se calculan solo cuando una vista las pide y se guardan por
+# versión de su grupo de datos y estado de los filtros.
+@st.cache_resource(max_entries=32)
+def calcular_demanda_filtrada(version, estado_filtros, _cubo):
+
+    instrumentacion.fallo_cache('demanda_filtrada')
+    return demanda_filtrada(_cubo, {dimension: list(valores) for dimension, valores in estado_filtros})
+
+def datos_demanda():
+     """(demanda por perfil, top de perfiles por municipio, demanda por municipio) con los filtros actuales."""
+     if filtros:
+          with instrumentacion.tramo('demanda_filtrada', 'transformacion', cache='demanda_filtrada'):
+               return calcular_demanda_filtrada(version_grupo['perfiles'], estado_filtros, cubo)
+     return agregados.demanda_perfiles, agregados.top_perfiles_municipio, agregados.demanda_municipio
+
+@st.cache_resource(max_entries=16)
+def calcular_celdas_mapa(version, forma, zoom, _df_celdas):
+
+    instrumentacion.fallo_cache('celdas_mapa')
+    return mapa.celdas_para_mostrar(_df_celdas, forma, zoom)
 
-# Eliminar columnas innecesarias
-df_perfiles = df_perfiles.drop(['Ocupación_CIUO','Ocupación_CNO'], axis= 1)
-
-#df demanda de perfiles tic
-df_demanda_perfiles = df_perfiles.groupby('Cargo_identificado').count()['ID_CARGO'].reset_index()
-df_demanda_perfiles = df_demanda_perfiles.sort_values(by='ID_CARGO',ascending= False)
-
-print(df_demanda_perfiles.info())
-
-
-#df_talento humano en áreas TIC graduados en 2023
-df_graduados_tic.loc[len(df_graduados_tic)] = [7,'BARRANQUILLA',10.96854, -74.78132,1016]
-df_th_tic= df_graduados_tic.groupby('MUNICIPIO').sum()['graduados_2023']
-
-#df_variación porcentual (2017-2018) de matriculados en programas de formación en TIC
-df_deficit_formacion = df_formacion.groupby('Cargo u oficio por entrevistados')['VARIACION_PORCENTUAL_2018_2017'].mean().reset_index()
-df_deficit_formacion['VARIACION_PORCENTUAL_2018_2017']=round(df_deficit_formacion['VARIACION_PORCENTUAL_2018_2017']*100,ndigits=1)
 #Visualizaciones Streamlit 
 
-with tab1:
-     df_demanda_perfiles=df_demanda_perfiles.rename(columns={"ID_CARGO":"Total demandados"})
+def vista_demanda_perfiles():
+     df_demanda_perfiles = datos_demanda()[0]
      st.header('Demanda por perfiles TIC en 2023')
      with st.container(border=True):
          st.markdown('Perfiles demandados en aréas TIC según empresas encuestadas')
          st.bar_chart(df_demanda_perfiles,x='Cargo_identificado', y='Total demandados')
      
      
+     panel_tabla_perfiles(df_demanda_perfiles)
+
+# Los paneles con controles son fragmentos (st.fragment): al cambiar un control
+# solo se vuelve a ejecutar su panel, no todo el script con la carga de datos.
+# Un fragmento que se ejecuta solo registra su propia traza.
+@st.fragment
+@instrumentacion.trazado('panel_tabla_perfiles', 'panel')
+def panel_tabla_perfiles(df_demanda_perfiles):
      ver_df_demanda_perfiles = st.toggle('Ver perfiles por orden de demanda', value=True)
      
      if ver_df_demanda_perfiles:
@@ -98,92 +191,98 @@ with tab1:
 
    
 
-with tab2:
-     # Agrupar por municipio y contar el número de cargos demandados por cada perfil
-     df_demanda_perfiles_municipio = df_perfiles.groupby(['Municipio', 'Cargo_identificado']).count()['ID_CARGO'].reset_index()
-
-     # Para cada municipio, ordenar por demanda y quedarnos con el top 5
-     df_top5_perfiles_municipio = df_demanda_perfiles_municipio.groupby('Municipio').apply(lambda x: x.nlargest(5, 'ID_CARGO')).reset_index(drop=True)
-
-     # Visualización en Streamlit del top 5 de perfiles más demandados por municipio con filtro múltiple
+def vista_top_municipios():
+     df_top_perfiles_municipio = datos_demanda()[1]
+     # Visualización en Streamlit del top K de perfiles más demandados por municipio con filtro múltiple
      st.header('Perfiles TIC más demandados por municipio en Colombia')
+     panel_top_municipios(df_top_perfiles_municipio, estado_filtros)
+
+@st.fragment
+@instrumentacion.trazado('panel_top_municipios', 'panel')
+def panel_top_municipios(df_top_perfiles_municipio, estado_filtros):
      with st.container(border=True):
-          st.markdown('Top 5 de los perfiles TIC mas demandados por municipio.')
+          # El top se precalcula para K_MAX; cambiar K solo recorta la tabla
+          k = st.slider('Cantidad de perfiles por municipio', min_value=1, max_value=K_MAX, value=5)
+          st.markdown(f'Top {k} de los perfiles TIC mas demandados por municipio.')
       
 
      # Crear un filtro para seleccionar uno o varios municipios
-          municipios = df_top5_perfiles_municipio['Municipio'].unique().tolist()
-          municipios.append('Todos')  # Agregar la opción "Todos"
-          municipios_seleccionados = st.multiselect('Selecciona Municipios', municipios, default='Todos')
-
-          # Filtrar los datos según los municipios seleccionados
-          if 'Todos' in municipios_seleccionados:
-               df_municipios_filtrado = df_top5_perfiles_municipio  # Si se selecciona "Todos", no filtrar
-          else:
-               df_municipios_filtrado = df_top5_perfiles_municipio[df_top5_perfiles_municipio['Municipio'].isin(municipios_seleccionados)]
-
-          # Visualización del top 5 de perfiles más demandados en los municipios seleccionados
-          fig = px.bar(df_municipios_filtrado, 
-                    x='Municipio', 
-                    y='ID_CARGO', 
-                    color='Cargo_identificado', 
-                    labels={'Cargo_identificado': 'Perfil', 'ID_CARGO': 'Cantidad Demandada'},
-                    barmode='group')
+          municipios = df_top_perfiles_municipio['Municipio'].unique().tolist()
+          municipios.append(OPCION_TODOS)  # Agregar la opción "Todos"
+          municipios_seleccionados = st.multiselect('Selecciona Municipios', municipios, default=OPCION_TODOS)
+
+          # Filtrar los datos según K y los municipios seleccionados y visualizar el top K
+          # de perfiles más demandados; con la misma combinación de filtros se reutiliza la figura
+          fig = figuras.figura(version_grupo['perfiles'], 'top_municipios', (k, tuple(sorted(municipios_seleccionados)), estado_filtros),
+                               lambda: figuras.figura_top_municipios(
+                                    filtrar_top_municipios(df_top_perfiles_municipio, k, municipios_seleccionados)))
 
           st.plotly_chart(fig)
 
-with tab4:
+def vista_mapa():
+     df_graduados_tic = agregados.graduados_tic
      # mapa de TH formado en 2023   
      with st.container(border=True):
           st.header('Mapa talento humano TIC')
           st.markdown('Distribución por algunos municipios de Colombia de talento humano graduado en areas TIC en el año 2023.')
-          st.plotly_chart(
-        px.scatter_mapbox(df_graduados_tic, lat = 'Latitud', lon = 'Longitud', size = 'graduados_2023',
-                color = 'graduados_2023',
-                color_continuous_scale = 'blackbody',
-                zoom = 4.5,
-                size_max=35,
-                hover_data='graduados_2023',
-                hover_name='MUNICIPIO',
-                opacity=0.60,
-                mapbox_style = 'open-street-map',
-                height=600
-                )      
-        )
-          
-with tab3:
+          panel_mapa(df_graduados_tic)
+
+@st.fragment
+@instrumentacion.trazado('panel_mapa', 'panel')
+def panel_mapa(df_graduados_tic):
+     # Con muchos puntos el mapa se agrega en celdas en el servidor (talento_tic.mapa)
+     # y al navegador solo llegan las celdas del nivel de detalle elegido
+     modos_mapa = ['Puntos', 'Hexágonos', 'Cuadrícula']
+     modo_mapa = st.radio('Modo de mapa', modos_mapa, horizontal=True,
+                          index=0 if len(df_graduados_tic) <= UMBRAL_PUNTOS_MAPA else 1)
+     if modo_mapa == 'Puntos':
+          st.plotly_chart(figuras.figura(version_grupo['graduados'], 'mapa', (), lambda: figuras.figura_mapa(df_graduados_tic)))
+     else:
+          zoom = st.select_slider('Nivel de detalle (zoom)', options=list(mapa.NIVELES_ZOOM), value=5)
+          forma = mapa.HEXAGONO if modo_mapa == 'Hexágonos' else mapa.CUADRICULA
+          with instrumentacion.tramo('celdas_mapa', 'transformacion', cache='celdas_mapa'):
+               df_celdas = calcular_celdas_mapa(version_grupo['graduados'], forma, zoom, agregados.celdas_mapa)
+          st.pydeck_chart(pdk.Deck(
+               layers=[pdk.Layer('PolygonLayer', df_celdas[['poligono', 'color', 'graduados_2023', 'puntos']],
+                                 get_polygon='poligono', get_fill_color='color', get_line_color=[80, 80, 80],
+                                 line_width_min_pixels=1, pickable=True)],
+               initial_view_state=pdk.ViewState(latitude=4.6, longitude=-74.1, zoom=zoom),
+               tooltip={'text': '{graduados_2023} graduados en {puntos} municipios'},
+               map_style=None,
+          ), height=600)
+     
+def vista_demanda_municipio():
+     df_demanda_municipio = datos_demanda()[2]
      #comparación oferta vs demanda
-     df_demanda_municipio=df_perfiles.groupby('Municipio').count()['ID_CARGO'].reset_index()
-     df_demanda_municipio = df_demanda_municipio.rename(columns={'ID_CARGO':'Cargos_demandados','Municipio':'MUNICIPIO'})
-
      st.header('Demanda de Cargos TIC por municipio')
      #df=df_demanda_municipio.set_index('Municipio', inplace=True)
      with st.container(border=True):
            st.markdown('Total de cargos TIC referenciados por municipio')
-           st.plotly_chart(px.pie(df_demanda_municipio,
-                                  values='Cargos_demandados',
-                                  names = 'MUNICIPIO',
-                                  color = 'MUNICIPIO',
-                                  width=8000,
-                                  height=550,
-                                  hole = 0.5
-                                  )
-                         )
-df_of_dem = df_demanda_municipio.join(df_graduados_tic.set_index('MUNICIPIO'), on='MUNICIPIO', validate='m:1')
-df_of_dem = df_of_dem.drop(['Unnamed: 0','Latitud','Longitud'],axis=1)
+           st.plotly_chart(figuras.figura(version_grupo['perfiles'], 'demanda_municipio', estado_filtros,
+                                          lambda: figuras.figura_demanda_municipio(df_demanda_municipio)))
      
          
          
      
 #Formación Talento humano TIC
-with tab5:
+def vista_matricula():
+     df_deficit_formacion = agregados.deficit_formacion
      st.title('Comparación estudiantes matriculados entre los años 2017 y 2018')
      with st.container(border=True):
                st.header('Variación total matriculados en programas TIC 2017-2018')
-               formacion = round(df_deficit_formacion['VARIACION_PORCENTUAL_2018_2017'].mean(), 2)
+               formacion = agregados.variacion_formacion
                col1, col2 =st.columns(2)
                col1.metric("Variación total de estudiantes matriculados en programas TIC 2017-2018 ", f"{formacion:.2f}%")
+               # Totales sobre programas distintos (talento_tic.matricula): cada programa cuenta una vez
+               df_total = matricula.totales(agregados.matricula)
+               col2.metric('Matriculados 2018', f"{int(df_total['TOTAL_MATRICULADOS_2018'].iloc[0]):,}",
+                           f"{int(df_total['TOTAL_MATRICULADOS_2018'].iloc[0] - df_total['TOTAL_MATRICULADOS_2017'].iloc[0]):,}")
+               panel_variacion_matricula(agregados.matricula)
      
+     with st.container(border=True):
+          st.header('Tendencia anual de matriculados y graduados TIC')
+          panel_tendencias()
+
      with st. container(border=True):
           st.header('Variación porcentual por programas TIC de estudiantes matriculados en los años 2017 y 2018')
           st.bar_chart(df_deficit_formacion,
@@ -194,10 +293,43 @@ with tab5:
                     x_label='Variación % 2017-2018',
                     y_label='Cargo TIC'
                     )
+
+@st.fragment
+@instrumentacion.trazado('panel_variacion_matricula', 'panel')
+def panel_variacion_matricula(df_matricula):
+     dimensiones = {'Nivel': matricula.NIVEL, 'Municipio': matricula.MUNICIPIO, 'Programa': matricula.PROGRAMA}
+     dimension = st.radio('Variación por', list(dimensiones), horizontal=True)
+     df_variacion = matricula.variacion(df_matricula, dimensiones[dimension], 2017, 2018)
+     df_variacion['VARIACION_PORCENTUAL_2018_2017'] = (df_variacion['VARIACION_PORCENTUAL_2018_2017'] * 100).round(1)
+     st.dataframe(df_variacion, hide_index=True)
+
+# Series anuales de SNIES (talento_tic.series): los CSV de años nuevos se
+# incorporan al ingerir los datos y las tendencias se leen ya calculadas.
+@st.fragment
+@instrumentacion.trazado('panel_tendencias', 'panel')
+def panel_tendencias():
+     medidas = {'Matriculados': series.MATRICULA, 'Graduados': series.GRADUADOS}
+     col1, col2 = st.columns(2)
+     medida = medidas[col1.radio('Medida', list(medidas), horizontal=True)]
+     dimensiones = {'Cargo': matricula.CARGO, 'Municipio': matricula.MUNICIPIO}
+     dimensiones = {nombre: d for nombre, d in dimensiones.items() if d in series.TENDENCIAS[medida]}
+     dimension = dimensiones[col2.radio('Por', list(dimensiones), horizontal=True)]
+     df_tendencia = series.leer_tendencia(medida, dimension)
+     if df_tendencia is None:
+          st.info('No hay series anuales para esta medida.')
+          return
+     anios = df_tendencia['ANIO'].unique()
+     st.markdown(f'Años disponibles: {", ".join(map(str, anios))}')
+     grupos = st.multiselect('Seleccionar', df_tendencia[dimension].unique().tolist())
+     if grupos:
+          df_tendencia = df_tendencia[df_tendencia[dimension].isin(grupos)]
+     st.line_chart(df_tendencia, x='ANIO', y='TOTAL', color=dimension)
+     st.dataframe(df_tendencia, hide_index=True)
           
                
 
-with tab6:
+def vista_oferta_demanda():
+     df_of_dem = agregados.of_dem
      st.header('Comparación por municipios entre talento humano recién graduado y demanda de cargos TIC en Colombia para el año 2023')
      with st.container(border=True):
           st.line_chart(df_of_dem, x='MUNICIPIO',
@@ -206,11 +338,134 @@ with tab6:
                     )
      
      st.header('Tabla oferta demanda TIC por municipio')
+     panel_tabla_oferta_demanda(df_of_dem)
+
+     # Brechas por código DIVIPOLA (talento_tic.brechas): positivas cuando falta talento
+     st.header('Brechas entre demanda y oferta de talento TIC')
+     with st.container(border=True):
+          st.markdown('Cargos demandados frente a graduados 2023 por municipio.')
+          st.dataframe(agregados.brechas_municipio, hide_index=True)
+          panel_brechas_programa(agregados.brechas_programa)
+          panel_brechas_cargo(agregados.brechas_cargo)
+
+@st.fragment
+@instrumentacion.trazado('panel_tabla_oferta_demanda', 'panel')
+def panel_tabla_oferta_demanda(df_of_dem):
      with st.container(border=True):
           ver_df_demanda_municipio = st.toggle('Ver Dataframe municipio', value=True)
           if ver_df_demanda_municipio:
                st.dataframe(df_of_dem, hide_index=True)
+
+@st.fragment
+@instrumentacion.trazado('panel_brechas_programa', 'panel')
+def panel_brechas_programa(df_brechas_programa):
+     st.markdown('Cargos que piden cada programa frente a sus matriculados en 2018.')
+     municipios_brecha = st.multiselect('Municipios', df_brechas_programa['MUNICIPIO'].unique().tolist())
+     if municipios_brecha:
+          df_brechas_programa = df_brechas_programa[df_brechas_programa['MUNICIPIO'].isin(municipios_brecha)]
+     st.dataframe(df_brechas_programa, hide_index=True)
+
+@st.fragment
+@instrumentacion.trazado('panel_brechas_cargo', 'panel')
+def panel_brechas_cargo(df_brechas_cargo):
+     st.markdown('Cargos demandados frente a los matriculados en 2018 de los programas asociados a cada cargo.')
+     municipios_cargo = st.multiselect('Municipios', df_brechas_cargo['MUNICIPIO'].unique().tolist(), key='municipios_cargo')
+     if municipios_cargo:
+          df_brechas_cargo = df_brechas_cargo[df_brechas_cargo['MUNICIPIO'].isin(municipios_cargo)]
+     st.dataframe(df_brechas_cargo, hide_index=True)
      
 
+def vista_competencias():
+     # Búsqueda de cargos por competencias con el índice invertido (talento_tic.indice)
+     st.header('Cargos y municipios que demandan una competencia')
+     panel_competencias(agregados.indice, agregados.modelo.cargos)
 
+@st.fragment
+@instrumentacion.trazado('panel_competencias', 'panel')
+def panel_competencias(indice, df_cargos):
+     with st.container(border=True):
+          competencias_seleccionadas = st.multiselect('Competencias', indice.frecuencias().index.tolist(),
+                                                      placeholder='Escribe o elige una o varias competencias')
+          coincidencia = st.radio('Coincidencia', ['Todas las competencias', 'Alguna competencia'], horizontal=True)
+          if competencias_seleccionadas:
+               df_cargos_competencia = cargos_con_competencias(df_cargos, indice, competencias_seleccionadas,
+                                                               todas=coincidencia == 'Todas las competencias')
+               st.metric('Cargos encontrados', len(df_cargos_competencia))
+               if len(df_cargos_competencia):
+                    st.bar_chart(df_cargos_competencia['Municipio'].value_counts(), x_label='Municipio', y_label='Cargos')
+                    st.dataframe(df_cargos_competencia[['ID_CARGO', 'Cargo_identificado', 'Municipio', 'Nivel Educativo']],
+                                 hide_index=True)
 
+# Definición de elemntos navegacionales
+VISTAS = {
+     'Demanda TIC 2023': vista_demanda_perfiles,
+     'Top demanda por municipio 2023': vista_top_municipios,
+     'Demanda Total por municipio': vista_demanda_municipio,
+     'Matricula programas TIC 2017-18': vista_matricula,
+     'Mapa talento humano graduado 2023': vista_mapa,
+     'Comparación oferta demanda TIC': vista_oferta_demanda,
+     'Búsqueda por competencias': vista_competencias,
+}
+
+if navegacion_pestanas:
+     for pestana, (nombre_vista, vista) in zip(st.tabs(list(VISTAS)), VISTAS.items()):
+          with pestana, instrumentacion.tramo(nombre_vista, 'vista'):
+               vista()
+else:
+     primera_vista = next(iter(VISTAS))
+     vista_seleccionada = st.segmented_control('Vista', list(VISTAS), default=primera_vista, key='vista',
+                                               label_visibility='collapsed')
+     # Al volver a pulsar la vista activa el control queda vacío
+     vista_seleccionada = vista_seleccionada or primera_vista
+     with instrumentacion.tramo(vista_seleccionada, 'vista'):
+          VISTAS[vista_seleccionada]()
+
+instrumentacion.terminar_traza()
+
+# Panel de rendimiento, oculto: se abre con ?admin=<clave> en la URL. La clave
+# es TALENTO_TIC_CLAVE_ADMIN; sin ella el panel queda deshabilitado, porque
+# muestra las trazas de todas las sesiones del proceso.
+def panel_rendimiento():
+     trazas = instrumentacion.historial.trazas()
+     if not trazas:
+          return
+     ultima = trazas[-1]
+     st.header('Rendimiento')
+     col1, col2, col3 = st.columns(3)
+     col1.metric('Último rerun', f'{ultima.duracion_ms:.0f} ms')
+     col2.metric('Memoria', f"{ultima.memoria['residente_mb']:.0f} MB")
+     col3.metric('Pico', f"{ultima.memoria['pico_mb']:.0f} MB")
+
+     st.markdown('Tiempo por paso del último rerun')
+     df_tramos = pd.DataFrame(instrumentacion.resumen_tramos(ultima))
+     if len(df_tramos):
+          df_tramos['Total (ms)'] = df_tramos['Total (ms)'].round(1)
+          st.dataframe(df_tramos, hide_index=True)
+
+     st.markdown('Cachés (último rerun)')
+     caches = {}
+     for contador, cantidad in ultima.contadores.items():
+          if not contador.startswith('cache.'):
+               continue
+          _, nombre_cache, resultado = contador.split('.')
+          caches.setdefault(nombre_cache, {'Caché': nombre_cache, 'aciertos': 0, 'fallos': 0})[resultado] = cantidad
+     st.dataframe(pd.DataFrame(list(caches.values()), columns=['Caché', 'aciertos', 'fallos']), hide_index=True)
+     cache_figuras = figuras.estadisticas()
+     st.caption(f'Figuras en caché: {cache_figuras["entradas"]} · aciertos {cache_figuras["aciertos"]} · '
+                f'fallos {cache_figuras["fallos"]} desde que arrancó el proceso')
+
+     st.markdown(f'Últimos {len(trazas)} reruns')
+     st.line_chart(pd.DataFrame({'Duración (ms)': [traza.duracion_ms for traza in trazas]}))
+     st.download_button('Exportar trazas (JSON)', instrumentacion.exportar_json(trazas),
+                        file_name='trazas_talento_tic.json', mime='application/json')
+
+def admin_autorizado():
+     clave = os.environ.get('TALENTO_TIC_CLAVE_ADMIN')
+     recibida = st.query_params.get('admin')
+     if not clave or recibida is None:
+          return False
+     return hmac.compare_digest(recibida.encode('utf-8'), clave.encode('utf-8'))
+
+if admin_autorizado():
+     with st.sidebar:
+          panel_rendimiento()
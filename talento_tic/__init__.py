@@ -0,0 +1,60 @@
+"""Análisis del Talento Humano en Ciencia, Tecnología e Innovación en Colombia.
+
+Paquete con la carga de datos y las transformaciones que alimentan el tablero
+de Streamlit (``proyecto_integrador_V4.py``). No depende de Streamlit, así que
+las mismas tablas se pueden calcular desde procesos por lotes::
+
+    from talento_tic import obtener_agregados
+    agregados = obtener_agregados()
+    agregados.of_dem
+"""
+from talento_tic.agregados import Agregados, calcular_agregados, obtener_agregados
+from talento_tic.analitica import (
+    cargos_con_competencias,
+    completar_graduados,
+    demanda_filtrada,
+    demanda_por_municipio,
+    demanda_por_municipio_perfil,
+    demanda_por_perfil,
+    filtrar_top_municipios,
+    filtros_demanda,
+    oferta_demanda,
+    top_k_por_municipio,
+    variacion_matricula,
+)
+from talento_tic.brechas import brechas_por_cargo, brechas_por_municipio, brechas_por_programa
+from talento_tic.cubo import Cubo, construir_cubo
+from talento_tic.emparejamiento import Emparejador, clave_canonica, unificar
+from talento_tic.fuentes import cargar_datos
+from talento_tic.indice import IndiceCompetencias, construir_indice
+from talento_tic.modelo import ModeloPerfiles, normalizar_perfiles
+
+__all__ = [
+    'Agregados',
+    'Cubo',
+    'Emparejador',
+    'IndiceCompetencias',
+    'brechas_por_cargo',
+    'brechas_por_municipio',
+    'brechas_por_programa',
+    'ModeloPerfiles',
+    'calcular_agregados',
+    'cargos_con_competencias',
+    'clave_canonica',
+    'cargar_datos',
+    'completar_graduados',
+    'construir_cubo',
+    'construir_indice',
+    'demanda_por_municipio',
+    'demanda_por_municipio_perfil',
+    'demanda_filtrada',
+    'demanda_por_perfil',
+    'filtrar_top_municipios',
+    'filtros_demanda',
+    'normalizar_perfiles',
+    'obtener_agregados',
+    'oferta_demanda',
+    'top_k_por_municipio',
+    'unificar',
+    'variacion_matricula',
+]
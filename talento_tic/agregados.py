@@ -0,0 +1,201 @@
+"""Tablas derivadas del tablero, calculadas una sola vez por versión de datos.
+
+Las tablas se agrupan según las fuentes de las que dependen (``GRUPOS``): lo
+que sale solo de perfiles, solo de graduados, solo de formación o de los
+cruces entre ellas. Cada grupo se versiona con las fuentes de las que depende
+(``talento_tic.registro``), así que al cambiar una fuente solo se recalculan
+los grupos que la usan.
+"""
+from dataclasses import dataclass
+
+import pandas as pd
+
+from talento_tic import analitica, brechas, divipola, fuentes, mapa, matricula, registro
+from talento_tic.instrumentacion import tramo
+from talento_tic.cubo import Cubo, construir_cubo
+from talento_tic.indice import IndiceCompetencias, construir_indice
+from talento_tic.modelo import ModeloPerfiles, normalizar_perfiles
+
+PERFILES = fuentes.ARCHIVO_PERFILES
+FORMACION = fuentes.ARCHIVO_FORMACION
+GRADUADOS = fuentes.ARCHIVO_GRADUADOS
+# Los cruces por municipio usan el catálogo DIVIPOLA del directorio de datos;
+# se versiona como una fuente más (talento_tic.registro)
+DIVIPOLA = divipola.ARCHIVO_DIVIPOLA
+
+# Grupo → (fuentes de las que depende, campos de Agregados que produce). El
+# orden importa: los cruces usan las tablas de los grupos anteriores.
+GRUPOS = {
+    'perfiles': ((PERFILES,), ('modelo', 'demanda_perfiles', 'demanda_perfiles_municipio',
+                               'top_perfiles_municipio', 'demanda_municipio', 'cubo', 'indice')),
+    'graduados': ((GRADUADOS,), ('graduados_tic', 'celdas_mapa', 'th_tic')),
+    'formacion': ((FORMACION,), ('matricula', 'deficit_formacion', 'variacion_formacion')),
+    'oferta_demanda': ((PERFILES, GRADUADOS, DIVIPOLA), ('of_dem', 'brechas_municipio')),
+    'brechas_formacion': ((PERFILES, FORMACION, DIVIPOLA), ('brechas_programa', 'brechas_cargo')),
+}
+
+
+@dataclass
+class Agregados:
+    modelo: ModeloPerfiles
+    demanda_perfiles: pd.DataFrame
+    demanda_perfiles_municipio: pd.DataFrame
+    top_perfiles_municipio: pd.DataFrame
+    demanda_municipio: pd.DataFrame
+    graduados_tic: pd.DataFrame
+    celdas_mapa: pd.DataFrame
+    th_tic: pd.Series
+    matricula: pd.DataFrame
+    deficit_formacion: pd.DataFrame
+    variacion_formacion: float
+    of_dem: pd.DataFrame
+    brechas_municipio: pd.DataFrame
+    brechas_programa: pd.DataFrame
+    brechas_cargo: pd.DataFrame
+    cubo: Cubo
+    indice: IndiceCompetencias
+
+
+def version_grupo(grupo, versiones, *extra):
+    """Versión del grupo ``grupo`` según las versiones de sus fuentes."""
+    return registro.version_de(versiones, GRUPOS[grupo][0], *extra)
+
+
+def fuentes_necesarias(grupos):
+    """Fuentes crudas que hay que cargar para calcular ``grupos``."""
+    necesarias = {
+        'perfiles': (PERFILES,),
+        'graduados': (GRADUADOS,),
+        'formacion': (FORMACION,),
+        'oferta_demanda': (DIVIPOLA,),
+        'brechas_formacion': (FORMACION, DIVIPOLA),
+    }
+    return sorted({archivo for grupo in grupos for archivo in necesarias[grupo]})
+
+
+def _perfiles(datos, valores, metodo_conteo):
+    # Las cuentas se hacen sobre la tabla de cargos (una fila por ID_CARGO)
+    # Cada paso es un tramo de la traza del tablero (talento_tic.instrumentacion)
+    df_perfiles = datos[PERFILES]
+    with tramo('normalizar_perfiles', 'transformacion'):
+        if isinstance(df_perfiles, ModeloPerfiles):
+            modelo = df_perfiles
+        else:
+            modelo = normalizar_perfiles(df_perfiles)
+    df_cargos = modelo.cargos
+
+    with tramo('demanda_por_perfil', 'transformacion'):
+        df_demanda_perfiles = analitica.demanda_por_perfil(df_cargos, metodo_conteo)
+
+    # El top se guarda con K_MAX perfiles por municipio; el tablero recorta al K elegido
+    with tramo('demanda_por_municipio_perfil', 'transformacion'):
+        df_demanda_perfiles_municipio = analitica.demanda_por_municipio_perfil(df_cargos, metodo_conteo)
+        df_top_perfiles_municipio = analitica.top_k_por_municipio(df_demanda_perfiles_municipio)
+
+    with tramo('demanda_por_municipio', 'transformacion'):
+        df_demanda_municipio = analitica.demanda_por_municipio(df_cargos, metodo_conteo)
+
+    # Cubo para los filtros por nivel educativo y tipo de competencia
+    with tramo('construir_cubo', 'transformacion'):
+        cubo = construir_cubo(modelo)
+
+    # La ingesta por bloques ya trae el índice; si no, se arma con la tabla de enlace
+    with tramo('construir_indice', 'transformacion'):
+        indice = modelo.indice if modelo.indice is not None else construir_indice(modelo)
+
+    return dict(
+        modelo=modelo,
+        demanda_perfiles=df_demanda_perfiles,
+        demanda_perfiles_municipio=df_demanda_perfiles_municipio,
+        top_perfiles_municipio=df_top_perfiles_municipio,
+        demanda_municipio=df_demanda_municipio,
+        cubo=cubo,
+        indice=indice,
+    )
+
+
+def _graduados(datos, valores, metodo_conteo):
+    with tramo('completar_graduados', 'transformacion'):
+        df_graduados_tic = analitica.completar_graduados(datos[GRADUADOS])
+        df_th_tic = df_graduados_tic.groupby('MUNICIPIO')['graduados_2023'].sum()
+    # Celdas del mapa por nivel de zoom, para no mandar cada punto al navegador
+    with tramo('precalcular_celdas', 'transformacion'):
+        df_celdas_mapa = mapa.precalcular_celdas(df_graduados_tic)
+    return dict(graduados_tic=df_graduados_tic, celdas_mapa=df_celdas_mapa, th_tic=df_th_tic)
+
+
+def _formacion(datos, valores, metodo_conteo):
+    # Matriculados por celda (cargo, programa, nivel, municipio); las variaciones salen de sus totales
+    with tramo('variacion_matricula', 'transformacion'):
+        df_matricula = matricula.sumas_matricula(datos[FORMACION])
+        df_deficit_formacion, variacion_formacion = analitica.variacion_matricula(datos[FORMACION], sumas=df_matricula)
+    return dict(matricula=df_matricula, deficit_formacion=df_deficit_formacion,
+                variacion_formacion=variacion_formacion)
+
+
+def _oferta_demanda(datos, valores, metodo_conteo):
+    # Brechas oferta-demanda cruzadas por código DIVIPOLA
+    with tramo('oferta_demanda', 'transformacion'):
+        df_of_dem = analitica.oferta_demanda(valores['demanda_municipio'], valores['graduados_tic'], datos[DIVIPOLA])
+        df_brechas_municipio = brechas.brechas_por_municipio(valores['modelo'].cargos, valores['graduados_tic'],
+                                                             datos[DIVIPOLA])
+    return dict(of_dem=df_of_dem, brechas_municipio=df_brechas_municipio)
+
+
+def _brechas_formacion(datos, valores, metodo_conteo):
+    # Programas y cargos de perfiles y formación unificados en códigos comunes
+    with tramo('brechas_por_programa', 'transformacion'):
+        df_brechas_programa = brechas.brechas_por_programa(valores['modelo'].cargos, datos[FORMACION], datos[DIVIPOLA])
+    with tramo('brechas_por_cargo', 'transformacion'):
+        df_brechas_cargo = brechas.brechas_por_cargo(valores['modelo'].cargos, datos[FORMACION], datos[DIVIPOLA])
+    return dict(brechas_programa=df_brechas_programa, brechas_cargo=df_brechas_cargo)
+
+
+_CALCULOS = {
+    'perfiles': _perfiles,
+    'graduados': _graduados,
+    'formacion': _formacion,
+    'oferta_demanda': _oferta_demanda,
+    'brechas_formacion': _brechas_formacion,
+}
+
+
+def calcular_grupo(grupo, datos, valores, metodo_conteo='auto'):
+    """Campos del grupo ``grupo`` a partir de las fuentes crudas ``datos``
+    (``{archivo: DataFrame}``, más el catálogo DIVIPOLA en ``datos[DIVIPOLA]``
+    para los cruces) y de los campos ya calculados en ``valores``."""
+    return _CALCULOS[grupo](datos, valores, metodo_conteo)
+
+
+def calcular_agregados(df_perfiles, df_formacion, df_graduados_tic, metodo_conteo='auto', catalogo=None):
+    """Calcula todas las tablas que consumen las pestañas del tablero.
+
+    La demanda se mide en cargos distintos (``ID_CARGO``), no en filas de
+    competencias. ``metodo_conteo='aproximado'`` usa HyperLogLog para
+    extractos muy grandes (ver ``talento_tic.conteo``). ``df_perfiles`` puede
+    ser el DataFrame crudo o un ``ModeloPerfiles`` ya normalizado, como el que
+    produce la ingesta por bloques. ``catalogo`` es el catálogo DIVIPOLA de
+    los cruces (por defecto, el del directorio de datos por defecto).
+    """
+    datos = {PERFILES: df_perfiles, FORMACION: df_formacion, GRADUADOS: df_graduados_tic,
+             DIVIPOLA: catalogo or divipola.cargar_catalogo()}
+    valores = {}
+    for grupo in GRUPOS:
+        valores.update(calcular_grupo(grupo, datos, valores, metodo_conteo))
+    return Agregados(**valores)
+
+
+_memoria = {}
+
+
+def obtener_agregados(versiones=None, directorio=None):
+    """Devuelve los agregados de las fuentes con ``versiones``, calculándolos una sola vez."""
+    if versiones is None:
+        versiones = registro.versiones(directorio)
+    llave = (directorio, tuple(sorted(versiones.items())))
+    if llave not in _memoria:
+        # Solo se conserva la última versión: las anteriores ya no se consultan
+        _memoria.clear()
+        _memoria[llave] = calcular_agregados(*fuentes.cargar_datos(directorio),
+                                             catalogo=divipola.cargar_catalogo(directorio))
+    return _memoria[llave]
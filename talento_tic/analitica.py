@@ -0,0 +1,116 @@
+"""Funciones puras con las tablas del tablero.
+
+Ninguna función de este módulo depende de Streamlit: reciben DataFrames y
+devuelven DataFrames, de modo que sirven igual para el tablero, para procesos
+por lotes y para pruebas.
+"""
+import pandas as pd
+
+from talento_tic import divipola, matricula
+from talento_tic.conteo import contar_distintos
+from talento_tic.cubo import NIVEL, TIPO
+from talento_tic.ranking import K_MAX, recortar_top, top_k_por_grupo
+
+OPCION_TODOS = 'Todos'
+
+# Fila de Barranquilla que falta en graduados_tic_2023.csv
+FILA_BARRANQUILLA = [7, 'BARRANQUILLA', 10.96854, -74.78132, 1016]
+
+
+def demanda_por_perfil(df_cargos, metodo_conteo='auto'):
+    """Cargos distintos demandados por perfil, de mayor a menor."""
+    df = contar_distintos(df_cargos, 'Cargo_identificado', nombre='Total demandados', metodo=metodo_conteo)
+    return df.sort_values(by='Total demandados', ascending=False)
+
+
+def demanda_por_municipio_perfil(df_cargos, metodo_conteo='auto'):
+    """Cargos distintos por (Municipio, Cargo_identificado), en la columna ``ID_CARGO``."""
+    return contar_distintos(df_cargos, ['Municipio', 'Cargo_identificado'], metodo=metodo_conteo)
+
+
+def top_k_por_municipio(df_demanda_perfiles_municipio, k=K_MAX):
+    """Los ``k`` perfiles más demandados de cada municipio, con su ``rango``."""
+    return top_k_por_grupo(df_demanda_perfiles_municipio, 'Municipio', 'ID_CARGO', k)
+
+
+def filtrar_top_municipios(df_top_perfiles_municipio, k, municipios_seleccionados):
+    """Recorta el top al ``k`` pedido y a los municipios seleccionados (o 'Todos')."""
+    df = recortar_top(df_top_perfiles_municipio, k)
+    if OPCION_TODOS in municipios_seleccionados:
+        return df
+    return df[df['Municipio'].isin(municipios_seleccionados)]
+
+
+def demanda_por_municipio(df_cargos, metodo_conteo='auto'):
+    """Cargos distintos demandados en cada municipio."""
+    df = contar_distintos(df_cargos, 'Municipio', nombre='Cargos_demandados', metodo=metodo_conteo)
+    return df.rename(columns={'Municipio': 'MUNICIPIO'})
+
+
+def filtros_demanda(niveles, tipo=OPCION_TODOS):
+    """Filtros del cubo para los niveles educativos y el tipo de competencia elegidos.
+
+    ``OPCION_TODOS`` (en la lista de niveles o como tipo) no filtra esa dimensión.
+    """
+    filtros = {}
+    if OPCION_TODOS not in niveles:
+        filtros[NIVEL] = list(niveles)
+    if tipo != OPCION_TODOS:
+        filtros[TIPO] = [tipo]
+    return filtros
+
+
+def demanda_filtrada(cubo, filtros):
+    """Demanda por perfil, top por municipio y demanda por municipio desde el cubo.
+
+    Devuelve las mismas tablas que ``demanda_por_perfil``,
+    ``top_k_por_municipio`` y ``demanda_por_municipio``, restringidas a
+    ``filtros`` y sin volver a recorrer la tabla de cargos.
+    """
+    df_perfil = cubo.consultar('Cargo_identificado', filtros=filtros, nombre='Total demandados')
+    df_perfil = df_perfil.sort_values(by='Total demandados', ascending=False)
+    df_top = top_k_por_municipio(cubo.consultar(['Municipio', 'Cargo_identificado'], filtros=filtros, nombre='ID_CARGO'))
+    df_municipio = cubo.consultar('Municipio', filtros=filtros, nombre='Cargos_demandados')
+    return df_perfil, df_top, df_municipio.rename(columns={'Municipio': 'MUNICIPIO'})
+
+
+def cargos_con_competencias(df_cargos, indice, competencias, todas=True):
+    """Cargos que piden todas (o alguna) de las ``competencias``, según el índice invertido."""
+    return df_cargos.iloc[indice.buscar(competencias, todas)]
+
+
+def completar_graduados(df_graduados_tic):
+    """Copia de los graduados 2023 con la fila de Barranquilla agregada."""
+    df = df_graduados_tic.copy()
+    df.loc[len(df)] = FILA_BARRANQUILLA
+    return df
+
+
+def variacion_matricula(df_formacion, desde=2017, hasta=2018, sumas=None):
+    """Variación porcentual de matriculados entre ``desde`` y ``hasta``, por cargo y total.
+
+    Devuelve ``(df_deficit_formacion, variacion_total)``, con la variación en
+    puntos porcentuales redondeada a un decimal. Ambas se calculan con los
+    totales de matriculados (``talento_tic.matricula``), no promediando las
+    variaciones de cada fila. ``sumas`` reutiliza una tabla de
+    ``matricula.sumas_matricula`` ya calculada.
+    """
+    if sumas is None:
+        sumas = matricula.sumas_matricula(df_formacion)
+    columna = matricula.columna_variacion(desde, hasta)
+    df = matricula.variacion(sumas, matricula.CARGO, desde, hasta)[[matricula.CARGO, columna]]
+    df[columna] = (df[columna] * 100).round(1)
+    total = matricula.variacion(sumas, desde=desde, hasta=hasta)[columna].iloc[0]
+    return df, round(total * 100, 2)
+
+
+def oferta_demanda(df_demanda_municipio, df_graduados_tic, catalogo=None):
+    """Cargos demandados frente a graduados 2023 por municipio, cruzados por código DIVIPOLA."""
+    catalogo = catalogo or divipola.cargar_catalogo()
+    codigos = catalogo.codificar(df_graduados_tic['MUNICIPIO'])
+    graduados = pd.Series(df_graduados_tic['graduados_2023'].to_numpy(), index=codigos)[codigos >= 0]
+    if graduados.index.has_duplicates:
+        raise ValueError('Hay municipios repetidos en los graduados')
+    df = df_demanda_municipio.copy()
+    df['graduados_2023'] = graduados.reindex(catalogo.codificar(df['MUNICIPIO'])).to_numpy()
+    return df
@@ -0,0 +1,128 @@
+"""Brechas entre la oferta y la demanda de talento TIC.
+
+Todas las cuentas se hacen sobre códigos DIVIPOLA (``talento_tic.divipola``):
+cada fuente se traduce a la posición de su municipio en el catálogo y cada
+medida se acumula con un ``bincount`` sobre esas posiciones, sin cruces por
+texto. Por municipio se compara la demanda (cargos distintos de perfiles) con
+los graduados 2023; por (municipio, programa), los cargos que piden cada
+programa (``programas_formar_ocupación``) con los matriculados de formación, y
+por (municipio, cargo), los cargos demandados con los matriculados de los
+programas que formación asocia a ese cargo (``Cargo u oficio por
+entrevistados``). Los programas y los cargos de las dos fuentes se unifican en
+códigos enteros con ``talento_tic.emparejamiento``.
+
+En las tablas, ``Brecha`` es demanda menos oferta (positiva cuando falta
+talento) y ``Razon_oferta_demanda`` es oferta sobre demanda (vacía si no hay
+demanda).
+"""
+import numpy as np
+import pandas as pd
+
+from talento_tic import divipola
+from talento_tic.conteo import codigos_densos
+from talento_tic.emparejamiento import unificar
+
+CODIGO = 'CODIGO_DIVIPOLA'
+
+
+def _posiciones(catalogo, nombres):
+    return catalogo.posiciones(catalogo.codificar(nombres))
+
+
+def _llaves(catalogo, municipios, codigos, n_codigos):
+    """Llave entera (municipio, código) de cada fila; -1 si falta alguno de los dos."""
+    municipio = _posiciones(catalogo, municipios)
+    return np.where((municipio >= 0) & (codigos >= 0), municipio * n_codigos + codigos, -1)
+
+
+def _sumar(llaves, n, pesos=None):
+    validas = llaves >= 0
+    return np.bincount(llaves[validas], weights=None if pesos is None else pesos[validas], minlength=n)
+
+
+def _filas_unicas(llaves, df_formacion):
+    """Primera fila de formación de cada (llave, programa, nivel)."""
+    return ~pd.DataFrame({
+        'llave': llaves,
+        'programa': codigos_densos(df_formacion['PROGRAMA'])[0],
+        'nivel': codigos_densos(df_formacion['NIVEL'])[0],
+    }).duplicated().to_numpy()
+
+
+def _tabla(columnas, demanda, oferta, nombre_oferta):
+    df = pd.DataFrame(columnas)
+    df['Cargos_demandados'] = demanda.astype(np.int64)
+    df[nombre_oferta] = oferta.astype(np.int64)
+    df['Brecha'] = df['Cargos_demandados'] - df[nombre_oferta]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        df['Razon_oferta_demanda'] = np.where(demanda > 0, oferta / demanda, np.nan).round(2)
+    return df
+
+
+def brechas_por_municipio(df_cargos, df_graduados_tic, catalogo=None):
+    """Cargos demandados frente a graduados 2023 en cada municipio con alguno de los dos."""
+    catalogo = catalogo or divipola.cargar_catalogo()
+    n = len(catalogo)
+    demanda = _sumar(_posiciones(catalogo, df_cargos['Municipio']), n)
+    oferta = _sumar(_posiciones(catalogo, df_graduados_tic['MUNICIPIO']), n,
+                    df_graduados_tic['graduados_2023'].to_numpy(np.float64))
+
+    presentes = np.flatnonzero((demanda > 0) | (oferta > 0))
+    return _tabla({
+        CODIGO: divipola.formatear_codigo(catalogo.codigos[presentes]),
+        'MUNICIPIO': catalogo.nombres[presentes],
+    }, demanda[presentes], oferta[presentes], 'graduados_2023')
+
+
+def brechas_por_programa(df_cargos, df_formacion, catalogo=None, anio=2018):
+    """Cargos que piden cada programa frente a sus matriculados de ``anio``, por municipio."""
+    catalogo = catalogo or divipola.cargar_catalogo()
+    programas, (programa_demanda, programa_oferta) = unificar(
+        df_cargos['programas_formar_ocupación'], df_formacion['PROGRAMA']
+    )
+    n_programas = len(programas)
+    n = len(catalogo) * n_programas
+
+    demanda = _sumar(_llaves(catalogo, df_cargos['Municipio'], programa_demanda, n_programas), n)
+
+    # Formación repite los matriculados de cada (municipio, programa, nivel) en
+    # una fila por cargo entrevistado: cada uno se suma una sola vez. Se suma y
+    # no se asigna porque el emparejamiento puede unir dos programas en un código
+    llaves_oferta = _llaves(catalogo, df_formacion['MUNICIPIO'], programa_oferta, n_programas)
+    unicas = _filas_unicas(llaves_oferta, df_formacion)
+    oferta = _sumar(llaves_oferta[unicas], n, df_formacion[f'TOTAL_MATRICULADOS_{anio}'].to_numpy(np.float64)[unicas])
+
+    presentes = np.flatnonzero((demanda > 0) | (oferta > 0))
+    municipio, programa = np.divmod(presentes, n_programas)
+    return _tabla({
+        CODIGO: divipola.formatear_codigo(catalogo.codigos[municipio]),
+        'MUNICIPIO': catalogo.nombres[municipio],
+        'PROGRAMA': programas[programa],
+    }, demanda[presentes], oferta[presentes], f'Matriculados_{anio}')
+
+
+def brechas_por_cargo(df_cargos, df_formacion, catalogo=None, anio=2018):
+    """Cargos demandados frente a los matriculados de ``anio`` en los programas
+    que formación asocia a cada cargo, por municipio."""
+    catalogo = catalogo or divipola.cargar_catalogo()
+    cargos, (cargo_demanda, cargo_oferta) = unificar(
+        df_cargos['Cargo_identificado'], df_formacion['Cargo u oficio por entrevistados']
+    )
+    n_cargos = len(cargos)
+    n = len(catalogo) * n_cargos
+
+    demanda = _sumar(_llaves(catalogo, df_cargos['Municipio'], cargo_demanda, n_cargos), n)
+
+    # Formación repite cada (cargo, programa, nivel, municipio) una vez por tipo
+    # de cargo (crítico, alta demanda...): cada programa se suma una sola vez
+    llaves_oferta = _llaves(catalogo, df_formacion['MUNICIPIO'], cargo_oferta, n_cargos)
+    unicas = _filas_unicas(llaves_oferta, df_formacion)
+    oferta = _sumar(llaves_oferta[unicas], n, df_formacion[f'TOTAL_MATRICULADOS_{anio}'].to_numpy(np.float64)[unicas])
+
+    presentes = np.flatnonzero((demanda > 0) | (oferta > 0))
+    municipio, cargo = np.divmod(presentes, n_cargos)
+    return _tabla({
+        CODIGO: divipola.formatear_codigo(catalogo.codigos[municipio]),
+        'MUNICIPIO': catalogo.nombres[municipio],
+        'CARGO': cargos[cargo],
+    }, demanda[presentes], oferta[presentes], f'Matriculados_{anio}')
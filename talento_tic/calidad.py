@@ -0,0 +1,166 @@
+"""Reporte de calidad de datos calculado una sola vez al ingerir cada fuente.
+
+Reemplaza los ``info()``, ``isnull().sum()`` y ``duplicated().sum()`` que el
+tablero corría en cada rerun. Por fuente se guarda un JSON con filas, nulos
+por columna, filas duplicadas y las diferencias frente al esquema esperado,
+junto con el tamaño y la fecha del archivo del que salió (su versión).
+
+En la ingesta por bloques los duplicados se estiman con HyperLogLog sobre el
+hash de cada fila, para no tener que guardar todas las filas vistas.
+"""
+import json
+import os
+import threading
+
+import pandas as pd
+
+from talento_tic import fuentes
+from talento_tic.conteo import HyperLogLog
+
+# Esquema esperado de cada fuente con el tipo lógico de cada columna
+ESQUEMAS = {
+    fuentes.ARCHIVO_PERFILES: {
+        'ID_CARGO': 'entero',
+        'Ocupación_CIUO': 'texto',
+        'Ocupación_CNO': 'texto',
+        'Cargo_identificado': 'texto',
+        'Municipio': 'texto',
+        'Nivel Educativo': 'texto',
+        'programas_formar_ocupación': 'texto',
+        'Competencias': 'texto',
+        'Tipo_de_Competencia': 'texto',
+    },
+    fuentes.ARCHIVO_FORMACION: {
+        'Tipo': 'texto',
+        'Cargo u oficio por entrevistados': 'texto',
+        'NIVEL': 'texto',
+        'PROGRAMA': 'texto',
+        'MUNICIPIO': 'texto',
+        'TOTAL_MATRICULADOS_2017': 'entero',
+        'TOTAL_MATRICULADOS_2018': 'entero',
+        'VARIACION_PORCENTUAL_2018_2017': 'real',
+    },
+    fuentes.ARCHIVO_GRADUADOS: {
+        'Unnamed: 0': 'entero',
+        'MUNICIPIO': 'texto',
+        'Latitud': 'real',
+        'Longitud': 'real',
+        'graduados_2023': 'entero',
+    },
+}
+
+
+def tipo_logico(dtype):
+    if pd.api.types.is_bool_dtype(dtype):
+        return 'booleano'
+    if pd.api.types.is_integer_dtype(dtype):
+        return 'entero'
+    if pd.api.types.is_float_dtype(dtype):
+        return 'real'
+    return 'texto'
+
+
+def diferencias_esquema(archivo, tipos):
+    """Columnas faltantes, adicionales y con tipo distinto frente a ``ESQUEMAS``."""
+    esperado = ESQUEMAS.get(archivo, {})
+    return {
+        'faltantes': [c for c in esperado if c not in tipos],
+        'adicionales': [c for c in tipos if c not in esperado],
+        'tipo_distinto': {
+            c: {'esperado': esperado[c], 'encontrado': tipos[c]}
+            for c in esperado if c in tipos and tipos[c] != esperado[c]
+        },
+    }
+
+
+def _version(archivo, directorio=None):
+    info = os.stat(fuentes.ruta(archivo, directorio))
+    return {'tamano': info.st_size, 'mtime_ns': info.st_mtime_ns}
+
+
+def evaluar_calidad(df, archivo, directorio=None):
+    """Reporte de calidad exacto de un DataFrame completo."""
+    tipos = {c: tipo_logico(t) for c, t in df.dtypes.items()}
+    return {
+        'archivo': archivo,
+        'version': _version(archivo, directorio),
+        'filas': len(df),
+        'tipos': tipos,
+        'nulos': {c: int(n) for c, n in df.isnull().sum().items()},
+        'duplicados': int(df.duplicated().sum()),
+        'duplicados_aproximados': False,
+        'esquema': diferencias_esquema(archivo, tipos),
+    }
+
+
+class AcumuladorCalidad:
+    """Versión por bloques de ``evaluar_calidad``."""
+
+    def __init__(self, archivo, precision=14):
+        self.archivo = archivo
+        self.filas = 0
+        self.tipos = None
+        self.nulos = None
+        self.distintas = HyperLogLog(precision)
+
+    def agregar_bloque(self, df):
+        self.filas += len(df)
+        if self.tipos is None:
+            self.tipos = {c: tipo_logico(t) for c, t in df.dtypes.items()}
+        nulos = df.isnull().sum()
+        self.nulos = nulos if self.nulos is None else self.nulos.add(nulos, fill_value=0)
+        self.distintas.agregar(pd.util.hash_pandas_object(df, index=False).to_numpy())
+        return self
+
+    def resultado(self, directorio=None):
+        tipos = self.tipos or {}
+        return {
+            'archivo': self.archivo,
+            'version': _version(self.archivo, directorio),
+            'filas': self.filas,
+            'tipos': tipos,
+            'nulos': {c: int(n) for c, n in (self.nulos if self.nulos is not None else {}).items()},
+            'duplicados': max(0, self.filas - self.distintas.estimar()),
+            'duplicados_aproximados': True,
+            'esquema': diferencias_esquema(self.archivo, tipos),
+        }
+
+
+def _ruta_reporte(archivo, directorio=None):
+    # Import local: snapshot importa este módulo al construir cada snapshot
+    from talento_tic import snapshot
+    return os.path.join(snapshot.directorio_snapshot(directorio), 'calidad', os.path.splitext(archivo)[0] + '.json')
+
+
+def guardar_reporte(reporte, directorio=None):
+    ruta = _ruta_reporte(reporte['archivo'], directorio)
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    temporal = f'{ruta}.{os.getpid()}.{threading.get_ident()}.tmp'
+    with open(temporal, 'w', encoding='utf-8') as f:
+        json.dump(reporte, f, indent=2, ensure_ascii=False)
+    os.replace(temporal, ruta)
+
+
+def renovar_version(archivo, directorio=None):
+    """Marca el reporte como vigente cuando el archivo solo cambió de fecha, no de contenido."""
+    try:
+        with open(_ruta_reporte(archivo, directorio), encoding='utf-8') as f:
+            reporte = json.load(f)
+    except (OSError, ValueError):
+        return
+    reporte['version'] = _version(archivo, directorio)
+    guardar_reporte(reporte, directorio)
+
+
+def leer_reportes(directorio=None):
+    """Reportes guardados por fuente; ``vigente`` indica si corresponden al archivo actual."""
+    reportes = {}
+    for archivo in fuentes.ARCHIVOS:
+        try:
+            with open(_ruta_reporte(archivo, directorio), encoding='utf-8') as f:
+                reporte = json.load(f)
+        except (OSError, ValueError):
+            continue
+        reporte['vigente'] = reporte['version'] == _version(archivo, directorio)
+        reportes[archivo] = reporte
+    return reportes
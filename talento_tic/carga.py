@@ -0,0 +1,52 @@
+"""Carga concurrente de fuentes independientes.
+
+Cada fuente (un CSV, su snapshot, el catálogo DIVIPOLA, años nuevos de SNIES)
+se carga con una función sin argumentos. Las funciones corren en un
+``ThreadPoolExecutor``: la lectura de CSV de pandas y la de Arrow sueltan el
+GIL en la mayor parte del trabajo, así que el arranque en frío tarda lo que la
+fuente más lenta y no la suma de todas. Con ``TALENTO_TIC_HILOS_CARGA=1`` las
+fuentes se cargan una tras otra.
+
+El tiempo de cada fuente se guarda en ``ultimos_tiempos`` y, si hay una traza
+activa, como un tramo de ``talento_tic.instrumentacion``.
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from talento_tic import instrumentacion
+
+HILOS_CARGA = int(os.environ.get('TALENTO_TIC_HILOS_CARGA', 0)) or None
+
+# Segundos de la última carga de cada fuente (de cualquier hilo del proceso)
+ultimos_tiempos = {}
+_candado = threading.Lock()
+
+
+def _medir(cargar):
+    inicio = time.perf_counter()
+    resultado = cargar()
+    return resultado, inicio, time.perf_counter()
+
+
+def cargar_fuentes(tareas, max_hilos=HILOS_CARGA):
+    """Ejecuta ``{nombre: funcion}`` en paralelo y devuelve ``{nombre: resultado}`` en el mismo orden.
+
+    Si una fuente falla, la excepción se propaga después de esperar a las demás.
+    """
+    max_hilos = len(tareas) if max_hilos is None else max_hilos
+    if max_hilos <= 1 or len(tareas) <= 1:
+        medidas = {nombre: _medir(cargar) for nombre, cargar in tareas.items()}
+    else:
+        with ThreadPoolExecutor(max_workers=min(max_hilos, len(tareas)),
+                                thread_name_prefix='talento_tic_carga') as pool:
+            futuros = {nombre: pool.submit(_medir, cargar) for nombre, cargar in tareas.items()}
+        medidas = {nombre: futuro.result() for nombre, futuro in futuros.items()}
+
+    with _candado:
+        for nombre, (_, inicio, fin) in medidas.items():
+            ultimos_tiempos[nombre] = fin - inicio
+    for nombre, (_, inicio, fin) in medidas.items():
+        instrumentacion.registrar_tramo(f'cargar {nombre}', 'carga', inicio, fin)
+    return {nombre: resultado for nombre, (resultado, _, _) in medidas.items()}
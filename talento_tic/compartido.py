@@ -0,0 +1,227 @@
+"""Almacén de tablas compartido entre sesiones y procesos del tablero.
+
+``st.cache_data`` guarda una copia por proceso y entrega a cada sesión una
+copia deserializada. Aquí cada grupo de agregados se escribe una sola vez por
+versión de sus fuentes como archivos Arrow IPC sin comprimir en un directorio
+compartido (``/dev/shm`` si existe) y cada proceso los abre con memoria
+mapeada: todos los workers del mismo equipo leen las mismas páginas del
+sistema operativo. Si cambia solo una fuente, los grupos que no dependen de
+ella conservan su versión y no se recalculan.
+
+El cubo y el índice de competencias se guardan con su propio ``guardar`` como
+arreglos ``.npy`` que se abren también mapeados.
+Las tablas que se obtienen de aquí son de solo lectura.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+from dataclasses import fields
+
+import pandas as pd
+import pyarrow as pa
+
+from talento_tic import fuentes, instrumentacion
+from talento_tic.agregados import GRUPOS, Agregados, calcular_grupo, fuentes_necesarias, version_grupo
+from talento_tic.modelo import ModeloPerfiles
+
+
+def _directorio_base():
+    if os.environ.get('TALENTO_TIC_COMPARTIDO'):
+        return os.environ['TALENTO_TIC_COMPARTIDO']
+    base = '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+    return os.path.join(base, 'talento_tic')
+
+
+DIRECTORIO_COMPARTIDO = _directorio_base()
+
+ARCHIVO_ESCALARES = 'escalares.json'
+
+# Se incrementa cuando cambian los campos de Agregados, cómo se guardan o cómo se calculan
+VERSION_FORMATO = 8
+
+_TIPOS = {campo.name: campo.type for campo in fields(Agregados)}
+
+
+def espacio(directorio=None):
+    """Subdirectorio del almacén para las fuentes de ``directorio``.
+
+    Cada directorio de datos tiene su propio espacio, así que publicar los
+    agregados de un extracto no desaloja los de otro.
+    """
+    ruta = os.path.abspath(directorio or fuentes.DIRECTORIO_DATOS)
+    return os.path.join(DIRECTORIO_COMPARTIDO, hashlib.sha1(ruta.encode('utf-8')).hexdigest()[:12])
+
+
+def _nombre_grupo(grupo, version):
+    return f'{grupo}-{version}-f{VERSION_FORMATO}'
+
+
+def directorio_grupo(grupo, version, directorio=None):
+    return os.path.join(espacio(directorio), _nombre_grupo(grupo, version))
+
+
+def escribir_tabla(ruta, df):
+    """Escribe ``df`` como Arrow IPC de forma atómica (conserva índice y categóricos)."""
+    tabla = pa.Table.from_pandas(df)
+    temporal = f'{ruta}.{os.getpid()}.{threading.get_ident()}.tmp'
+    with pa.OSFile(temporal, 'wb') as destino, pa.ipc.new_file(destino, tabla.schema) as escritor:
+        escritor.write_table(tabla)
+    os.replace(temporal, ruta)
+
+
+def abrir_tabla(ruta):
+    """Abre una tabla Arrow con memoria mapeada y la convierte sin copiar donde se puede."""
+    with pa.memory_map(ruta, 'r') as fuente:
+        tabla = pa.ipc.open_file(fuente).read_all()
+    return tabla.to_pandas(split_blocks=True)
+
+
+def versiones_grupos(versiones, *extra):
+    """``{grupo: versión}`` de los grupos de agregados según las versiones de las fuentes."""
+    return {grupo: version_grupo(grupo, versiones, *extra) for grupo in GRUPOS}
+
+
+def publicar_grupo(grupo, valores, version, directorio_datos=None):
+    """Escribe los campos ``valores`` del grupo en su directorio compartido de ``version``.
+
+    El grupo se arma en un directorio temporal propio de este hilo y se
+    renombra de una vez: los archivos publicados no se vuelven a escribir, así
+    que quien los tenga mapeados nunca los ve truncados. Si otro proceso lo
+    publicó antes, se descarta la copia recién escrita y queda la suya.
+    """
+    directorio = directorio_grupo(grupo, version, directorio_datos)
+    if os.path.exists(os.path.join(directorio, ARCHIVO_ESCALARES)):
+        return
+    temporal = f'{directorio}.{os.getpid()}.{threading.get_ident()}.tmp'
+    shutil.rmtree(temporal, ignore_errors=True)
+    try:
+        _escribir_campos(grupo, valores, temporal)
+        try:
+            os.rename(temporal, directorio)
+        except OSError:
+            if os.path.exists(os.path.join(directorio, ARCHIVO_ESCALARES)):
+                return
+            # Un directorio a medio escribir por una versión anterior del almacén
+            shutil.rmtree(directorio, ignore_errors=True)
+            os.rename(temporal, directorio)
+    finally:
+        shutil.rmtree(temporal, ignore_errors=True)
+
+
+def _escribir_campos(grupo, valores, directorio):
+    os.makedirs(directorio)
+    escalares, series = {}, []
+    for nombre in GRUPOS[grupo][1]:
+        valor = valores[nombre]
+        if isinstance(valor, ModeloPerfiles):
+            for subcampo in fields(valor):
+                tabla = getattr(valor, subcampo.name)
+                if isinstance(tabla, pd.DataFrame):
+                    escribir_tabla(os.path.join(directorio, f'{nombre}.{subcampo.name}.arrow'), tabla)
+        elif hasattr(valor, 'guardar'):
+            valor.guardar(os.path.join(directorio, nombre))
+        elif isinstance(valor, pd.Series):
+            series.append(nombre)
+            escribir_tabla(os.path.join(directorio, f'{nombre}.arrow'), valor.to_frame())
+        elif isinstance(valor, pd.DataFrame):
+            escribir_tabla(os.path.join(directorio, f'{nombre}.arrow'), valor)
+        else:
+            escalares[nombre] = valor
+    escalares['_series'] = series
+    with open(os.path.join(directorio, ARCHIVO_ESCALARES), 'w', encoding='utf-8') as f:
+        json.dump(escalares, f)
+
+
+def abrir_grupo(grupo, version, directorio_datos=None):
+    """Campos del grupo en ``version`` mapeados desde el directorio compartido, o ``None``."""
+    directorio = directorio_grupo(grupo, version, directorio_datos)
+    try:
+        with open(os.path.join(directorio, ARCHIVO_ESCALARES), encoding='utf-8') as f:
+            escalares = json.load(f)
+    except OSError:
+        return None
+    try:
+        return _abrir_campos(grupo, directorio, escalares)
+    except OSError:
+        # Otro proceso lo desalojó mientras se abría: cuenta como no publicado
+        return None
+
+
+def _abrir_campos(grupo, directorio, escalares):
+    series = escalares.pop('_series')
+    valores = dict(escalares)
+    for nombre in GRUPOS[grupo][1]:
+        if nombre in valores:
+            continue
+        tipo = _TIPOS[nombre]
+        if tipo is ModeloPerfiles:
+            partes = {}
+            for subcampo in fields(ModeloPerfiles):
+                ruta = os.path.join(directorio, f'{nombre}.{subcampo.name}.arrow')
+                if os.path.exists(ruta):
+                    partes[subcampo.name] = abrir_tabla(ruta)
+            valores[nombre] = ModeloPerfiles(**partes)
+        elif hasattr(tipo, 'abrir'):
+            valores[nombre] = tipo.abrir(os.path.join(directorio, nombre))
+        else:
+            tabla = abrir_tabla(os.path.join(directorio, f'{nombre}.arrow'))
+            valores[nombre] = tabla.iloc[:, 0] if nombre in series else tabla
+    return valores
+
+
+def limpiar(conservar, directorio=None):
+    """Borra las versiones de los grupos de ``conservar`` (``{grupo: versión}``)
+    distintas de la indicada, solo en el espacio de ``directorio``.
+
+    Los procesos que aún tengan mapeada una versión borrada la siguen leyendo
+    sin problema: el sistema operativo libera las páginas al cerrar el mapeo.
+    """
+    base = espacio(directorio)
+    if not os.path.isdir(base):
+        return
+    for nombre in os.listdir(base):
+        # Los temporales son de publicaciones en curso y los borra quien los escribe
+        if nombre.endswith('.tmp'):
+            continue
+        grupo = nombre.split('-', 1)[0]
+        if grupo in conservar and nombre != _nombre_grupo(grupo, conservar[grupo]):
+            shutil.rmtree(os.path.join(base, nombre), ignore_errors=True)
+
+
+def obtener_agregados_compartidos(versiones, cargar_archivos, *extra, directorio=None):
+    """Agregados de las fuentes con ``versiones`` desde el almacén compartido.
+
+    Cada grupo de ``talento_tic.agregados.GRUPOS`` se guarda con la versión de
+    las fuentes de las que depende (más ``extra``, como el modo de ingesta),
+    en el espacio del directorio de datos ``directorio``. Los grupos que
+    ningún proceso ha publicado todavía se calculan: se cargan solo las
+    fuentes que necesitan con ``cargar_archivos(archivos)``, que devuelve
+    ``{archivo: DataFrame}``, y los cruces usan los grupos ya publicados. Los
+    grupos nuevos se publican y se vuelven a abrir mapeados, de modo que
+    también este proceso usa las páginas compartidas y no su propia copia.
+    """
+    versiones = versiones_grupos(versiones, *extra)
+    with instrumentacion.tramo('abrir agregados compartidos', 'carga', cache='almacen_compartido'):
+        valores, faltantes = {}, []
+        for grupo, version in versiones.items():
+            abiertos = abrir_grupo(grupo, version, directorio)
+            if abiertos is None:
+                faltantes.append(grupo)
+            else:
+                valores.update(abiertos)
+        if faltantes:
+            instrumentacion.fallo_cache('almacen_compartido')
+            instrumentacion.contar('agregados.grupos_calculados', len(faltantes))
+            datos = cargar_archivos(fuentes_necesarias(faltantes))
+            for grupo in faltantes:
+                with instrumentacion.tramo(f'calcular {grupo}', 'transformacion'):
+                    calculados = calcular_grupo(grupo, datos, valores)
+                with instrumentacion.tramo(f'publicar {grupo}', 'carga'):
+                    publicar_grupo(grupo, calculados, versiones[grupo], directorio)
+                # Si otro proceso ya lo reemplazó se usa la copia recién calculada
+                valores.update(abrir_grupo(grupo, versiones[grupo], directorio) or calculados)
+            limpiar(versiones, directorio)
+    return Agregados(**valores)
@@ -0,0 +1,183 @@
+"""Conteo de valores distintos por grupo.
+
+``groupby(...).count()`` cuenta filas; en perfiles cada cargo aparece una vez
+por competencia, así que ese conteo infla la demanda. Aquí se cuentan
+``ID_CARGO`` distintos por grupo de forma exacta (orden + únicos, o un mapa de
+bits por grupo) o aproximada con HyperLogLog para extractos muy grandes.
+"""
+import numpy as np
+import pandas as pd
+
+# Con el método 'auto' se usa el mapa de bits si la matriz grupos × valores
+# no supera este número de celdas.
+MAX_CELDAS_MAPA_BITS = 1 << 24
+
+
+def codigos_densos(serie):
+    """Códigos enteros densos (0..n-1) de la serie y sus valores."""
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        return serie.cat.codes.to_numpy(np.int64), serie.cat.categories
+    codigos, valores = pd.factorize(serie, sort=True)
+    return codigos.astype(np.int64), pd.Index(valores)
+
+
+def _codigos_grupo(df, por):
+    """Combina las columnas de agrupación en un solo código entero (base mixta)."""
+    codigo = np.zeros(len(df), dtype=np.int64)
+    niveles = []
+    for columna in por:
+        codigos_columna, valores = codigos_densos(df[columna])
+        codigo = codigo * len(valores) + codigos_columna
+        niveles.append(valores)
+    return codigo, niveles
+
+
+def _decodificar_grupos(grupos, niveles, por):
+    columnas = {}
+    for columna, valores in zip(reversed(por), reversed(niveles)):
+        grupos, codigos = np.divmod(grupos, len(valores))
+        columnas[columna] = pd.Categorical.from_codes(codigos, categories=valores)
+    return pd.DataFrame({columna: columnas[columna] for columna in por})
+
+
+def corridas(ordenados):
+    """Valores y longitudes de las corridas de un arreglo ordenado."""
+    if len(ordenados) == 0:
+        return ordenados, np.zeros(0, dtype=np.int64)
+    inicios = np.flatnonzero(np.r_[True, ordenados[1:] != ordenados[:-1]])
+    return ordenados[inicios], np.diff(np.r_[inicios, len(ordenados)])
+
+
+def _distintos_orden(grupo, valor, n_valores):
+    pares, _ = corridas(np.sort(grupo * n_valores + valor))
+    return corridas(pares // n_valores)
+
+
+def _distintos_mapa_bits(grupo, valor, n_grupos, n_valores):
+    mapa = np.zeros((n_grupos, n_valores), dtype=bool)
+    mapa[grupo, valor] = True
+    conteos = mapa.sum(axis=1)
+    grupos = np.flatnonzero(conteos)
+    return grupos, conteos[grupos]
+
+
+def contar_distintos(df, por, columna='ID_CARGO', nombre=None, metodo='auto', precision=12):
+    """Cuenta los valores distintos de ``columna`` en cada grupo de ``por``.
+
+    ``metodo`` puede ser 'orden' (ordenar pares grupo-valor y quedarse con los
+    únicos), 'mapa_bits' (una fila de bits por grupo), 'aproximado'
+    (HyperLogLog con ``precision`` bits de registro, en memoria O(filas)
+    sin importar el número de grupos) o 'auto', que elige uno
+    de los dos exactos según el tamaño del mapa de bits. Devuelve un DataFrame
+    con las columnas de ``por`` y el conteo en ``nombre`` (por defecto
+    ``columna``), sin grupos vacíos.
+    """
+    if isinstance(por, str):
+        por = [por]
+    nombre = nombre or columna
+    df = df.dropna(subset=[*por, columna])
+    grupo, niveles = _codigos_grupo(df, por)
+
+    if metodo == 'aproximado':
+        grupos, conteos = _distintos_hll(grupo, df[columna], precision)
+    else:
+        valor, valores = codigos_densos(df[columna])
+        n_grupos = int(np.prod([len(v) for v in niveles]))
+        if metodo == 'auto':
+            metodo = 'mapa_bits' if n_grupos * len(valores) <= MAX_CELDAS_MAPA_BITS else 'orden'
+        if metodo == 'mapa_bits':
+            grupos, conteos = _distintos_mapa_bits(grupo, valor, n_grupos, len(valores))
+        elif metodo == 'orden':
+            grupos, conteos = _distintos_orden(grupo, valor, len(valores))
+        else:
+            raise ValueError(f'Método de conteo desconocido: {metodo}')
+
+    resultado = _decodificar_grupos(grupos, niveles, por)
+    resultado[nombre] = conteos.astype(np.int64)
+    return resultado
+
+
+def longitud_bits(x):
+    """Posición del bit más alto encendido (0 para x == 0), vectorizado sobre uint64."""
+    x = x.copy()
+    longitud = np.zeros(x.shape, dtype=np.int64)
+    for paso in (32, 16, 8, 4, 2, 1):
+        alto = x >= (np.uint64(1) << np.uint64(paso))
+        longitud[alto] += paso
+        x[alto] >>= np.uint64(paso)
+    return longitud + (x > 0)
+
+
+def _hash(valores):
+    return pd.util.hash_array(np.asarray(valores))
+
+
+def _indice_y_rango(hashes, precision):
+    """Registro que le toca a cada hash y su rango (ceros iniciales + 1)."""
+    desplazamiento = np.uint64(64 - precision)
+    indice = (hashes >> desplazamiento).astype(np.int64)
+    resto = hashes & ((np.uint64(1) << desplazamiento) - np.uint64(1))
+    rango = (64 - precision) - longitud_bits(resto) + 1
+    return indice, rango.astype(np.uint8)
+
+
+def _estimar_suma(suma, vacios, m):
+    """Estimación HyperLogLog a partir de la suma de 2^-registro y los registros vacíos."""
+    alfa = 0.7213 / (1 + 1.079 / m)
+    crudo = alfa * m * m / suma
+    # Corrección para rangos pequeños (conteo lineal)
+    lineal = m * np.log(m / np.maximum(vacios, 1))
+    return np.where((crudo <= 2.5 * m) & (vacios > 0), lineal, crudo)
+
+
+def _estimar(registros):
+    """Estimación HyperLogLog sobre la última dimensión de ``registros``."""
+    suma = np.sum(np.exp2(-registros.astype(np.float64)), axis=-1)
+    return _estimar_suma(suma, np.sum(registros == 0, axis=-1), registros.shape[-1])
+
+
+class HyperLogLog:
+    """Contador aproximado de distintos, combinable entre bloques o procesos."""
+
+    def __init__(self, precision=12):
+        self.precision = precision
+        self.registros = np.zeros(1 << precision, dtype=np.uint8)
+
+    def agregar(self, valores):
+        indice, rango = _indice_y_rango(_hash(valores), self.precision)
+        np.maximum.at(self.registros, indice, rango)
+        return self
+
+    def combinar(self, otro):
+        if otro.precision != self.precision:
+            raise ValueError('Solo se pueden combinar contadores con la misma precisión')
+        np.maximum(self.registros, otro.registros, out=self.registros)
+        return self
+
+    def estimar(self):
+        return int(round(float(_estimar(self.registros))))
+
+
+def _distintos_hll(grupo, valores, precision):
+    """HyperLogLog por grupo con registros dispersos.
+
+    Solo se guardan las celdas (grupo, registro) que reciben algún valor, así
+    que la memoria es O(filas) y no O(grupos × 2^precision): con miles de
+    grupos la matriz densa de registros ocuparía más que los datos. Un
+    registro vacío vale 0, aporta 2^0 = 1 a la suma de la estimación y cuenta
+    como vacío para la corrección lineal.
+    """
+    m = 1 << precision
+    grupo, grupos = pd.factorize(grupo, sort=True)
+    indice, rango = _indice_y_rango(_hash(valores), precision)
+    celda = grupo.astype(np.int64) * m + indice
+    orden = np.argsort(celda, kind='stable')
+    celdas, largos = corridas(celda[orden])
+    inicios = np.r_[0, np.cumsum(largos)[:-1]]
+    registros = np.maximum.reduceat(rango[orden], inicios) if len(celdas) else rango[:0]
+
+    grupo_celda = celdas // m
+    ocupados = np.bincount(grupo_celda, minlength=len(grupos))
+    suma = np.bincount(grupo_celda, weights=np.exp2(-registros.astype(np.float64)), minlength=len(grupos))
+    vacios = m - ocupados
+    return grupos, np.rint(_estimar_suma(suma + vacios, vacios, m))
@@ -0,0 +1,150 @@
+"""Cubo de demanda sobre Municipio × Cargo × Nivel Educativo × Tipo de competencia.
+
+Se construye una sola vez a partir del modelo normalizado de perfiles y guarda
+arreglos densos de conteos indexados por los códigos de cada dimensión:
+
+* ``cargos`` (municipio, cargo, nivel): cargos distintos. Cada cargo cae en
+  una sola celda, así que se puede sumar sobre cualquier eje.
+* ``cargos_tipo`` (municipio, cargo, nivel, tipo): cargos que piden al menos
+  una competencia de ese tipo. Se puede sumar sobre los tres primeros ejes,
+  pero no sobre el tipo (un cargo con competencias blandas y duras contaría
+  dos veces).
+* ``competencias`` (municipio, cargo, nivel, tipo): filas cargo-competencia.
+
+Las consultas recortan los ejes filtrados y suman los demás, así que solo
+tocan las celdas seleccionadas. Las medidas por tipo requieren la tabla de
+enlace; con la ingesta por bloques el cubo solo tiene ``cargos``.
+"""
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from talento_tic.conteo import codigos_densos, corridas
+
+MUNICIPIO = 'Municipio'
+CARGO = 'Cargo_identificado'
+NIVEL = 'Nivel Educativo'
+TIPO = 'Tipo_de_Competencia'
+
+DIMENSIONES_CARGO = (MUNICIPIO, CARGO, NIVEL)
+DIMENSIONES = DIMENSIONES_CARGO + (TIPO,)
+
+
+class Cubo:
+
+    def __init__(self, etiquetas, medidas):
+        self.etiquetas = etiquetas
+        self.medidas = medidas
+
+    @property
+    def tiene_tipo(self):
+        return 'cargos_tipo' in self.medidas
+
+    def _medida(self, medida, por, filtros):
+        """Arreglo y dimensiones a usar; resuelve cuándo hace falta el eje de tipo."""
+        if medida == 'competencias':
+            return self.medidas['competencias'], DIMENSIONES, filtros
+        if medida != 'cargos':
+            raise ValueError(f'Medida desconocida: {medida}')
+        if TIPO not in por and TIPO not in filtros:
+            return self.medidas['cargos'], DIMENSIONES_CARGO, filtros
+        if not self.tiene_tipo:
+            raise ValueError('El cubo no tiene la dimensión de tipo de competencia')
+        if TIPO not in por:
+            tipos = set(filtros[TIPO])
+            if tipos >= set(self.etiquetas[TIPO]):
+                # Todos los tipos equivalen a no filtrar por tipo
+                filtros = {d: v for d, v in filtros.items() if d != TIPO}
+                return self.medidas['cargos'], DIMENSIONES_CARGO, filtros
+            if len(tipos) > 1:
+                raise ValueError('Los cargos distintos no se pueden sumar sobre varios tipos de competencia')
+        return self.medidas['cargos_tipo'], DIMENSIONES, filtros
+
+    def consultar(self, por=(), medida='cargos', filtros=None, nombre=None):
+        """Agrega ``medida`` por las dimensiones ``por`` tras aplicar ``filtros``.
+
+        ``filtros`` es un diccionario dimensión → valores permitidos. Devuelve
+        un DataFrame con las columnas de ``por`` (categóricas) y el conteo en
+        ``nombre`` (por defecto el nombre de la medida), sin celdas vacías; sin
+        ``por`` devuelve el total como entero.
+        """
+        por = [por] if isinstance(por, str) else list(por)
+        arreglo, dimensiones, filtros = self._medida(medida, por, filtros or {})
+        codigos = {}
+        for eje, dimension in enumerate(dimensiones):
+            if dimension in filtros:
+                indice = self.etiquetas[dimension].get_indexer(list(filtros[dimension]))
+                codigos[dimension] = indice[indice >= 0]
+                arreglo = np.take(arreglo, codigos[dimension], axis=eje)
+            else:
+                codigos[dimension] = np.arange(arreglo.shape[eje])
+
+        ejes_suma = tuple(eje for eje, dimension in enumerate(dimensiones) if dimension not in por)
+        arreglo = arreglo.sum(axis=ejes_suma)
+        if not por:
+            return int(arreglo)
+        restantes = [d for d in dimensiones if d in por]
+        arreglo = np.transpose(arreglo, [restantes.index(d) for d in por])
+
+        celdas = np.nonzero(arreglo)
+        df = pd.DataFrame({
+            dimension: pd.Categorical.from_codes(codigos[dimension][celdas[i]], categories=self.etiquetas[dimension])
+            for i, dimension in enumerate(por)
+        })
+        df[nombre or medida] = arreglo[celdas].astype(np.int64)
+        return df
+
+    def guardar(self, directorio):
+        """Guarda las medidas como ``.npy`` y las etiquetas como JSON."""
+        os.makedirs(directorio, exist_ok=True)
+        for nombre, arreglo in self.medidas.items():
+            np.save(os.path.join(directorio, f'{nombre}.npy'), arreglo)
+        with open(os.path.join(directorio, 'etiquetas.json'), 'w', encoding='utf-8') as f:
+            json.dump({d: list(map(str, e)) for d, e in self.etiquetas.items()}, f, ensure_ascii=False)
+
+    @classmethod
+    def abrir(cls, directorio):
+        """Abre un cubo guardado con sus medidas mapeadas en memoria (solo lectura)."""
+        with open(os.path.join(directorio, 'etiquetas.json'), encoding='utf-8') as f:
+            etiquetas = {d: pd.Index(e) for d, e in json.load(f).items()}
+        medidas = {
+            os.path.splitext(nombre)[0]: np.load(os.path.join(directorio, nombre), mmap_mode='r')
+            for nombre in os.listdir(directorio) if nombre.endswith('.npy')
+        }
+        return cls(etiquetas, medidas)
+
+
+def construir_cubo(modelo):
+    """Cubo de demanda a partir de un ``ModeloPerfiles``."""
+    cargos = modelo.cargos
+    etiquetas, codigos = {}, []
+    for dimension in DIMENSIONES_CARGO:
+        codigo, etiquetas[dimension] = codigos_densos(cargos[dimension])
+        codigos.append(codigo)
+    forma = tuple(len(etiquetas[d]) for d in DIMENSIONES_CARGO)
+    validos = np.all([c >= 0 for c in codigos], axis=0)
+    celda = np.full(len(cargos), -1, dtype=np.int64)
+    celda[validos] = np.ravel_multi_index([c[validos] for c in codigos], forma)
+    n_celdas = int(np.prod(forma))
+    medidas = {'cargos': np.bincount(celda[validos], minlength=n_celdas).reshape(forma).astype(np.int32)}
+
+    enlace = modelo.cargo_competencia
+    if enlace is not None:
+        tipo, etiquetas[TIPO] = codigos_densos(enlace[TIPO])
+        n_tipos = len(etiquetas[TIPO])
+        posicion = pd.Index(cargos['ID_CARGO']).get_indexer(enlace['ID_CARGO'])
+        celda_enlace = np.where(posicion >= 0, celda[posicion], -1)
+        usar = (celda_enlace >= 0) & (tipo >= 0)
+        plano = celda_enlace[usar] * n_tipos + tipo[usar]
+        medidas['competencias'] = (
+            np.bincount(plano, minlength=n_celdas * n_tipos).reshape(forma + (n_tipos,)).astype(np.int32)
+        )
+        # Pares (cargo, tipo) distintos: un cargo cuenta una vez por tipo
+        pares, _ = corridas(np.sort(posicion[usar] * n_tipos + tipo[usar]))
+        plano = celda[pares // n_tipos] * n_tipos + pares % n_tipos
+        medidas['cargos_tipo'] = (
+            np.bincount(plano, minlength=n_celdas * n_tipos).reshape(forma + (n_tipos,)).astype(np.int32)
+        )
+    return Cubo(etiquetas, medidas)
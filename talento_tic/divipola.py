@@ -0,0 +1,100 @@
+"""Códigos DIVIPOLA (DANE) de los municipios.
+
+Las fuentes nombran los municipios en texto ('BOGOTÁ', 'MEDELLÍN'); para
+cruzarlas se traducen una sola vez a su código DIVIPOLA entero y los cruces se
+hacen sobre enteros. Los nombres se emparejan sin distinguir tildes ni
+mayúsculas y tolerando errores de digitación (``talento_tic.emparejamiento``).
+
+El catálogo trae los municipios de las fuentes actuales y se completa, si
+existe, con el catálogo nacional ``divipola.csv`` (columnas ``codigo`` y
+``municipio``) del directorio de datos, o el indicado en TALENTO_TIC_DIVIPOLA.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from talento_tic import fuentes
+from talento_tic.emparejamiento import Emparejador
+
+ARCHIVO_DIVIPOLA = 'divipola.csv'
+
+# Municipios de las fuentes actuales, con el nombre que usan las fuentes
+MUNICIPIOS = {
+    5001: 'MEDELLÍN',
+    8001: 'BARRANQUILLA',
+    11001: 'BOGOTÁ',
+    17001: 'MANIZALES',
+    63001: 'ARMENIA',
+    66001: 'PEREIRA',
+    68001: 'BUCARAMANGA',
+    76001: 'CALI',
+}
+
+
+def formatear_codigo(codigos):
+    """Códigos como texto de cinco dígitos ('05001')."""
+    return pd.Index(codigos).astype(str).str.zfill(5)
+
+
+class Catalogo:
+    """Traducción nombre de municipio → código DIVIPOLA → posición densa."""
+
+    def __init__(self, codigos, nombres):
+        orden = np.argsort(codigos, kind='stable')
+        self.codigos = np.asarray(codigos, dtype=np.int32)[orden]
+        self.nombres = pd.Index(nombres)[orden]
+        # Los nombres repetidos (mismo nombre en varios departamentos) son
+        # ambiguos y el emparejador no los resuelve
+        self._emparejador = Emparejador(self.nombres)
+
+    def __len__(self):
+        return len(self.codigos)
+
+    def codificar(self, nombres):
+        """Código DIVIPOLA de cada nombre (-1 si no está en el catálogo)."""
+        posicion = self._emparejador.emparejar(nombres)
+        return np.where(posicion >= 0, self.codigos[posicion], -1).astype(np.int32)
+
+    def posiciones(self, codigos):
+        """Posición de cada código en el catálogo (-1 si no está)."""
+        codigos = np.asarray(codigos)
+        posicion = np.searchsorted(self.codigos, codigos).clip(max=max(len(self.codigos) - 1, 0))
+        encontrado = (codigos >= 0) & (self.codigos[posicion] == codigos)
+        return np.where(encontrado, posicion, -1)
+
+
+def _leer_catalogo(ruta):
+    df = pd.read_csv(ruta, dtype={'codigo': 'int32', 'municipio': str})
+    return dict(zip(df['codigo'], df['municipio']))
+
+
+def ruta_catalogo(directorio=None):
+    return os.environ.get('TALENTO_TIC_DIVIPOLA') or fuentes.ruta(ARCHIVO_DIVIPOLA, directorio)
+
+
+def construir_catalogo(directorio=None):
+    municipios = {}
+    ruta = ruta_catalogo(directorio)
+    if os.path.exists(ruta):
+        municipios.update(_leer_catalogo(ruta))
+    # Los nombres de las fuentes actuales tienen prioridad sobre los del catálogo
+    municipios.update(MUNICIPIOS)
+    return Catalogo(list(municipios), list(municipios.values()))
+
+
+_catalogos = {}
+
+
+def cargar_catalogo(directorio=None):
+    """Catálogo DIVIPOLA, construido una sola vez por directorio de datos y
+    versión del archivo (se reconstruye si ``divipola.csv`` cambia)."""
+    ruta = ruta_catalogo(directorio)
+    try:
+        info = os.stat(ruta)
+        llave = (directorio, ruta, info.st_size, info.st_mtime_ns, info.st_ino)
+    except FileNotFoundError:
+        llave = (directorio, ruta)
+    if llave not in _catalogos:
+        _catalogos[llave] = construir_catalogo(directorio)
+    return _catalogos[llave]
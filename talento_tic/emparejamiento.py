@@ -0,0 +1,190 @@
+"""Emparejamiento de nombres entre fuentes (municipios, cargos, programas).
+
+Las fuentes escriben los mismos nombres con distinta capitalización, tildes,
+conectores o errores de digitación ('ASISITENTE EN ROBÓTICA', 'INGENIERÍA EN
+INFORMÁTICA' frente a 'INGENIERÍA INFORMÁTICA'). Cada nombre se reduce una vez
+a una clave canónica (sin tildes, en mayúsculas, sin signos ni conectores) y
+se empareja con un vocabulario de referencia:
+
+1. por igualdad de la clave canónica;
+2. si no hay igualdad, por similitud de tokens contra los candidatos que
+   comparten el prefijo de al menos un token (índice de bloques), no contra
+   todo el vocabulario. La similitud es el Jaccard de tokens coincidentes.
+
+Dos tokens coinciden si son iguales o, para tolerar errores de digitación
+('ASISITENTE'), si ambos tienen al menos ``LARGO_MINIMO_ERRATA`` caracteres y
+están a una edición (inserción, borrado, sustitución o trasposición) de
+distancia. Un token que ya es palabra del vocabulario no es una errata y solo
+coincide consigo mismo: así 'ELÉCTRICA' no se confunde con 'ELECTRÓNICA' ni
+'ROSAL' con 'ROSA'. Un nombre sin pareja queda sin emparejar (-1).
+
+El resultado es un código entero por nombre; los cruces entre fuentes se hacen
+sobre esos códigos. Solo se emparejan los valores distintos (las categorías),
+no cada fila.
+"""
+import unicodedata
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+# Similitud mínima entre nombres para aceptar un emparejamiento aproximado
+UMBRAL = 0.8
+# Largo mínimo de un token para aceptarlo con una errata
+LARGO_MINIMO_ERRATA = 6
+
+# Caracteres iniciales de cada token que forman la llave de bloque
+LARGO_BLOQUE = 3
+
+CONECTORES = frozenset({'A', 'AL', 'CON', 'DE', 'DEL', 'E', 'EL', 'EN', 'LA', 'LAS', 'LOS', 'PARA', 'POR', 'Y'})
+
+
+@lru_cache(maxsize=1 << 16)
+def clave_canonica(nombre):
+    """'Ingeniería en Informática' → 'INGENIERIA INFORMATICA'."""
+    texto = unicodedata.normalize('NFKD', str(nombre))
+    texto = ''.join(c for c in texto if not unicodedata.combining(c)).upper()
+    texto = ''.join(c if c.isalnum() else ' ' for c in texto)
+    return ' '.join(t for t in texto.split() if t not in CONECTORES)
+
+
+def _bloques(tokens):
+    return {token[:LARGO_BLOQUE] for token in tokens}
+
+
+def _valores_y_codigos(valores):
+    """Valores distintos y, por fila, su posición entre ellos (-1 para nulos)."""
+    serie = valores if isinstance(getattr(valores, 'dtype', None), pd.CategoricalDtype) else pd.Series(valores).astype('category')
+    return serie.cat.categories, serie.cat.codes.to_numpy()
+
+
+def _una_edicion(a, b):
+    """Indica si ``a`` y ``b`` (distintos) están a una edición de distancia."""
+    if len(a) > len(b):
+        a, b = b, a
+    if len(b) - len(a) > 1:
+        return False
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    if len(a) < len(b):
+        return a[i:] == b[i + 1:]
+    return a[i + 1:] == b[i + 1:] or (a[i + 2:] == b[i + 2:] and a[i:i + 2] == b[i:i + 2][::-1])
+
+
+@lru_cache(maxsize=1 << 16)
+def _parecido(a, b):
+    if a == b:
+        return True
+    return min(len(a), len(b)) >= LARGO_MINIMO_ERRATA and _una_edicion(a, b)
+
+
+def similitud(tokens_a, tokens_b, exactos=frozenset()):
+    """Jaccard de tokens donde dos tokens cuentan como iguales si son el mismo
+    con a lo sumo una errata; los de ``tokens_a`` que están en ``exactos``
+    deben coincidir tal cual."""
+    if not tokens_a or not tokens_b:
+        return 0.0
+    libres = list(tokens_b)
+    comunes = 0
+    for token in tokens_a:
+        for i, otro in enumerate(libres):
+            if token == otro or (token not in exactos and _parecido(token, otro)):
+                comunes += 1
+                del libres[i]
+                break
+    return comunes / (len(tokens_a) + len(tokens_b) - comunes)
+
+
+class Emparejador:
+    """Empareja nombres con un vocabulario de referencia y devuelve su posición en él.
+
+    Las claves canónicas repetidas en la referencia son ambiguas y no se
+    emparejan con nada. Los tokens de la referencia forman el vocabulario: un
+    token de la consulta que esté en él no se acepta como errata de otro.
+    """
+
+    def __init__(self, referencia=(), umbral=UMBRAL):
+        self.referencia = []
+        self.umbral = umbral
+        self._exactas = {}
+        self._tokens = []
+        self._palabras = set()
+        self._bloques = {}
+        self._memoria = {}
+        for valor in referencia:
+            self.agregar(valor)
+
+    def __len__(self):
+        return len(self.referencia)
+
+    def agregar(self, valor):
+        """Agrega ``valor`` a la referencia y devuelve su posición."""
+        clave = clave_canonica(valor)
+        posicion = len(self.referencia)
+        self.referencia.append(valor)
+        self._tokens.append(tuple(clave.split()))
+        self._palabras.update(self._tokens[posicion])
+        anterior = self._exactas.get(clave)
+        if anterior is None:
+            self._exactas[clave] = posicion
+            for bloque in _bloques(self._tokens[posicion]):
+                self._bloques.setdefault(bloque, []).append(posicion)
+        elif anterior >= 0:
+            # Clave repetida: deja de ser emparejable
+            self._exactas[clave] = -1
+            for bloque in _bloques(self._tokens[anterior]):
+                self._bloques[bloque].remove(anterior)
+        self._memoria.clear()
+        return posicion
+
+    def _candidatos(self, tokens):
+        candidatos = set()
+        for bloque in _bloques(tokens):
+            candidatos.update(self._bloques.get(bloque, ()))
+        return sorted(candidatos)
+
+    def emparejar_clave(self, clave):
+        """Posición en la referencia de una clave canónica (-1 si no hay pareja)."""
+        if clave not in self._memoria:
+            posicion = self._exactas.get(clave)
+            if posicion is None:
+                posicion, mejor = -1, self.umbral
+                tokens = tuple(clave.split())
+                for candidato in self._candidatos(tokens):
+                    otros = self._tokens[candidato]
+                    # Ni con todos los tokens iguales alcanzaría el umbral
+                    if min(len(tokens), len(otros)) < mejor * max(len(tokens), len(otros)):
+                        continue
+                    puntaje = similitud(tokens, otros, self._palabras)
+                    if puntaje > mejor or (posicion < 0 and puntaje == mejor):
+                        posicion, mejor = candidato, puntaje
+            self._memoria[clave] = posicion
+        return self._memoria[clave]
+
+    def emparejar(self, valores):
+        """Posición en la referencia de cada valor (-1 si no hay pareja o es nulo)."""
+        distintos, codigos = _valores_y_codigos(valores)
+        posiciones = [self.emparejar_clave(clave_canonica(v)) for v in distintos]
+        # El código -1 (nulo) toma el último elemento
+        return np.array(posiciones + [-1], dtype=np.int64)[codigos]
+
+
+def unificar(*columnas, umbral=UMBRAL):
+    """Códigos enteros comunes para varias columnas de nombres.
+
+    Cada nombre se empareja con los ya vistos y, si no se parece a ninguno, se
+    agrega como entrada nueva. Devuelve ``(nombres, codigos)``: el nombre de
+    cada código (el primero que se vio) y un arreglo de códigos por columna
+    (-1 para nulos).
+    """
+    vocabulario = Emparejador(umbral=umbral)
+    codigos = []
+    for columna in columnas:
+        distintos, codigos_columna = _valores_y_codigos(columna)
+        posiciones = []
+        for valor in distintos:
+            posicion = vocabulario.emparejar_clave(clave_canonica(valor))
+            posiciones.append(posicion if posicion >= 0 else vocabulario.agregar(valor))
+        codigos.append(np.array(posiciones + [-1], dtype=np.int64)[codigos_columna])
+    return pd.Index(vocabulario.referencia), codigos
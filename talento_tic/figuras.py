@@ -0,0 +1,159 @@
+"""Figuras de Plotly del tablero y caché de su JSON serializado.
+
+Construir una figura con ``plotly.express`` toma decenas o cientos de
+milisegundos (valida cada propiedad), mucho más que dibujarla. El caché guarda
+el JSON de cada figura con llave (versión de datos, tipo de figura, estado de
+los filtros) y expulsa la usada hace más tiempo cuando se llena. En un acierto
+la figura se rearma desde el JSON sin validar, lo que cuesta unos pocos
+milisegundos.
+
+El caché es del proceso: lo comparten todas las sesiones del tablero.
+"""
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import plotly.express as px
+import plotly.graph_objects as go
+import plotly.io as pio
+
+from talento_tic import instrumentacion
+
+MAX_FIGURAS = int(os.environ.get('TALENTO_TIC_MAX_FIGURAS', 64))
+
+
+def figura_top_municipios(df_municipios_filtrado):
+    return px.bar(df_municipios_filtrado,
+                  x='Municipio',
+                  y='ID_CARGO',
+                  color='Cargo_identificado',
+                  labels={'Cargo_identificado': 'Perfil', 'ID_CARGO': 'Cantidad Demandada'},
+                  barmode='group')
+
+
+def figura_mapa(df_graduados_tic):
+    return px.scatter_mapbox(df_graduados_tic, lat='Latitud', lon='Longitud', size='graduados_2023',
+                             color='graduados_2023',
+                             color_continuous_scale='blackbody',
+                             zoom=4.5,
+                             size_max=35,
+                             hover_data='graduados_2023',
+                             hover_name='MUNICIPIO',
+                             opacity=0.60,
+                             mapbox_style='open-street-map',
+                             height=600)
+
+
+def figura_demanda_municipio(df_demanda_municipio):
+    return px.pie(df_demanda_municipio,
+                  values='Cargos_demandados',
+                  names='MUNICIPIO',
+                  color='MUNICIPIO',
+                  width=8000,
+                  height=550,
+                  hole=0.5)
+
+
+# Versiones en Plotly de los gráficos nativos de Streamlit, para los reportes
+# estáticos (talento_tic.reportes)
+
+def figura_demanda_perfiles(df_demanda_perfiles):
+    return px.bar(df_demanda_perfiles, x='Cargo_identificado', y='Total demandados',
+                  labels={'Cargo_identificado': 'Perfil'})
+
+
+def figura_variacion_matricula(df_deficit_formacion):
+    return px.bar(df_deficit_formacion,
+                  x='VARIACION_PORCENTUAL_2018_2017',
+                  y='Cargo u oficio por entrevistados',
+                  color='VARIACION_PORCENTUAL_2018_2017',
+                  orientation='h',
+                  labels={'VARIACION_PORCENTUAL_2018_2017': 'Variación % 2017-2018',
+                          'Cargo u oficio por entrevistados': 'Cargo TIC'},
+                  height=900)
+
+
+def figura_oferta_demanda(df_of_dem):
+    return px.line(df_of_dem, x='MUNICIPIO', y=['Cargos_demandados', 'graduados_2023'], height=700)
+
+
+def figura_brechas_municipio(df_brechas_municipio):
+    return px.bar(df_brechas_municipio, x='MUNICIPIO', y=['Cargos_demandados', 'graduados_2023'],
+                  barmode='group', height=600)
+
+
+def figura_brechas_programa(df_brechas_programa, anio=2018):
+    return px.bar(df_brechas_programa, x='PROGRAMA', y=['Cargos_demandados', f'Matriculados_{anio}'],
+                  barmode='group', height=600)
+
+
+def figura_brechas_cargo(df_brechas_cargo, anio=2018):
+    return px.bar(df_brechas_cargo, x='CARGO', y=['Cargos_demandados', f'Matriculados_{anio}'],
+                  barmode='group', height=600)
+
+
+def estado_filtros(filtros):
+    """Versión hashable de un diccionario de filtros dimensión → valores."""
+    return tuple(sorted((dimension, tuple(valores)) for dimension, valores in filtros.items()))
+
+
+class CacheFiguras:
+    """LRU de figuras serializadas como JSON."""
+
+    def __init__(self, max_entradas=MAX_FIGURAS):
+        self.max_entradas = max_entradas
+        self.aciertos = 0
+        self.fallos = 0
+        self._entradas = OrderedDict()
+        self._candado = threading.Lock()
+
+    def __len__(self):
+        return len(self._entradas)
+
+    def obtener(self, llave, construir):
+        """Figura de ``llave``; si no está en el caché se arma con ``construir()``."""
+        with self._candado:
+            texto = self._entradas.get(llave)
+            if texto is not None:
+                self._entradas.move_to_end(llave)
+                self.aciertos += 1
+        if texto is None:
+            instrumentacion.fallo_cache('figuras')
+            with instrumentacion.tramo('construir figura', 'figura'):
+                fig = construir()
+            with instrumentacion.tramo('serializar figura', 'figura'):
+                texto = pio.to_json(fig, validate=False)
+            with self._candado:
+                self.fallos += 1
+                self._entradas[llave] = texto
+                self._entradas.move_to_end(llave)
+                while len(self._entradas) > self.max_entradas:
+                    self._entradas.popitem(last=False)
+        else:
+            instrumentacion.acierto_cache('figuras')
+        # El JSON salió de una figura ya validada
+        with instrumentacion.tramo('rearmar figura', 'figura'):
+            return go.Figure(json.loads(texto), _validate=False)
+
+    def limpiar(self):
+        with self._candado:
+            self._entradas.clear()
+
+    def estadisticas(self):
+        """``{'entradas', 'aciertos', 'fallos'}`` leídos a la vez."""
+        with self._candado:
+            return {'entradas': len(self._entradas), 'aciertos': self.aciertos, 'fallos': self.fallos}
+
+
+_cache = CacheFiguras()
+
+
+def figura(version, tipo, estado, construir):
+    """Figura ``tipo`` de la versión de datos ``version`` con los filtros ``estado``."""
+    return _cache.obtener((version, tipo, estado), construir)
+
+
+def estadisticas():
+    """Entradas, aciertos y fallos del caché de figuras desde que arrancó el proceso."""
+    return _cache.estadisticas()
@@ -0,0 +1,62 @@
+"""Ubicación, tipos y lectura de las fuentes de datos.
+
+La versión de cada fuente por contenido está en ``talento_tic.registro``.
+"""
+import os
+from functools import partial
+
+import pandas as pd
+
+from talento_tic import carga
+
+# Por defecto los CSV viven en la raíz del proyecto; la variable de entorno
+# permite apuntar a otro directorio (por ejemplo, extractos nacionales).
+DIRECTORIO_DATOS = os.environ.get(
+    'TALENTO_TIC_DATOS',
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+)
+
+ARCHIVO_PERFILES = 'perfiles_referenciados.csv'
+ARCHIVO_FORMACION = 'formacion_2017_1018.csv'
+ARCHIVO_GRADUADOS = 'graduados_tic_2023.csv'
+
+ARCHIVOS = (ARCHIVO_PERFILES, ARCHIVO_FORMACION, ARCHIVO_GRADUADOS)
+
+# Tipos de las columnas de cada fuente. Los textos repetidos se leen como
+# categóricos para que cada valor distinto se guarde una sola vez.
+TIPOS = {
+    ARCHIVO_PERFILES: {
+        'ID_CARGO': 'int32',
+        'Ocupación_CIUO': 'category',
+        'Ocupación_CNO': 'category',
+        'Cargo_identificado': 'category',
+        'Municipio': 'category',
+        'Nivel Educativo': 'category',
+        'programas_formar_ocupación': 'category',
+        'Competencias': 'category',
+        'Tipo_de_Competencia': 'category',
+    },
+    ARCHIVO_FORMACION: {
+        'Tipo': 'category',
+        'Cargo u oficio por entrevistados': 'category',
+        'NIVEL': 'category',
+        'PROGRAMA': 'category',
+        'MUNICIPIO': 'category',
+    },
+    # Tabla pequeña a la que el tablero le agrega filas; se deja sin categóricos
+    ARCHIVO_GRADUADOS: {},
+}
+
+
+def ruta(archivo, directorio=None):
+    return os.path.join(directorio or DIRECTORIO_DATOS, archivo)
+
+
+def leer_csv(archivo, directorio=None):
+    return pd.read_csv(ruta(archivo, directorio), dtype=TIPOS[archivo])
+
+
+def cargar_datos(directorio=None):
+    """(perfiles, formación, graduados) leídos de los CSV en paralelo."""
+    datos = carga.cargar_fuentes({archivo: partial(leer_csv, archivo, directorio) for archivo in ARCHIVOS})
+    return tuple(datos.values())
@@ -0,0 +1,205 @@
+"""Actualización incremental de fuentes a las que solo se les agregan filas.
+
+Para cada fuente se guarda, junto a los snapshots, una marca de agua con el
+byte hasta el que ya se procesó el archivo, las filas leídas, la cabecera y
+una huella de los últimos bytes procesados, además del acumulado resultante
+(``streaming.AcumuladorPerfiles`` para perfiles, las filas para graduados) y
+el acumulado del reporte de calidad.
+
+En cada actualización solo se interpretan los bytes agregados después de la
+marca, hasta la última línea completa, y se pliegan en el acumulado guardado.
+Si el archivo se acortó, cambió la cabecera o cambiaron los bytes ya
+procesados, se reconstruye desde cero.
+"""
+import hashlib
+import io
+import os
+import pickle
+import threading
+from dataclasses import dataclass
+from functools import partial
+
+import pandas as pd
+
+from talento_tic import calidad, carga, divipola, fuentes, snapshot
+from talento_tic.streaming import FILAS_POR_BLOQUE, AcumuladorPerfiles, usar_streaming
+
+# Bytes previos a la marca que se comparan para detectar reescrituras
+TAMANO_COLA = 64 * 1024
+
+# Se incrementa cuando cambian los acumulados que se guardan en el estado
+VERSION_ESTADO = 3
+
+
+@dataclass
+class Marca:
+    offset: int = 0
+    filas: int = 0
+    cabecera: bytes = b''
+    huella_cola: str = ''
+
+
+class AcumuladorFilas:
+    """Acumulado trivial para fuentes pequeñas: conserva las filas."""
+
+    def __init__(self):
+        self.df = None
+
+    def agregar_bloque(self, df):
+        self.df = df.reset_index(drop=True) if self.df is None else pd.concat([self.df, df], ignore_index=True)
+        return self
+
+    def resultado(self):
+        return self.df
+
+
+class _Tramo(io.RawIOBase):
+    """Lectura de ``prefijo`` seguido de los bytes [inicio, fin) de un archivo."""
+
+    def __init__(self, ruta, inicio, fin, prefijo=b''):
+        self._archivo = open(ruta, 'rb')
+        self._archivo.seek(inicio)
+        self._restante = fin - inicio
+        self._prefijo = prefijo
+
+    def readable(self):
+        return True
+
+    def readinto(self, destino):
+        if self._prefijo:
+            n = min(len(destino), len(self._prefijo))
+            destino[:n] = self._prefijo[:n]
+            self._prefijo = self._prefijo[n:]
+            return n
+        datos = self._archivo.read(min(len(destino), self._restante))
+        destino[:len(datos)] = datos
+        self._restante -= len(datos)
+        return len(datos)
+
+    def close(self):
+        self._archivo.close()
+        super().close()
+
+
+def _huella_cola(archivo, offset):
+    inicio = max(0, offset - TAMANO_COLA)
+    archivo.seek(inicio)
+    return hashlib.sha256(archivo.read(offset - inicio)).hexdigest()
+
+
+def _fin_ultima_linea(archivo, desde, tamano, paso=TAMANO_COLA):
+    """Posición justo después del último salto de línea en [desde, tamano)."""
+    fin = tamano
+    while fin > desde:
+        inicio = max(desde, fin - paso)
+        archivo.seek(inicio)
+        posicion = archivo.read(fin - inicio).rfind(b'\n')
+        if posicion >= 0:
+            return inicio + posicion + 1
+        fin = inicio
+    return desde
+
+
+def _marca_valida(archivo, marca, tamano):
+    if tamano < marca.offset:
+        return False
+    archivo.seek(0)
+    if archivo.readline() != marca.cabecera:
+        return False
+    return _huella_cola(archivo, marca.offset) == marca.huella_cola
+
+
+class FuenteIncremental:
+    """Estado incremental de una fuente CSV y su acumulado."""
+
+    def __init__(self, archivo, crear_acumulador, directorio=None, filas_por_bloque=FILAS_POR_BLOQUE):
+        self.archivo = archivo
+        self.crear_acumulador = crear_acumulador
+        self.directorio = directorio
+        self.filas_por_bloque = filas_por_bloque
+        self.ruta = fuentes.ruta(archivo, directorio)
+        self.ruta_estado = os.path.join(
+            snapshot.directorio_snapshot(directorio), 'incremental', os.path.splitext(archivo)[0] + '.pkl'
+        )
+
+    def _cargar_estado(self):
+        try:
+            with open(self.ruta_estado, 'rb') as f:
+                estado = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            estado = None
+        # Un estado ilegible o de un formato anterior obliga a reconstruir
+        if not isinstance(estado, tuple) or len(estado) != 4 or estado[0] != VERSION_ESTADO:
+            return Marca(), None, None
+        return estado[1:]
+
+    def _guardar_estado(self, marca, acumulador, acumulador_calidad):
+        os.makedirs(os.path.dirname(self.ruta_estado), exist_ok=True)
+        temporal = f'{self.ruta_estado}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(temporal, 'wb') as f:
+            pickle.dump((VERSION_ESTADO, marca, acumulador, acumulador_calidad), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporal, self.ruta_estado)
+
+    def actualizar(self):
+        """Pliega las filas nuevas en el acumulado y devuelve ``(acumulador, filas_nuevas)``."""
+        marca, acumulador, acumulador_calidad = self._cargar_estado()
+        tamano = os.path.getsize(self.ruta)
+        with open(self.ruta, 'rb') as archivo:
+            if acumulador is None or not _marca_valida(archivo, marca, tamano):
+                archivo.seek(0)
+                marca, acumulador = Marca(cabecera=archivo.readline()), self.crear_acumulador()
+                acumulador_calidad = calidad.AcumuladorCalidad(self.archivo)
+            fin = _fin_ultima_linea(archivo, marca.offset, tamano)
+            if fin == marca.offset:
+                return acumulador, 0
+            cola = _huella_cola(archivo, fin)
+
+        # En la primera lectura la cabecera ya está dentro del tramo
+        prefijo = marca.cabecera if marca.offset else b''
+        tramo = io.BufferedReader(_Tramo(self.ruta, marca.offset, fin, prefijo))
+        filas_nuevas = 0
+        with pd.read_csv(tramo, dtype=fuentes.TIPOS[self.archivo], chunksize=self.filas_por_bloque) as lector:
+            for bloque in lector:
+                acumulador.agregar_bloque(bloque)
+                acumulador_calidad.agregar_bloque(bloque)
+                filas_nuevas += len(bloque)
+
+        marca = Marca(offset=fin, filas=marca.filas + filas_nuevas, cabecera=marca.cabecera, huella_cola=cola)
+        self._guardar_estado(marca, acumulador, acumulador_calidad)
+        calidad.guardar_reporte(acumulador_calidad.resultado(self.directorio), self.directorio)
+        return acumulador, filas_nuevas
+
+
+def actualizar_perfiles(directorio=None):
+    """Modelo de perfiles actualizado con las filas agregadas desde la última lectura."""
+    fuente = FuenteIncremental(fuentes.ARCHIVO_PERFILES, AcumuladorPerfiles, directorio)
+    acumulador, _ = fuente.actualizar()
+    return acumulador.resultado()
+
+
+def actualizar_graduados(directorio=None):
+    """Graduados actualizados con las filas agregadas desde la última lectura."""
+    fuente = FuenteIncremental(fuentes.ARCHIVO_GRADUADOS, AcumuladorFilas, directorio)
+    acumulador, _ = fuente.actualizar()
+    return acumulador.resultado()
+
+
+def cargar_archivos(archivos=fuentes.ARCHIVOS, directorio=None):
+    """Como ``snapshot.cargar_archivos`` pero con perfiles y graduados actualizados por incrementos."""
+    cargadores = {
+        fuentes.ARCHIVO_PERFILES: partial(actualizar_perfiles, directorio),
+        fuentes.ARCHIVO_FORMACION: partial(snapshot.cargar_fuente, fuentes.ARCHIVO_FORMACION, directorio),
+        fuentes.ARCHIVO_GRADUADOS: partial(actualizar_graduados, directorio),
+        divipola.ARCHIVO_DIVIPOLA: partial(divipola.cargar_catalogo, directorio),
+    }
+    return carga.cargar_fuentes({archivo: cargadores[archivo] for archivo in archivos})
+
+
+def cargar_datos(directorio=None):
+    """Como ``snapshot.cargar_datos`` pero con perfiles y graduados actualizados por incrementos."""
+    return tuple(cargar_archivos(fuentes.ARCHIVOS, directorio).values())
+
+
+def usar_incremental(directorio=None):
+    """Modo incremental: forzado con TALENTO_TIC_INCREMENTAL=1 o automático para extractos grandes."""
+    return os.environ.get('TALENTO_TIC_INCREMENTAL') == '1' or usar_streaming(directorio)
@@ -0,0 +1,183 @@
+"""Índice invertido competencia ↔ cargo.
+
+Se construye una sola vez al ingerir perfiles y guarda dos juegos de listas de
+publicación comprimidas:
+
+* por competencia, las posiciones (en ``modelo.cargos``) de los cargos que la
+  piden;
+* por cargo, los códigos de sus competencias.
+
+Cada lista está ordenada y se guarda como diferencias con el elemento
+anterior codificadas en varint (7 bits por byte, el bit alto indica que el
+número sigue), todas concatenadas en un solo arreglo de bytes con su offset
+por lista. Una consulta solo decodifica las listas de las competencias
+pedidas; las consultas Y recorren de la lista más corta a la más larga.
+"""
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from talento_tic.conteo import corridas, longitud_bits
+
+COMPETENCIA = 'Competencias'
+
+# Nombres de los arreglos que se guardan como .npy
+ARREGLOS = ('ids', 'datos', 'offsets', 'conteo', 'datos_cargo', 'offsets_cargo', 'conteo_cargo')
+
+
+def codificar_listas(listas, elementos, n_listas):
+    """Codifica listas ordenadas y sin repetidos en un solo arreglo de bytes.
+
+    ``listas`` y ``elementos`` vienen ordenados por (lista, elemento). Devuelve
+    ``(datos, offsets, conteo)``: los bytes, el offset de inicio de cada lista
+    (``n_listas + 1`` valores) y el número de elementos de cada una.
+    """
+    listas = np.asarray(listas, dtype=np.int64)
+    elementos = np.asarray(elementos, dtype=np.int64)
+    conteo = np.bincount(listas, minlength=n_listas).astype(np.int64)
+    if len(elementos) == 0:
+        return np.zeros(0, dtype=np.uint8), np.zeros(n_listas + 1, dtype=np.int64), conteo
+
+    nueva = np.r_[True, listas[1:] != listas[:-1]]
+    deltas = np.where(nueva, elementos, elementos - np.r_[0, elementos[:-1]]).astype(np.uint64)
+    n_bytes = np.maximum(1, (longitud_bits(deltas) + 6) // 7)
+    inicio = np.cumsum(n_bytes) - n_bytes
+    valor = np.repeat(np.arange(len(deltas)), n_bytes)
+    posicion = np.arange(int(n_bytes.sum())) - inicio[valor]
+    datos = ((deltas[valor] >> (7 * posicion).astype(np.uint64)) & np.uint64(0x7F)).astype(np.uint8)
+    datos[posicion < n_bytes[valor] - 1] |= 0x80
+
+    bytes_lista = np.bincount(listas, weights=n_bytes, minlength=n_listas).astype(np.int64)
+    return datos, np.r_[0, np.cumsum(bytes_lista)], conteo
+
+
+def decodificar_lista(datos, inicio, fin):
+    """Elementos de la lista guardada en ``datos[inicio:fin]``."""
+    trozo = np.asarray(datos[inicio:fin])
+    if len(trozo) == 0:
+        return np.zeros(0, dtype=np.int64)
+    ultimo = trozo < 0x80
+    if ultimo.all():
+        # Caso común: todas las diferencias caben en un byte
+        return np.cumsum(trozo, dtype=np.int64)
+    inicios = np.flatnonzero(np.r_[True, ultimo[:-1]])
+    grupo = np.cumsum(np.r_[0, ultimo[:-1]])
+    posicion = np.arange(len(trozo)) - inicios[grupo]
+    partes = (trozo & 0x7F).astype(np.int64) << (7 * posicion)
+    return np.cumsum(np.add.reduceat(partes, inicios))
+
+
+class IndiceCompetencias:
+
+    def __init__(self, competencias, arreglos):
+        self.competencias = competencias
+        self.arreglos = arreglos
+        self._codigos = pd.Series(np.arange(len(competencias)), index=competencias)
+
+    @property
+    def ids(self):
+        """``ID_CARGO`` de cada posición de cargo."""
+        return self.arreglos['ids']
+
+    def _lista(self, prefijo, i):
+        offsets = self.arreglos['offsets' + prefijo]
+        return decodificar_lista(self.arreglos['datos' + prefijo], offsets[i], offsets[i + 1])
+
+    def cargos(self, competencia):
+        """Posiciones de los cargos que piden ``competencia`` (vacío si no existe)."""
+        codigo = self._codigos.get(competencia)
+        if codigo is None:
+            return np.zeros(0, dtype=np.int64)
+        return self._lista('', codigo)
+
+    def buscar(self, competencias, todas=True):
+        """Posiciones de los cargos con todas (Y) o alguna (O) de las ``competencias``."""
+        competencias = list(competencias)
+        if not competencias:
+            return np.zeros(0, dtype=np.int64)
+        if not todas:
+            return np.unique(np.concatenate([self.cargos(c) for c in competencias]))
+        # Y: de la lista más corta a la más larga, cortando si queda vacía
+        conteo = self.arreglos['conteo']
+        codigos = [self._codigos.get(c) for c in competencias]
+        if any(c is None for c in codigos):
+            return np.zeros(0, dtype=np.int64)
+        codigos.sort(key=lambda c: conteo[c])
+        resultado = self._lista('', codigos[0])
+        for codigo in codigos[1:]:
+            if len(resultado) == 0:
+                break
+            resultado = np.intersect1d(resultado, self._lista('', codigo), assume_unique=True)
+        return resultado
+
+    def competencias_de(self, posicion):
+        """Competencias del cargo en ``posicion``."""
+        return self.competencias[self._lista('_cargo', posicion)]
+
+    def frecuencias(self):
+        """Número de cargos por competencia, de mayor a menor."""
+        conteo = pd.Series(np.asarray(self.arreglos['conteo']), index=self.competencias, name='cargos')
+        return conteo.sort_values(ascending=False, kind='stable')
+
+    def guardar(self, directorio):
+        """Guarda los arreglos como ``.npy`` y los nombres de las competencias como JSON."""
+        os.makedirs(directorio, exist_ok=True)
+        for nombre in ARREGLOS:
+            np.save(os.path.join(directorio, f'{nombre}.npy'), self.arreglos[nombre])
+        with open(os.path.join(directorio, 'competencias.json'), 'w', encoding='utf-8') as f:
+            json.dump(list(map(str, self.competencias)), f, ensure_ascii=False)
+
+    @classmethod
+    def abrir(cls, directorio):
+        """Abre un índice guardado con sus arreglos mapeados en memoria (solo lectura)."""
+        with open(os.path.join(directorio, 'competencias.json'), encoding='utf-8') as f:
+            competencias = pd.Index(json.load(f))
+        arreglos = {
+            nombre: np.load(os.path.join(directorio, f'{nombre}.npy'), mmap_mode='r') for nombre in ARREGLOS
+        }
+        return cls(competencias, arreglos)
+
+
+def claves_pares(codigos_competencia, ids_cargo):
+    """Claves enteras ordenadas y sin repetidos de los pares (competencia, ID_CARGO)."""
+    codigos_competencia = np.asarray(codigos_competencia, dtype=np.int64)
+    ids_cargo = np.asarray(ids_cargo, dtype=np.int64)
+    validos = (codigos_competencia >= 0) & (ids_cargo >= 0)
+    claves, _ = corridas(np.sort((codigos_competencia[validos] << 32) | ids_cargo[validos]))
+    return claves
+
+
+def indice_desde_claves(claves, competencias, ids):
+    """Índice a partir de las claves de ``claves_pares`` y los ``ID_CARGO`` por posición."""
+    ids = np.asarray(ids, dtype=np.int64)
+    n_cargos, n_competencias = len(ids), len(competencias)
+    codigo = claves >> 32
+    posicion = pd.Index(ids).get_indexer(claves & 0xFFFFFFFF)
+    codigo, posicion = codigo[posicion >= 0], posicion[posicion >= 0]
+
+    # Las claves vienen ordenadas por competencia, pero no por posición del cargo
+    orden = np.lexsort((posicion, codigo))
+    datos, offsets, conteo = codificar_listas(codigo[orden], posicion[orden], n_competencias)
+    orden = np.lexsort((codigo, posicion))
+    datos_cargo, offsets_cargo, conteo_cargo = codificar_listas(posicion[orden], codigo[orden], n_cargos)
+    return IndiceCompetencias(pd.Index(competencias), {
+        'ids': ids,
+        'datos': datos,
+        'offsets': offsets,
+        'conteo': conteo,
+        'datos_cargo': datos_cargo,
+        'offsets_cargo': offsets_cargo,
+        'conteo_cargo': conteo_cargo,
+    })
+
+
+def construir_indice(modelo):
+    """Índice a partir de la tabla de enlace de un ``ModeloPerfiles``."""
+    enlace = modelo.cargo_competencia
+    competencias = enlace[COMPETENCIA]
+    if not isinstance(competencias.dtype, pd.CategoricalDtype):
+        competencias = competencias.astype('category')
+    claves = claves_pares(competencias.cat.codes.to_numpy(), enlace['ID_CARGO'].to_numpy())
+    return indice_desde_claves(claves, competencias.cat.categories, modelo.cargos['ID_CARGO'].to_numpy())
@@ -0,0 +1,222 @@
+"""Trazas de tiempo, contadores de caché y memoria de cada rerun del tablero.
+
+Una traza agrupa los tramos (``tramo``) de una ejecución del script: carga,
+transformaciones y dibujo de cada vista, con su duración y anidamiento. La
+traza activa vive en una variable de contexto, así que los módulos del paquete
+pueden abrir tramos o contar aciertos y fallos de caché sin recibirla como
+argumento; sin traza activa (procesos por lotes, benchmarks) no hacen nada.
+
+Las trazas terminadas se guardan en un historial del proceso con las últimas
+``MAX_TRAZAS`` y se pueden exportar en el formato de eventos de Chrome
+(``chrome://tracing`` o Perfetto) para analizarlas fuera del tablero.
+"""
+import functools
+import json
+import os
+import resource
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+MAX_TRAZAS = int(os.environ.get('TALENTO_TIC_MAX_TRAZAS', 50))
+
+_traza_actual = ContextVar('traza_actual', default=None)
+
+
+def memoria():
+    """Memoria residente actual y pico del proceso, en MB."""
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    try:
+        with open('/proc/self/statm') as f:
+            residente = int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1 << 20)
+    except OSError:
+        residente = pico
+    return {'residente_mb': round(residente, 1), 'pico_mb': round(pico, 1)}
+
+
+class Traza:
+    """Tramos y contadores de una ejecución."""
+
+    def __init__(self, nombre):
+        self.nombre = nombre
+        self.inicio = time.time()
+        self.duracion_ms = None
+        self.tramos = []
+        self.contadores = Counter()
+        self.memoria = None
+        self.hilo = threading.get_ident()
+        self._origen = time.perf_counter()
+        self._profundidad = 0
+
+    @contextmanager
+    def tramo(self, nombre, categoria):
+        registro = {'nombre': nombre, 'categoria': categoria, 'profundidad': self._profundidad,
+                    'inicio_ms': (time.perf_counter() - self._origen) * 1000}
+        self._profundidad += 1
+        try:
+            yield registro
+        finally:
+            self._profundidad -= 1
+            registro['duracion_ms'] = (time.perf_counter() - self._origen) * 1000 - registro['inicio_ms']
+            self.tramos.append(registro)
+
+    def agregar_tramo(self, nombre, categoria, inicio, fin):
+        """Tramo ya medido (con ``time.perf_counter``), por ejemplo en otro hilo."""
+        self.tramos.append({'nombre': nombre, 'categoria': categoria, 'profundidad': self._profundidad,
+                            'inicio_ms': (inicio - self._origen) * 1000, 'duracion_ms': (fin - inicio) * 1000})
+
+    def terminar(self):
+        self.duracion_ms = (time.perf_counter() - self._origen) * 1000
+        self.memoria = memoria()
+
+    def como_dict(self):
+        return {
+            'nombre': self.nombre,
+            'inicio': self.inicio,
+            'duracion_ms': self.duracion_ms,
+            'memoria': self.memoria,
+            'contadores': dict(self.contadores),
+            'tramos': sorted(self.tramos, key=lambda t: t['inicio_ms']),
+        }
+
+
+class Historial:
+    """Últimas trazas terminadas del proceso (compartidas por todas las sesiones)."""
+
+    def __init__(self, max_trazas=MAX_TRAZAS):
+        self._trazas = deque(maxlen=max_trazas)
+        self._candado = threading.Lock()
+
+    def agregar(self, traza):
+        with self._candado:
+            self._trazas.append(traza)
+
+    def trazas(self):
+        with self._candado:
+            return list(self._trazas)
+
+    def limpiar(self):
+        with self._candado:
+            self._trazas.clear()
+
+
+historial = Historial()
+
+
+def iniciar_traza(nombre='rerun'):
+    """Abre una traza nueva como la activa (descarta una anterior sin terminar)."""
+    traza = Traza(nombre)
+    _traza_actual.set(traza)
+    return traza
+
+
+def terminar_traza():
+    """Cierra la traza activa, la guarda en el historial y la devuelve."""
+    traza = _traza_actual.get()
+    if traza is not None:
+        traza.terminar()
+        historial.agregar(traza)
+        _traza_actual.set(None)
+    return traza
+
+
+def traza_actual():
+    return _traza_actual.get()
+
+
+@contextmanager
+def tramo(nombre, categoria='calculo', cache=None):
+    """Mide el bloque como un tramo de la traza activa.
+
+    Con ``cache`` el bloque es la llamada a una función cacheada: si dentro no
+    se registró un fallo (``fallo_cache``) se cuenta un acierto.
+    """
+    traza = _traza_actual.get()
+    if traza is None:
+        yield None
+        return
+    fallos = traza.contadores[f'cache.{cache}.fallos'] if cache else 0
+    with traza.tramo(nombre, categoria) as registro:
+        yield registro
+    if cache and traza.contadores[f'cache.{cache}.fallos'] == fallos:
+        traza.contadores[f'cache.{cache}.aciertos'] += 1
+
+
+def registrar_tramo(nombre, categoria, inicio, fin):
+    """Agrega a la traza activa un tramo medido fuera de ella (en otro hilo)."""
+    traza = _traza_actual.get()
+    if traza is not None:
+        traza.agregar_tramo(nombre, categoria, inicio, fin)
+
+
+def contar(nombre, cantidad=1):
+    traza = _traza_actual.get()
+    if traza is not None:
+        traza.contadores[nombre] += cantidad
+
+
+def fallo_cache(cache):
+    """Se llama dentro de la función cacheada, que solo se ejecuta en un fallo."""
+    contar(f'cache.{cache}.fallos')
+
+
+def acierto_cache(cache):
+    contar(f'cache.{cache}.aciertos')
+
+
+def trazado(nombre, categoria='vista'):
+    """Decorador: la función es un tramo o, si no hay traza activa (un
+    fragmento que se vuelve a ejecutar solo), abre y cierra su propia traza."""
+    def decorador(funcion):
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            if _traza_actual.get() is not None:
+                with tramo(nombre, categoria):
+                    return funcion(*args, **kwargs)
+            iniciar_traza(nombre)
+            try:
+                with tramo(nombre, categoria):
+                    return funcion(*args, **kwargs)
+            finally:
+                terminar_traza()
+        return envoltura
+    return decorador
+
+
+def resumen_tramos(traza):
+    """Tiempo total, número de llamadas y profundidad por tramo de ``traza``."""
+    resumen = {}
+    for registro in traza.tramos:
+        fila = resumen.setdefault(registro['nombre'], {
+            'Tramo': registro['nombre'], 'Categoría': registro['categoria'],
+            'Profundidad': registro['profundidad'], 'Llamadas': 0, 'Total (ms)': 0.0,
+        })
+        fila['Llamadas'] += 1
+        fila['Total (ms)'] += registro['duracion_ms']
+    return sorted(resumen.values(), key=lambda fila: -fila['Total (ms)'])
+
+
+def eventos_chrome(trazas):
+    """Trazas en el formato de eventos de Chrome, como diccionario."""
+    eventos = []
+    for traza in trazas:
+        base_us = traza.inicio * 1e6
+        datos = traza.como_dict()
+        eventos.append({'name': traza.nombre, 'cat': 'rerun', 'ph': 'X', 'pid': os.getpid(), 'tid': traza.hilo,
+                        'ts': base_us, 'dur': (traza.duracion_ms or 0) * 1000,
+                        'args': {'contadores': datos['contadores'], 'memoria': datos['memoria']}})
+        for registro in datos['tramos']:
+            eventos.append({'name': registro['nombre'], 'cat': registro['categoria'], 'ph': 'X',
+                            'pid': os.getpid(), 'tid': traza.hilo,
+                            'ts': base_us + registro['inicio_ms'] * 1000, 'dur': registro['duracion_ms'] * 1000})
+    return {'traceEvents': eventos, 'displayTimeUnit': 'ms'}
+
+
+def exportar_json(trazas=None):
+    """JSON con las trazas (por defecto, todo el historial) y sus eventos de Chrome."""
+    trazas = historial.trazas() if trazas is None else trazas
+    datos = eventos_chrome(trazas)
+    datos['trazas'] = [traza.como_dict() for traza in trazas]
+    return json.dumps(datos, ensure_ascii=False, indent=1)
@@ -0,0 +1,123 @@
+"""Agregación del mapa de graduados en celdas por nivel de zoom.
+
+Con graduados por institución o por municipio para todo el país, mandar cada
+punto al navegador no escala. Aquí los puntos se agrupan en el servidor en
+hexágonos o en una cuadrícula sobre la proyección Web Mercator, con un tamaño
+de celda de ``PIXELES_CELDA`` píxeles en cada nivel de ``NIVELES_ZOOM``. Las
+celdas de todos los niveles se calculan una sola vez por versión de datos y
+el tablero solo envía las del nivel elegido.
+"""
+import numpy as np
+import pandas as pd
+
+RADIO_TIERRA = 6378137.0
+PIXELES_CELDA = 40
+NIVELES_ZOOM = tuple(range(4, 11))
+
+HEXAGONO = 'hexagono'
+CUADRICULA = 'cuadricula'
+FORMAS = (HEXAGONO, CUADRICULA)
+
+RAIZ_3 = np.sqrt(3.0)
+
+
+def mercator(longitud, latitud):
+    x = RADIO_TIERRA * np.radians(longitud)
+    y = RADIO_TIERRA * np.log(np.tan(np.pi / 4 + np.radians(latitud) / 2))
+    return x, y
+
+
+def geografica(x, y):
+    longitud = np.degrees(x / RADIO_TIERRA)
+    latitud = np.degrees(2 * np.arctan(np.exp(y / RADIO_TIERRA)) - np.pi / 2)
+    return longitud, latitud
+
+
+def tamano_celda(zoom):
+    """Lado de la celda (o radio del hexágono) en metros Mercator para ``zoom``."""
+    return 2 * np.pi * RADIO_TIERRA / (256 * 2.0 ** zoom) * PIXELES_CELDA
+
+
+def _hexagonos(x, y, tamano):
+    """Coordenadas axiales (q, r) del hexágono (punta arriba) que contiene cada punto."""
+    q = (RAIZ_3 / 3 * x - y / 3) / tamano
+    r = (2 / 3 * y) / tamano
+    # Redondeo en coordenadas cúbicas
+    s = -q - r
+    rq, rr, rs = np.round(q), np.round(r), np.round(s)
+    dq, dr, ds = np.abs(rq - q), np.abs(rr - r), np.abs(rs - s)
+    corregir_q = (dq > dr) & (dq > ds)
+    corregir_r = ~corregir_q & (dr > ds)
+    rq = np.where(corregir_q, -rr - rs, rq)
+    rr = np.where(corregir_r, -rq - rs, rr)
+    return rq.astype(np.int64), rr.astype(np.int64)
+
+
+def _centros(forma, i, j, tamano):
+    if forma == HEXAGONO:
+        return tamano * RAIZ_3 * (i + j / 2), tamano * 1.5 * j
+    return (i + 0.5) * tamano, (j + 0.5) * tamano
+
+
+def agregar_celdas(df, forma, zoom, columna='graduados_2023'):
+    """Suma de ``columna`` y número de puntos por celda de ``forma`` en ``zoom``."""
+    df = df.dropna(subset=['Latitud', 'Longitud'])
+    x, y = mercator(df['Longitud'].to_numpy(np.float64), df['Latitud'].to_numpy(np.float64))
+    tamano = tamano_celda(zoom)
+    if forma == HEXAGONO:
+        i, j = _hexagonos(x, y, tamano)
+    else:
+        i, j = np.floor(x / tamano).astype(np.int64), np.floor(y / tamano).astype(np.int64)
+
+    celda, unicas = pd.factorize(pd.MultiIndex.from_arrays([i, j]))
+    valores = df[columna].to_numpy(np.float64)
+    ci = unicas.get_level_values(0).to_numpy(np.int64)
+    cj = unicas.get_level_values(1).to_numpy(np.int64)
+    cx, cy = _centros(forma, ci, cj, tamano)
+    longitud, latitud = geografica(cx, cy)
+    return pd.DataFrame({
+        'forma': forma,
+        'zoom': zoom,
+        'i': ci,
+        'j': cj,
+        'Longitud': longitud,
+        'Latitud': latitud,
+        columna: np.bincount(celda, weights=valores, minlength=len(unicas)).astype(np.int64),
+        'puntos': np.bincount(celda, minlength=len(unicas)),
+    })
+
+
+def precalcular_celdas(df_graduados_tic, niveles=NIVELES_ZOOM, formas=FORMAS):
+    """Celdas de todas las formas y niveles de zoom en una sola tabla larga."""
+    return pd.concat(
+        [agregar_celdas(df_graduados_tic, forma, zoom) for forma in formas for zoom in niveles],
+        ignore_index=True,
+    )
+
+
+def poligonos(celdas):
+    """Vértices (longitud, latitud) de cada celda, para dibujarlas con pydeck."""
+    resultado = []
+    for forma, zoom, i, j in zip(celdas['forma'], celdas['zoom'], celdas['i'], celdas['j']):
+        tamano = tamano_celda(zoom)
+        cx, cy = _centros(forma, i, j, tamano)
+        if forma == HEXAGONO:
+            angulos = np.radians(30 + 60 * np.arange(6))
+            x, y = cx + tamano * np.cos(angulos), cy + tamano * np.sin(angulos)
+        else:
+            medio = tamano / 2
+            x = cx + np.array([-medio, medio, medio, -medio])
+            y = cy + np.array([-medio, -medio, medio, medio])
+        longitud, latitud = geografica(x, y)
+        resultado.append(np.column_stack([longitud, latitud]).tolist())
+    return resultado
+
+
+def celdas_para_mostrar(df_celdas, forma, zoom, columna='graduados_2023'):
+    """Celdas de ``forma`` y ``zoom`` con su polígono y un color según ``columna``."""
+    df = df_celdas[(df_celdas['forma'] == forma) & (df_celdas['zoom'] == zoom)].reset_index(drop=True)
+    df['poligono'] = poligonos(df)
+    maximo = max(int(df[columna].max()), 1) if len(df) else 1
+    intensidad = np.sqrt(df[columna].to_numpy(np.float64) / maximo)
+    df['color'] = [[255, int(200 * (1 - v)), 0, 170] for v in intensidad]
+    return df
@@ -0,0 +1,99 @@
+"""Matriculados en programas TIC por cargo, programa, nivel y municipio.
+
+En formación, los matriculados de un (programa, nivel, municipio) se repiten
+en cada fila de los cargos a los que forma el programa: son un valor de la
+celda, no una cantidad que se pueda sumar fila a fila. Por eso el estado del
+motor es la tabla de celdas distintas (cargo, programa, nivel, municipio) con
+una columna ``TOTAL_MATRICULADOS_<año>`` por año. Dos tablas se combinan
+uniendo sus celdas y, en las repetidas, conservando un solo valor por año, así
+que se pueden construir por partes o sumar años nuevos de SNIES a medida que
+llegan.
+
+Los totales por cualquier subconjunto de dimensiones se suman sobre celdas
+distintas (sin el cargo, cada programa-nivel-municipio cuenta una vez) y la
+variación entre dos años se calcula con esas sumas: es la variación del total
+de matriculados, ponderada por el tamaño de cada programa, y no el promedio de
+las variaciones por fila.
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+CARGO = 'Cargo u oficio por entrevistados'
+PROGRAMA = 'PROGRAMA'
+NIVEL = 'NIVEL'
+MUNICIPIO = 'MUNICIPIO'
+DIMENSIONES = (CARGO, PROGRAMA, NIVEL, MUNICIPIO)
+
+PREFIJO_TOTAL = 'TOTAL_MATRICULADOS_'
+_PATRON_TOTAL = re.compile(rf'^{PREFIJO_TOTAL}(\d{{4}})$')
+
+
+def columna_total(anio):
+    return f'{PREFIJO_TOTAL}{anio}'
+
+
+def columna_variacion(desde, hasta):
+    return f'VARIACION_PORCENTUAL_{hasta}_{desde}'
+
+
+def anios(df):
+    """Años con columna ``TOTAL_MATRICULADOS_<año>`` en ``df``, de menor a mayor."""
+    return sorted(int(m.group(1)) for m in map(_PATRON_TOTAL.match, df.columns) if m)
+
+
+def _celdas(df, dimensiones):
+    """Una fila por celda de ``dimensiones`` con un solo valor por año."""
+    columnas = [columna_total(anio) for anio in anios(df)]
+    return df.groupby(list(dimensiones), observed=True, sort=False)[columnas].max().reset_index()
+
+
+def sumas_matricula(df_formacion):
+    """Tabla de celdas (cargo, programa, nivel, municipio) con sus matriculados por año."""
+    columnas = list(DIMENSIONES) + [columna_total(anio) for anio in anios(df_formacion)]
+    df = df_formacion[columnas].copy()
+    for dimension in DIMENSIONES:
+        df[dimension] = df[dimension].astype('category')
+    return _celdas(df, DIMENSIONES)
+
+
+def combinar(*tablas):
+    """Une tablas de ``sumas_matricula`` (partes del mismo año o años distintos)."""
+    df = pd.concat(tablas, ignore_index=True)
+    for dimension in DIMENSIONES:
+        df[dimension] = df[dimension].astype('category')
+    return _celdas(df, DIMENSIONES)
+
+
+def totales(sumas, por=()):
+    """Matriculados por año sumados por las dimensiones ``por``, sobre celdas distintas."""
+    por = [por] if isinstance(por, str) else list(por)
+    if CARGO not in por:
+        # Sin el cargo, cada programa-nivel-municipio cuenta una sola vez
+        sumas = _celdas(sumas, [d for d in DIMENSIONES if d != CARGO])
+    columnas = [columna_total(anio) for anio in anios(sumas)]
+    if not por:
+        return sumas[columnas].sum(min_count=1).to_frame().T
+    return sumas.groupby(por, observed=True)[columnas].sum(min_count=1).reset_index()
+
+
+def _razon(hasta, desde):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(desde > 0, hasta / desde - 1, np.nan)
+
+
+def variacion(sumas, por=(), desde=None, hasta=None):
+    """Totales de ``desde`` y ``hasta`` por ``por`` y su variación (fracción, no porcentaje).
+
+    Por defecto compara el primer y el último año disponibles.
+    """
+    disponibles = anios(sumas)
+    desde = disponibles[0] if desde is None else desde
+    hasta = disponibles[-1] if hasta is None else hasta
+    df = totales(sumas, por)
+    por = [por] if isinstance(por, str) else list(por)
+    df = df[por + [columna_total(desde), columna_total(hasta)]]
+    df[columna_variacion(desde, hasta)] = _razon(df[columna_total(hasta)].to_numpy(np.float64),
+                                                 df[columna_total(desde)].to_numpy(np.float64))
+    return df
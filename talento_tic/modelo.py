@@ -0,0 +1,78 @@
+"""Modelo normalizado de ``perfiles_referenciados.csv``.
+
+El CSV trae una fila por (cargo, competencia), de modo que los atributos del
+cargo se repiten en cada una de sus competencias. Aquí se separa en:
+
+* ``cargos``: una fila por ``ID_CARGO`` con sus atributos y ``n_competencias``,
+  el número de filas que el cargo tenía en el archivo original.
+* ``cargo_competencia``: tabla de enlace ``ID_CARGO`` → competencia.
+
+La ingesta por bloques (``talento_tic.streaming``) no conserva la tabla de
+enlace; en su lugar guarda directamente el conteo de filas por competencia y
+el índice invertido competencia ↔ cargo (``talento_tic.indice``).
+
+Los textos se guardan como categóricos, es decir, como códigos enteros sobre un
+diccionario de valores.
+"""
+from dataclasses import dataclass
+from typing import Any, Optional
+
+import pandas as pd
+
+
+COLUMNAS_CARGO = [
+    'ID_CARGO',
+    'Ocupación_CIUO',
+    'Ocupación_CNO',
+    'Cargo_identificado',
+    'Municipio',
+    'Nivel Educativo',
+    'programas_formar_ocupación',
+]
+COLUMNAS_COMPETENCIA = ['ID_CARGO', 'Competencias', 'Tipo_de_Competencia']
+
+
+@dataclass
+class ModeloPerfiles:
+    cargos: pd.DataFrame
+    cargo_competencia: Optional[pd.DataFrame] = None
+    conteo_competencias: Optional[pd.DataFrame] = None
+    indice: Optional[Any] = None
+
+    @property
+    def factor_expansion(self):
+        """Filas de competencia por cargo en el archivo original."""
+        return self.cargos['n_competencias'].sum() / max(len(self.cargos), 1)
+
+    def competencias(self):
+        """Filas por (Competencias, Tipo_de_Competencia), de mayor a menor."""
+        if self.conteo_competencias is None:
+            self.conteo_competencias = contar_competencias(self.cargo_competencia)
+        return self.conteo_competencias
+
+
+def _categorico(serie):
+    return serie if isinstance(serie.dtype, pd.CategoricalDtype) else serie.astype('category')
+
+
+def contar_competencias(df):
+    """Cuenta filas por (Competencias, Tipo_de_Competencia)."""
+    conteo = df.groupby(['Competencias', 'Tipo_de_Competencia'], observed=True).size()
+    return conteo.rename('filas').reset_index().sort_values('filas', ascending=False, ignore_index=True)
+
+
+def normalizar_perfiles(df_perfiles):
+    """Separa el DataFrame de perfiles en la tabla de cargos y la de enlace."""
+    columnas_cargo = [c for c in COLUMNAS_CARGO if c in df_perfiles.columns]
+    n_competencias = df_perfiles['ID_CARGO'].value_counts(sort=False)
+
+    df_cargos = df_perfiles[columnas_cargo].drop_duplicates('ID_CARGO').reset_index(drop=True)
+    df_cargos['n_competencias'] = df_cargos['ID_CARGO'].map(n_competencias).astype('int32')
+    for columna in columnas_cargo[1:]:
+        df_cargos[columna] = _categorico(df_cargos[columna])
+
+    df_cargo_competencia = df_perfiles[COLUMNAS_COMPETENCIA].reset_index(drop=True)
+    for columna in COLUMNAS_COMPETENCIA[1:]:
+        df_cargo_competencia[columna] = _categorico(df_cargo_competencia[columna])
+
+    return ModeloPerfiles(cargos=df_cargos, cargo_competencia=df_cargo_competencia)
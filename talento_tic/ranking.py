@@ -0,0 +1,41 @@
+"""Top-K por grupo sin ``groupby().apply``.
+
+Se ordenan las filas una sola vez por (grupo, valor descendente) y la posición
+de cada fila dentro de su grupo se obtiene restando el inicio del grupo. Así no
+se ejecuta código Python por cada grupo.
+"""
+import numpy as np
+
+from talento_tic.conteo import codigos_densos
+
+# K máximo que se precalcula; cualquier K menor se obtiene filtrando por rango
+K_MAX = 10
+
+
+def rango_por_grupo(df, grupo, valor):
+    """Orden de las filas y rango (1 = mayor ``valor``) de cada una dentro de su grupo.
+
+    Los empates conservan el orden original, igual que ``nlargest(keep='first')``.
+    """
+    codigos, _ = codigos_densos(df[grupo])
+    valores = df[valor].to_numpy(dtype=np.float64)
+    orden = np.lexsort((-valores, codigos))
+    codigos = codigos[orden]
+    posicion = np.arange(len(orden))
+    inicios = np.r_[True, codigos[1:] != codigos[:-1]] if len(orden) else np.zeros(0, dtype=bool)
+    inicio_grupo = np.maximum.accumulate(np.where(inicios, posicion, 0)) if len(orden) else posicion
+    return orden, posicion - inicio_grupo + 1
+
+
+def top_k_por_grupo(df, grupo, valor, k=K_MAX, columna_rango='rango'):
+    """Las ``k`` filas de mayor ``valor`` en cada grupo, con su rango en ``columna_rango``."""
+    orden, rango = rango_por_grupo(df, grupo, valor)
+    mantener = rango <= k
+    resultado = df.iloc[orden[mantener]].reset_index(drop=True)
+    resultado[columna_rango] = rango[mantener]
+    return resultado
+
+
+def recortar_top(df_top, k, columna_rango='rango'):
+    """Reduce un top precalculado con un K mayor al top ``k``."""
+    return df_top[df_top[columna_rango] <= k]
@@ -0,0 +1,120 @@
+"""Registro de versiones de las fuentes por contenido.
+
+La versión de cada fuente sale del contenido del archivo (recortada a
+``LARGO_VERSION`` caracteres): cambia solo si cambian los datos, no si el
+archivo se copia o se vuelve a guardar igual. El archivo se resume en bloques
+de ``TAMANO_BLOQUE`` bytes y la versión es el SHA-256 de los hashes de sus
+bloques. La versión se guarda en ``registro.json`` (en el directorio de
+snapshots) junto al tamaño, la fecha de modificación y el inodo. En cada rerun
+solo se compara esa firma con ``os.stat``; cuando cambia se vuelve a leer el
+archivo completo, también si solo creció: una fila reescrita en el medio y
+luego otras agregadas al final dejarían la misma cola, y hashear el archivo es
+mucho más barato que recalcular agregados con una versión equivocada.
+
+Además de los CSV se versiona el catálogo DIVIPOLA (``divipola.csv`` o el de
+TALENTO_TIC_DIVIPOLA), del que dependen los cruces por municipio; si no
+existe su versión es ``AUSENTE``.
+
+Cada artefacto derivado (tablas agregadas, figuras, índices) se guarda con la
+versión de las fuentes de las que depende (``version_de``): si solo cambia
+graduados, lo que sale únicamente de perfiles conserva su versión y sus
+cachés.
+"""
+import hashlib
+import json
+import os
+import threading
+
+from talento_tic import divipola, fuentes, snapshot
+
+LARGO_VERSION = 16
+TAMANO_BLOQUE = 1 << 22
+ARCHIVO_REGISTRO = 'registro.json'
+AUSENTE = 'ausente'
+
+ARCHIVOS = fuentes.ARCHIVOS + (divipola.ARCHIVO_DIVIPOLA,)
+
+# ruta → entrada del registro vigente en este proceso
+_memoria = {}
+# Protege el registro en disco y _memoria; el contenido se lee fuera del candado
+_candado = threading.Lock()
+
+
+def _ruta_registro(directorio=None):
+    return os.path.join(snapshot.directorio_snapshot(directorio), ARCHIVO_REGISTRO)
+
+
+def _leer_registro(directorio=None):
+    try:
+        with open(_ruta_registro(directorio), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _escribir_registro(registro, directorio=None):
+    ruta = _ruta_registro(directorio)
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    temporal = f'{ruta}.{os.getpid()}.{threading.get_ident()}.tmp'
+    with open(temporal, 'w', encoding='utf-8') as f:
+        json.dump(registro, f)
+    os.replace(temporal, ruta)
+
+
+def _ruta_fuente(archivo, directorio=None):
+    if archivo == divipola.ARCHIVO_DIVIPOLA:
+        return divipola.ruta_catalogo(directorio)
+    return fuentes.ruta(archivo, directorio)
+
+
+def _firma(info):
+    return [info.st_size, info.st_mtime_ns, info.st_ino]
+
+
+def _hash_contenido(ruta):
+    """SHA-256 de los hashes de los bloques de ``TAMANO_BLOQUE`` bytes de ``ruta``."""
+    hashes = []
+    with open(ruta, 'rb') as f:
+        for bloque in iter(lambda: f.read(TAMANO_BLOQUE), b''):
+            hashes.append(hashlib.sha256(bloque).hexdigest())
+    return hashlib.sha256(''.join(hashes).encode('ascii')).hexdigest()
+
+
+def version_fuente(archivo, directorio=None):
+    """Versión (hash del contenido) de la fuente ``archivo``."""
+    ruta = _ruta_fuente(archivo, directorio)
+    try:
+        info = os.stat(ruta)
+    except FileNotFoundError:
+        if archivo == divipola.ARCHIVO_DIVIPOLA:
+            return AUSENTE
+        raise
+    with _candado:
+        entrada = _memoria.get(ruta)
+        if entrada is None or entrada['firma'] != _firma(info):
+            entrada = _leer_registro(directorio).get(ruta)
+    if entrada is None or entrada['firma'] != _firma(info):
+        entrada = {'firma': _firma(info), 'version': _hash_contenido(ruta)}
+        with _candado:
+            registro = _leer_registro(directorio)
+            registro[ruta] = entrada
+            _escribir_registro(registro, directorio)
+    with _candado:
+        _memoria[ruta] = entrada
+    return entrada['version'][:LARGO_VERSION]
+
+
+def versiones(directorio=None, archivos=ARCHIVOS):
+    """``{archivo: versión}`` de las fuentes."""
+    return {archivo: version_fuente(archivo, directorio) for archivo in archivos}
+
+
+def version_de(versiones, dependencias, *extra):
+    """Versión de un artefacto que depende de las fuentes ``dependencias``.
+
+    ``extra`` agrega a la llave lo que, además de los datos, cambia el
+    resultado (por ejemplo, el modo de ingesta).
+    """
+    partes = [f'{archivo}:{versiones[archivo]}' for archivo in sorted(dependencias)]
+    partes.extend(map(str, extra))
+    return hashlib.sha1('|'.join(partes).encode('utf-8')).hexdigest()[:LARGO_VERSION]
@@ -0,0 +1,264 @@
+"""Reportes estáticos de las vistas del tablero, por municipio, sin Streamlit.
+
+Uso::
+
+    python -m talento_tic.reportes --salida reportes
+    python -m talento_tic.reportes --salida reportes --formatos html csv png --procesos 8
+    python -m talento_tic.reportes --salida reportes --municipios BOGOTÁ MEDELLÍN
+
+Los agregados se calculan (o se abren) una sola vez en el almacén compartido
+(``talento_tic.compartido``), con la misma versión que usa el tablero. Cada
+reporte, el nacional y uno por municipio, se arma en un proceso de un
+``ProcessPoolExecutor`` que mapea esos agregados en lugar de recalcularlos.
+
+Por reporte se escribe una página HTML con todas las vistas y, según
+``--formatos``, el CSV de la tabla y el PNG de la figura de cada vista. El PNG
+requiere el paquete opcional ``kaleido``. Las páginas cargan ``plotly.min.js``
+desde el directorio de salida, así que se pueden abrir sin conexión.
+"""
+import argparse
+import html
+import importlib.util
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Any, Optional
+
+import pandas as pd
+from plotly.offline import get_plotlyjs
+
+from talento_tic import compartido, divipola, figuras, incremental, registro, snapshot
+from talento_tic.analitica import filtrar_top_municipios
+from talento_tic.brechas import CODIGO
+from talento_tic.cubo import CARGO, MUNICIPIO
+from talento_tic.emparejamiento import clave_canonica
+from talento_tic.ranking import K_MAX
+
+FORMATOS = ('html', 'csv', 'png')
+NACIONAL = 'NACIONAL'
+ARCHIVO_PLOTLYJS = 'plotly.min.js'
+
+
+@dataclass
+class Vista:
+    nombre: str
+    titulo: str
+    tabla: pd.DataFrame
+    figura: Optional[Any] = None
+
+
+def vistas_nacionales(agregados):
+    """Las vistas del tablero sin filtros."""
+    return [
+        Vista('demanda_perfiles', 'Demanda por perfiles TIC en 2023', agregados.demanda_perfiles,
+              figuras.figura_demanda_perfiles(agregados.demanda_perfiles)),
+        Vista('top_municipios', 'Perfiles TIC más demandados por municipio', agregados.top_perfiles_municipio,
+              figuras.figura_top_municipios(agregados.top_perfiles_municipio)),
+        Vista('demanda_municipio', 'Demanda de cargos TIC por municipio', agregados.demanda_municipio,
+              figuras.figura_demanda_municipio(agregados.demanda_municipio)),
+        Vista('matricula', 'Variación porcentual de matriculados en programas TIC 2017-2018',
+              agregados.deficit_formacion, figuras.figura_variacion_matricula(agregados.deficit_formacion)),
+        Vista('mapa', 'Mapa talento humano TIC graduado 2023', agregados.graduados_tic,
+              figuras.figura_mapa(agregados.graduados_tic)),
+        Vista('oferta_demanda', 'Oferta y demanda TIC por municipio', agregados.of_dem,
+              figuras.figura_oferta_demanda(agregados.of_dem)),
+        Vista('brechas', 'Brechas entre demanda y oferta por municipio', agregados.brechas_municipio,
+              figuras.figura_brechas_municipio(agregados.brechas_municipio)),
+    ]
+
+
+def vistas_municipio(agregados, codigo, catalogo):
+    """Las vistas del tablero restringidas al municipio con código DIVIPOLA ``codigo``.
+
+    Cada fuente escribe el municipio a su manera: las tablas se filtran por el
+    código que ``catalogo`` les asigna a sus nombres, no por el texto.
+    """
+    def del_municipio(nombres):
+        return catalogo.codificar(pd.Series(nombres)) == codigo
+
+    def filtrar(df, columna='MUNICIPIO'):
+        return df[del_municipio(df[columna]).tolist()]
+
+    nombres_cubo = agregados.cubo.etiquetas[MUNICIPIO]
+    nombres = nombres_cubo[del_municipio(nombres_cubo)].tolist()
+    df_perfiles = agregados.cubo.consultar(CARGO, filtros={MUNICIPIO: nombres}, nombre='Total demandados')
+    df_perfiles = df_perfiles.sort_values(by='Total demandados', ascending=False)
+    df_top = filtrar_top_municipios(agregados.top_perfiles_municipio, K_MAX, nombres)
+
+    # La participación del municipio se resalta sobre el total nacional
+    df_municipio = agregados.demanda_municipio
+    es_municipio = del_municipio(df_municipio['MUNICIPIO'])
+    figura_municipio = figuras.figura_demanda_municipio(df_municipio)
+    figura_municipio.update_traces(pull=(es_municipio * 0.15).tolist())
+
+    # Las tablas de brechas ya traen el código
+    texto = divipola.formatear_codigo([codigo])[0]
+    df_programas = agregados.brechas_programa[agregados.brechas_programa[CODIGO] == texto]
+    df_brechas = agregados.brechas_municipio[agregados.brechas_municipio[CODIGO] == texto]
+    df_cargos = agregados.brechas_cargo[agregados.brechas_cargo[CODIGO] == texto]
+    df_graduados = filtrar(agregados.graduados_tic)
+    return [
+        Vista('demanda_perfiles', 'Demanda por perfiles TIC en 2023', df_perfiles,
+              figuras.figura_demanda_perfiles(df_perfiles)),
+        Vista('top_municipios', f'Perfiles TIC más demandados (top {K_MAX})', df_top,
+              figuras.figura_top_municipios(df_top)),
+        Vista('demanda_municipio', 'Demanda de cargos TIC frente a los demás municipios',
+              df_municipio[es_municipio.tolist()], figura_municipio),
+        Vista('matricula', 'Cargos que piden cada programa frente a sus matriculados en 2018', df_programas,
+              figuras.figura_brechas_programa(df_programas)),
+        Vista('mapa', 'Talento humano TIC graduado 2023', df_graduados, figuras.figura_mapa(df_graduados)),
+        Vista('oferta_demanda', 'Oferta y demanda TIC', df_brechas, figuras.figura_brechas_municipio(df_brechas)),
+        Vista('brechas_cargo', 'Cargos demandados frente a los matriculados en 2018 de sus programas', df_cargos,
+              figuras.figura_brechas_cargo(df_cargos)),
+    ]
+
+
+def nombre_reporte(municipio, codigo=None):
+    """Nombre de archivo del reporte: 'NACIONAL' o '11001_BOGOTA'."""
+    nombre = clave_canonica(municipio).replace(' ', '_')
+    return f'{codigo}_{nombre}' if codigo else nombre
+
+
+def pagina_html(titulo, vistas):
+    """Página con el título, la figura y la tabla de cada vista."""
+    partes = [f'<h1>{html.escape(titulo)}</h1>']
+    for vista in vistas:
+        partes.append(f'<h2>{html.escape(vista.titulo)}</h2>')
+        if vista.figura is not None:
+            partes.append(vista.figura.to_html(full_html=False, include_plotlyjs=False))
+        partes.append(vista.tabla.to_html(index=False, border=0))
+    return (
+        '<!DOCTYPE html>\n<html lang="es">\n<head>\n<meta charset="utf-8">\n'
+        f'<title>{html.escape(titulo)}</title>\n<script src="{ARCHIVO_PLOTLYJS}"></script>\n'
+        '<style>body{font-family:sans-serif;margin:2em} table{border-collapse:collapse;margin-bottom:2em}'
+        ' td,th{padding:2px 8px;border-bottom:1px solid #ddd}</style>\n</head>\n<body>\n'
+        + '\n'.join(partes) + '\n</body>\n</html>\n'
+    )
+
+
+def escribir_reporte(vistas, titulo, nombre, salida, formatos):
+    """Escribe el HTML, los CSV y los PNG de un reporte y devuelve las rutas escritas."""
+    rutas = []
+    if 'html' in formatos:
+        ruta = os.path.join(salida, f'{nombre}.html')
+        with open(ruta, 'w', encoding='utf-8') as f:
+            f.write(pagina_html(titulo, vistas))
+        rutas.append(ruta)
+    if 'csv' in formatos or 'png' in formatos:
+        os.makedirs(os.path.join(salida, nombre), exist_ok=True)
+    for vista in vistas:
+        base = os.path.join(salida, nombre, vista.nombre)
+        if 'csv' in formatos:
+            vista.tabla.to_csv(base + '.csv', index=False)
+            rutas.append(base + '.csv')
+        if 'png' in formatos and vista.figura is not None:
+            vista.figura.write_image(base + '.png', width=1200, height=700)
+            rutas.append(base + '.png')
+    return rutas
+
+
+# Agregados del proceso trabajador, mapeados desde el almacén compartido, y
+# catálogo DIVIPOLA con que se filtran por municipio
+_agregados = None
+_catalogo = None
+
+
+def obtener_agregados(versiones, modo, directorio=None):
+    """Agregados de las fuentes con ``versiones``: mapeados desde el almacén
+    compartido o, si a algún grupo le falta publicarse, recalculados."""
+    cargar = incremental.cargar_archivos if modo == 'incremental' else snapshot.cargar_archivos
+    return compartido.obtener_agregados_compartidos(
+        versiones, lambda archivos: cargar(archivos, directorio), modo, directorio=directorio)
+
+
+def _iniciar_trabajador(versiones, modo, directorio):
+    # Si otro proceso desalojó algún grupo entre tanto, se vuelve a calcular
+    global _agregados, _catalogo
+    _agregados = obtener_agregados(versiones, modo, directorio)
+    _catalogo = divipola.cargar_catalogo(directorio)
+
+
+def _renderizar(municipio, codigo, salida, formatos):
+    inicio = time.perf_counter()
+    if municipio == NACIONAL:
+        vistas = vistas_nacionales(_agregados)
+        titulo, nombre = 'Talento humano TIC en Colombia', nombre_reporte(NACIONAL)
+    else:
+        vistas = vistas_municipio(_agregados, int(codigo), _catalogo)
+        titulo, nombre = f'Talento humano TIC en {municipio}', nombre_reporte(municipio, codigo)
+    rutas = escribir_reporte(vistas, titulo, nombre, salida, formatos)
+    return municipio, nombre, rutas, time.perf_counter() - inicio
+
+
+def pagina_indice(reportes):
+    filas = '\n'.join(
+        f'<li><a href="{html.escape(nombre)}.html">{html.escape(municipio)}</a></li>'
+        for municipio, nombre in reportes
+    )
+    return ('<!DOCTYPE html>\n<html lang="es">\n<head>\n<meta charset="utf-8">\n'
+            '<title>Reportes talento humano TIC</title>\n</head>\n<body>\n'
+            f'<h1>Reportes talento humano TIC</h1>\n<ul>\n{filas}\n</ul>\n</body>\n</html>\n')
+
+
+def generar_reportes(salida, formatos=('html', 'csv'), municipios=None, procesos=None, directorio=None):
+    """Genera el reporte nacional y uno por municipio; devuelve ``[(municipio, nombre, rutas, segundos)]``.
+
+    ``municipios`` restringe los reportes por municipio (por defecto, todos los
+    que tienen demanda u oferta); se emparejan con el catálogo DIVIPOLA, así que
+    'Bogota' elige el reporte de 'BOGOTÁ'.
+    """
+    if 'png' in formatos and importlib.util.find_spec('kaleido') is None:
+        raise RuntimeError('Exportar PNG requiere el paquete kaleido (pip install kaleido)')
+    os.makedirs(salida, exist_ok=True)
+
+    modo = 'incremental' if incremental.usar_incremental(directorio) else 'completo'
+    versiones = registro.versiones(directorio)
+    agregados = obtener_agregados(versiones, modo, directorio)
+
+    codigos = dict(zip(agregados.brechas_municipio['MUNICIPIO'], agregados.brechas_municipio[CODIGO]))
+    if municipios is not None:
+        pedidos = set(divipola.formatear_codigo(divipola.cargar_catalogo(directorio).codificar(pd.Series(municipios))))
+        codigos = {m: codigo for m, codigo in codigos.items() if codigo in pedidos}
+    pendientes = [NACIONAL] + list(codigos)
+
+    if 'html' in formatos:
+        with open(os.path.join(salida, ARCHIVO_PLOTLYJS), 'w', encoding='utf-8') as f:
+            f.write(get_plotlyjs())
+
+    resultados = []
+    with ProcessPoolExecutor(max_workers=procesos, initializer=_iniciar_trabajador, initargs=(versiones, modo, directorio)) as pool:
+        tareas = [pool.submit(_renderizar, municipio, codigos.get(municipio), salida, formatos)
+                  for municipio in pendientes]
+        for tarea in as_completed(tareas):
+            resultados.append(tarea.result())
+
+    orden = {municipio: i for i, municipio in enumerate(pendientes)}
+    resultados.sort(key=lambda resultado: orden[resultado[0]])
+    if 'html' in formatos:
+        with open(os.path.join(salida, 'index.html'), 'w', encoding='utf-8') as f:
+            f.write(pagina_indice([(municipio, nombre) for municipio, nombre, _, _ in resultados]))
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--salida', default='reportes', help='directorio donde se escriben los reportes')
+    parser.add_argument('--formatos', nargs='+', choices=FORMATOS, default=['html', 'csv'])
+    parser.add_argument('--municipios', nargs='+', help='solo estos municipios (además del reporte nacional)')
+    parser.add_argument('--procesos', type=int, help='procesos para renderizar (por defecto, uno por CPU)')
+    parser.add_argument('--datos', help='directorio de los CSV fuente')
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    try:
+        resultados = generar_reportes(args.salida, args.formatos, args.municipios, args.procesos, args.datos)
+    except RuntimeError as error:
+        parser.error(str(error))
+    for municipio, nombre, rutas, segundos in resultados:
+        print(f'{municipio:<20} {len(rutas):>3} archivos  {segundos:6.2f} s  {nombre}')
+    print(f'{len(resultados)} reportes en {time.perf_counter() - inicio:.1f} s → {args.salida}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,260 @@
+"""Series anuales de matriculados y graduados en formato largo, particionadas por año.
+
+Las fuentes de SNIES llegan en formato ancho, con una columna por año
+(``TOTAL_MATRICULADOS_2017``, ``graduados_2023``). Aquí se pasan a formato
+largo, una fila por celda y año, y se guardan en Parquet con una partición por
+año (``<medida>/anio=<año>/datos.parquet``) junto a los snapshots. Agregar un
+año es dejar un CSV más en el directorio de datos (``formacion_*.csv`` o
+``graduados_tic_*.csv``): solo se leen los archivos nuevos o modificados y
+solo se reescriben las particiones de sus años.
+
+Con cada actualización se precalculan las tendencias por cargo y por
+municipio (total del año, cambio frente al año anterior, variación y promedio
+móvil), en un archivo pequeño por medida y dimensión, y las vistas leen esas
+tablas.
+"""
+import glob
+import json
+import os
+import re
+import shutil
+import threading
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from talento_tic import fuentes, matricula, snapshot
+
+MATRICULA = 'matricula'
+GRADUADOS = 'graduados'
+
+# Archivos de cada medida en el directorio de datos y la columna de cada año
+PATRONES = {
+    MATRICULA: ('formacion_*.csv', re.compile(r'^TOTAL_MATRICULADOS_(\d{4})$')),
+    GRADUADOS: ('graduados_tic_*.csv', re.compile(r'^graduados_(\d{4})$')),
+}
+# Columna del valor en formato largo
+VALORES = {MATRICULA: 'MATRICULADOS', GRADUADOS: 'GRADUADOS'}
+# Dimensiones de cada medida en formato largo
+DIMENSIONES = {
+    MATRICULA: matricula.DIMENSIONES,
+    GRADUADOS: ('MUNICIPIO',),
+}
+# Tendencias que se precalculan: medida → dimensiones
+TENDENCIAS = {
+    MATRICULA: (matricula.CARGO, matricula.MUNICIPIO),
+    GRADUADOS: ('MUNICIPIO',),
+}
+
+# Nombre corto de cada dimensión en los archivos de tendencias
+NOMBRES_DIMENSION = {matricula.CARGO: 'cargo', matricula.MUNICIPIO: 'municipio'}
+
+# Años del promedio móvil
+VENTANA = 3
+
+# Se incrementa cuando cambia el esquema de las particiones o de las tendencias
+VERSION_FORMATO = 1
+
+ARCHIVO_MANIFIESTO = 'manifiesto.json'
+
+
+def directorio_series(directorio=None):
+    return os.path.join(snapshot.directorio_snapshot(directorio), 'series')
+
+
+# Serializa las actualizaciones de las sesiones del mismo proceso
+_candado = threading.Lock()
+
+
+def _escribir_parquet(df, ruta):
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    temporal = f'{ruta}.{os.getpid()}.{threading.get_ident()}.tmp'
+    df.to_parquet(temporal, index=False)
+    os.replace(temporal, ruta)
+
+
+def _anios_columnas(df, medida):
+    patron = PATRONES[medida][1]
+    return {int(m.group(1)): columna for columna in df.columns if (m := patron.match(columna))}
+
+
+def a_largo(df, medida):
+    """Fuente ancha de ``medida`` → ``{año: DataFrame largo}`` con las dimensiones y el valor."""
+    columnas = _anios_columnas(df, medida)
+    if medida == MATRICULA:
+        # Celdas distintas (los matriculados se repiten por cargo; ver talento_tic.matricula)
+        df = matricula.sumas_matricula(df)
+    dimensiones = list(DIMENSIONES[medida])
+    resultado = {}
+    for anio, columna in columnas.items():
+        parte = df[dimensiones + [columna]].dropna(subset=[columna])
+        resultado[anio] = parte.rename(columns={columna: VALORES[medida]}).reset_index(drop=True)
+    return resultado
+
+
+def _firma(ruta):
+    info = os.stat(ruta)
+    return [info.st_size, info.st_mtime_ns]
+
+
+def _leer_manifiesto(base):
+    try:
+        with open(os.path.join(base, ARCHIVO_MANIFIESTO), encoding='utf-8') as f:
+            manifiesto = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return manifiesto if manifiesto.get('version_formato') == VERSION_FORMATO else None
+
+
+def _escribir_manifiesto(base, manifiesto):
+    ruta = os.path.join(base, ARCHIVO_MANIFIESTO)
+    temporal = f'{ruta}.{os.getpid()}.{threading.get_ident()}.tmp'
+    with open(temporal, 'w', encoding='utf-8') as f:
+        json.dump(manifiesto, f, indent=2)
+    os.replace(temporal, ruta)
+
+
+def _leer_fuente(ruta):
+    return pd.read_csv(ruta, dtype=fuentes.TIPOS.get(os.path.basename(ruta)))
+
+
+def _archivos_fuente(medida, directorio=None):
+    patron = PATRONES[medida][0]
+    return {os.path.basename(r): r for r in sorted(glob.glob(os.path.join(directorio or fuentes.DIRECTORIO_DATOS, patron)))}
+
+
+def firma_fuentes(directorio=None):
+    """Tamaño y fecha de modificación de los CSV de las series; sirve de llave de caché."""
+    return tuple((archivo, *_firma(ruta)) for medida in PATRONES
+                 for archivo, ruta in _archivos_fuente(medida, directorio).items())
+
+
+def actualizar_series(directorio=None):
+    """Incorpora los CSV nuevos o modificados y recalcula las tendencias afectadas.
+
+    Devuelve las medidas que cambiaron. El manifiesto solo se reescribe si
+    cambió alguna partición. Sin manifiesto (o con uno de otro formato) se
+    reescriben las particiones de todos los años, sin borrar el almacén: los
+    años que ya no trae ningún archivo se retiran partición por partición.
+    """
+    with _candado:
+        return _actualizar_series(directorio)
+
+
+def _actualizar_series(directorio=None):
+    base = directorio_series(directorio)
+    manifiesto = _leer_manifiesto(base)
+    reconstruir = manifiesto is None
+    if reconstruir:
+        manifiesto = {'version_formato': VERSION_FORMATO, 'archivos': {}}
+
+    cambiadas = []
+    for medida in PATRONES:
+        archivos = _archivos_fuente(medida, directorio)
+        previos = {a: d for a, d in manifiesto['archivos'].items() if d['medida'] == medida}
+        modificados = [a for a, r in archivos.items() if previos.get(a, {}).get('firma') != _firma(r)]
+        retirados = [a for a in previos if a not in archivos]
+        if not modificados and not retirados and not (reconstruir and anios_disponibles(medida, directorio)):
+            continue
+
+        # Años a reescribir: los de los archivos nuevos, modificados o retirados
+        partes = {archivo: a_largo(_leer_fuente(archivos[archivo]), medida) for archivo in modificados}
+        anios = {anio for largo in partes.values() for anio in largo}
+        anios.update(anio for archivo in modificados + retirados for anio in previos.get(archivo, {}).get('anios', []))
+        if reconstruir:
+            # Sin manifiesto no se sabe de qué archivo salió cada partición
+            anios.update(anios_disponibles(medida, directorio))
+        for archivo in retirados:
+            del manifiesto['archivos'][archivo]
+        for archivo in modificados:
+            manifiesto['archivos'][archivo] = {'medida': medida, 'firma': _firma(archivos[archivo]),
+                                               'anios': sorted(partes[archivo])}
+
+        for anio in sorted(anios):
+            # Un año puede venir en varios archivos: se leen también los que no cambiaron
+            trozos = []
+            for archivo, datos in manifiesto['archivos'].items():
+                if datos['medida'] != medida or anio not in datos['anios']:
+                    continue
+                if archivo not in partes:
+                    partes[archivo] = a_largo(_leer_fuente(archivos[archivo]), medida)
+                trozos.append(partes[archivo][anio])
+            ruta = os.path.join(base, medida, f'anio={anio}', 'datos.parquet')
+            if not trozos:
+                shutil.rmtree(os.path.dirname(ruta), ignore_errors=True)
+                continue
+            df = pd.concat(trozos, ignore_index=True)
+            # Las celdas repetidas entre archivos conservan un solo valor
+            df = df.groupby(list(DIMENSIONES[medida]), observed=True)[VALORES[medida]].max().reset_index()
+            _escribir_parquet(df, ruta)
+
+        precalcular_tendencias(medida, directorio)
+        cambiadas.append(medida)
+
+    if cambiadas:
+        os.makedirs(base, exist_ok=True)
+        _escribir_manifiesto(base, manifiesto)
+    return cambiadas
+
+
+def anios_disponibles(medida, directorio=None):
+    carpeta = os.path.join(directorio_series(directorio), medida)
+    if not os.path.isdir(carpeta):
+        return []
+    return sorted(int(nombre.split('=')[1]) for nombre in os.listdir(carpeta) if nombre.startswith('anio='))
+
+
+def _totales_anuales(medida, por, directorio=None):
+    """Totales por ``por`` en formato ancho (una columna por año), partición por partición."""
+    columnas_total = {}
+    for anio in anios_disponibles(medida, directorio):
+        df = pq.read_table(os.path.join(directorio_series(directorio), medida, f'anio={anio}', 'datos.parquet')).to_pandas()
+        if medida == MATRICULA:
+            df = matricula.totales(df.rename(columns={VALORES[medida]: matricula.columna_total(anio)}), por)
+            columnas_total[anio] = df.set_index(por)[matricula.columna_total(anio)]
+        else:
+            columnas_total[anio] = df.groupby(por, observed=True)[VALORES[medida]].sum()
+    return pd.DataFrame(columnas_total)
+
+
+def tendencia(df_totales, ventana=VENTANA):
+    """Totales anchos (filas = grupos, columnas = años) → tabla larga con cambios y promedio móvil.
+
+    Los años sin dato para un grupo quedan vacíos y el cambio se calcula
+    frente al año anterior disponible en la tabla.
+    """
+    anios = sorted(df_totales.columns)
+    matriz = df_totales[anios].to_numpy(np.float64)
+    anterior = np.column_stack([np.full(len(matriz), np.nan), matriz[:, :-1]]) if anios else matriz
+    with np.errstate(divide='ignore', invalid='ignore'):
+        variacion = np.where(anterior > 0, matriz / anterior - 1, np.nan)
+    movil = df_totales[anios].T.rolling(ventana, min_periods=1).mean().T.to_numpy(np.float64)
+
+    por = list(df_totales.index.names)
+    largo = df_totales.index.to_frame(index=False)
+    largo = largo.loc[np.repeat(np.arange(len(largo)), len(anios))].reset_index(drop=True)
+    largo['ANIO'] = np.tile(np.asarray(anios, dtype=np.int64), len(df_totales))
+    largo['TOTAL'] = matriz.ravel()
+    largo['CAMBIO'] = (matriz - anterior).ravel()
+    largo['VARIACION'] = variacion.ravel()
+    largo[f'PROMEDIO_MOVIL_{ventana}'] = movil.ravel()
+    return largo[por + ['ANIO', 'TOTAL', 'CAMBIO', 'VARIACION', f'PROMEDIO_MOVIL_{ventana}']]
+
+
+def _ruta_tendencia(medida, dimension, directorio=None):
+    return os.path.join(directorio_series(directorio), 'tendencias', f'{medida}.{NOMBRES_DIMENSION[dimension]}.parquet')
+
+
+def precalcular_tendencias(medida, directorio=None):
+    for dimension in TENDENCIAS[medida]:
+        df = tendencia(_totales_anuales(medida, [dimension], directorio))
+        _escribir_parquet(df, _ruta_tendencia(medida, dimension, directorio))
+
+
+def leer_tendencia(medida, dimension, directorio=None):
+    """Tendencia precalculada de ``medida`` por ``dimension`` (None si no hay series)."""
+    ruta = _ruta_tendencia(medida, dimension, directorio)
+    if not os.path.exists(ruta):
+        return None
+    return pd.read_parquet(ruta)
@@ -0,0 +1,171 @@
+"""Copia columnar (Arrow IPC / Feather v2) de las fuentes CSV.
+
+La primera vez que se pide una fuente se lee el CSV con sus tipos
+(``fuentes.TIPOS``) y se guarda como archivo Arrow sin comprimir, con los
+textos repetidos codificados como diccionario y cada columna en un solo
+bloque. Las cargas siguientes abren ese archivo con memoria mapeada, sin
+volver a interpretar el CSV: las columnas numéricas y los códigos de las
+categóricas sin nulos son vistas sobre el archivo mapeado, así que los
+procesos que abren el mismo snapshot comparten esas páginas y solo los
+diccionarios (los valores distintos) se copian a cada proceso. El snapshot se
+reconstruye solo cuando cambia el archivo fuente: primero se compara tamaño y
+fecha de modificación y, si difieren, el hash del contenido.
+"""
+import hashlib
+import json
+import os
+import threading
+from functools import partial
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from talento_tic import calidad, carga, divipola, fuentes
+
+# Se incrementa cuando cambian los tipos o el formato del snapshot
+VERSION_FORMATO = 3
+
+DIRECTORIO_SNAPSHOT = os.environ.get('TALENTO_TIC_SNAPSHOT')
+
+
+def directorio_snapshot(directorio=None):
+    return DIRECTORIO_SNAPSHOT or os.path.join(directorio or fuentes.DIRECTORIO_DATOS, '.snapshot')
+
+
+def _rutas(archivo, directorio=None):
+    base = os.path.join(directorio_snapshot(directorio), os.path.splitext(archivo)[0])
+    return base + '.arrow', base + '.json'
+
+
+def hash_archivo(ruta, tamano_bloque=1 << 20):
+    h = hashlib.sha256()
+    with open(ruta, 'rb') as f:
+        for bloque in iter(lambda: f.read(tamano_bloque), b''):
+            h.update(bloque)
+    return h.hexdigest()
+
+
+def _leer_metadatos(ruta_meta):
+    try:
+        with open(ruta_meta, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _escribir_metadatos(ruta_meta, meta):
+    temporal = f'{ruta_meta}.{os.getpid()}.{threading.get_ident()}.tmp'
+    with open(temporal, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+    os.replace(temporal, ruta_meta)
+
+
+def snapshot_vigente(archivo, directorio=None):
+    """Indica si el snapshot de ``archivo`` corresponde al CSV actual.
+
+    Si solo cambió la fecha de modificación pero el contenido es el mismo, se
+    actualizan los metadatos y el snapshot se sigue usando.
+    """
+    ruta_csv = fuentes.ruta(archivo, directorio)
+    ruta_arrow, ruta_meta = _rutas(archivo, directorio)
+    meta = _leer_metadatos(ruta_meta)
+    if meta is None or meta.get('version_formato') != VERSION_FORMATO or not os.path.exists(ruta_arrow):
+        return False
+    info = os.stat(ruta_csv)
+    if meta['tamano'] == info.st_size and meta['mtime_ns'] == info.st_mtime_ns:
+        return True
+    if meta['tamano'] != info.st_size or meta['sha256'] != hash_archivo(ruta_csv):
+        return False
+    meta['mtime_ns'] = info.st_mtime_ns
+    _escribir_metadatos(ruta_meta, meta)
+    calidad.renovar_version(archivo, directorio)
+    return True
+
+
+def construir_snapshot(archivo, directorio=None):
+    """Convierte el CSV de ``archivo`` en su snapshot Arrow y devuelve el DataFrame leído.
+
+    Aquí se calcula también el reporte de calidad de la fuente, una sola vez
+    por versión del archivo.
+    """
+    ruta_csv = fuentes.ruta(archivo, directorio)
+    ruta_arrow, ruta_meta = _rutas(archivo, directorio)
+    os.makedirs(os.path.dirname(ruta_arrow), exist_ok=True)
+
+    info = os.stat(ruta_csv)
+    df = fuentes.leer_csv(archivo, directorio)
+    calidad.guardar_reporte(calidad.evaluar_calidad(df, archivo, directorio), directorio)
+    # Sin compresión para poder mapear el archivo sin copiar los buffers
+    temporal = f'{ruta_arrow}.{os.getpid()}.{threading.get_ident()}.tmp'
+    feather.write_feather(df, temporal, compression='uncompressed', chunksize=max(len(df), 1))
+    os.replace(temporal, ruta_arrow)
+    _escribir_metadatos(ruta_meta, {
+        'archivo': archivo,
+        'version_formato': VERSION_FORMATO,
+        'tamano': info.st_size,
+        'mtime_ns': info.st_mtime_ns,
+        'sha256': hash_archivo(ruta_csv),
+        'filas': len(df),
+    })
+    return df
+
+
+def _columna(columna):
+    """Columna Arrow como arreglo de pandas, sin copiar los datos cuando se puede."""
+    if columna.num_chunks == 1 and columna.null_count == 0:
+        arreglo = columna.chunk(0)
+        if pa.types.is_dictionary(arreglo.type):
+            codigos = arreglo.indices.to_numpy(zero_copy_only=True)
+            return pd.Categorical.from_codes(codigos, categories=pd.Index(arreglo.dictionary.to_pylist()))
+        if pa.types.is_integer(arreglo.type) or pa.types.is_floating(arreglo.type):
+            return arreglo.to_numpy(zero_copy_only=True)
+    # Nulos, varios bloques o tipos sin equivalente directo: se convierten copiando
+    return columna.to_pandas().array
+
+
+def leer_snapshot(archivo, directorio=None, columnas=None):
+    """Lee el snapshot con memoria mapeada; las columnas diccionario llegan como categóricas.
+
+    Las tablas son de solo lectura: comparten los buffers del archivo mapeado.
+    """
+    ruta_arrow, _ = _rutas(archivo, directorio)
+    with pa.memory_map(ruta_arrow, 'r') as fuente:
+        tabla = pa.ipc.open_file(fuente).read_all()
+    if columnas is not None:
+        tabla = tabla.select(columnas)
+    return pd.DataFrame({nombre: _columna(columna) for nombre, columna in zip(tabla.column_names, tabla.columns)},
+                        copy=False)
+
+
+def asegurar_snapshot(archivo, directorio=None):
+    """Reconstruye el snapshot (y su reporte de calidad) solo si está desactualizado."""
+    if not snapshot_vigente(archivo, directorio):
+        construir_snapshot(archivo, directorio)
+
+
+def cargar_fuente(archivo, directorio=None, columnas=None):
+    if not snapshot_vigente(archivo, directorio):
+        df = construir_snapshot(archivo, directorio)
+        return df if columnas is None else df[columnas]
+    return leer_snapshot(archivo, directorio, columnas)
+
+
+def cargar_archivos(archivos=fuentes.ARCHIVOS, directorio=None):
+    """``{archivo: DataFrame}`` de las fuentes ``archivos`` desde los snapshots.
+
+    Las fuentes se cargan en paralelo (``talento_tic.carga``) y, mientras
+    tanto, se arma el catálogo DIVIPOLA del mismo directorio que usan los
+    cruces; si se pide ``divipola.ARCHIVO_DIVIPOLA`` en ``archivos`` se
+    devuelve con las demás fuentes.
+    """
+    tareas = {archivo: partial(cargar_fuente, archivo, directorio)
+              for archivo in archivos if archivo != divipola.ARCHIVO_DIVIPOLA}
+    tareas[divipola.ARCHIVO_DIVIPOLA] = partial(divipola.cargar_catalogo, directorio)
+    datos = carga.cargar_fuentes(tareas)
+    return {archivo: datos[archivo] for archivo in archivos}
+
+
+def cargar_datos(directorio=None):
+    """Equivalente a ``fuentes.cargar_datos`` pero desde los snapshots."""
+    return tuple(cargar_archivos(fuentes.ARCHIVOS, directorio).values())
@@ -0,0 +1,181 @@
+"""Ingesta por bloques de extractos de perfiles más grandes que la memoria.
+
+El CSV se lee en bloques de ``FILAS_POR_BLOQUE`` filas y cada bloque se pliega
+en acumulados; las filas crudas (una por competencia de cada cargo) se
+descartan apenas se pliegan. Los acumulados no tienen tamaño fijo, crecen con
+los valores distintos del archivo:
+
+* la tabla de cargos (una fila por ``ID_CARGO``, con sus atributos como
+  códigos enteros y ``n_competencias``), de la que salen las cuentas por
+  perfil, por municipio y por (municipio, perfil). Ocupa O(cargos distintos):
+  es la tabla que entrega el modelo, unas 40 mil filas de ~40 bytes en un
+  extracto de un millón de filas;
+* el conteo de filas por (competencia, tipo de competencia), O(competencias
+  distintas);
+* los pares (competencia, cargo) distintos, de los que sale al final el índice
+  invertido de competencias (``talento_tic.indice``). Son tantos como entradas
+  tendrá el índice, a lo sumo una por fila del archivo (unos 760 mil en un
+  extracto de un millón de filas, 8 bytes cada uno).
+
+La memoria es entonces proporcional a los cargos y pares distintos y no a las
+filas con todas sus columnas de texto, que es lo que no cabe. Cada bloque deja
+una corrida ordenada de pares y las corridas se mezclan por tamaños parecidos,
+así que cada par se mezcla O(log bloques) veces en lugar de reordenar todo lo
+acumulado en cada bloque.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from talento_tic import calidad, fuentes
+from talento_tic.conteo import corridas
+from talento_tic.indice import claves_pares, indice_desde_claves
+from talento_tic.modelo import COLUMNAS_CARGO, ModeloPerfiles
+
+FILAS_POR_BLOQUE = 500_000
+
+# Por encima de este tamaño el tablero ingiere perfiles por bloques
+UMBRAL_STREAMING = int(os.environ.get('TALENTO_TIC_UMBRAL_STREAMING', 512 * 2**20))
+
+COLUMNAS_CONTEO = ['Competencias', 'Tipo_de_Competencia']
+
+
+class Diccionario:
+    """Valores de una columna de texto con un código entero estable entre bloques."""
+
+    def __init__(self):
+        self.valores = pd.Index([], dtype=object)
+
+    def codificar(self, serie):
+        if not isinstance(serie.dtype, pd.CategoricalDtype):
+            serie = serie.astype('category')
+        categorias = serie.cat.categories
+        nuevas = categorias.difference(self.valores, sort=False)
+        if len(nuevas):
+            self.valores = self.valores.append(pd.Index(nuevas, dtype=object))
+        mapa = self.valores.get_indexer(categorias)
+        codigos = serie.cat.codes.to_numpy()
+        return np.where(codigos >= 0, mapa[codigos], -1).astype(np.int32)
+
+    def categorico(self, codigos):
+        # Categorías ordenadas, como las que produce read_csv con dtype='category'
+        categorico = pd.Categorical.from_codes(codigos, categories=self.valores)
+        return categorico.reorder_categories(self.valores.sort_values())
+
+
+def _mezclar(a, b):
+    """Unión ordenada y sin repetidos de dos corridas ordenadas."""
+    # Con kind='stable' NumPy ordena enteros de 64 bits con timsort, que
+    # reconoce las dos corridas y las mezcla en tiempo lineal
+    unidas, _ = corridas(np.sort(np.concatenate([a, b]), kind='stable'))
+    return unidas
+
+
+class AcumuladorPerfiles:
+    """Acumulados de perfiles que se actualizan bloque a bloque.
+
+    Ocupan O(cargos distintos + pares competencia-cargo distintos); ver el
+    docstring del módulo.
+    """
+
+    def __init__(self):
+        self.filas = 0
+        self.columnas_cargo = None
+        self.diccionarios = {}
+        self._cargos = None
+        self._competencias = None
+        self._corridas_pares = []
+
+    def _codificar(self, df, columna):
+        return self.diccionarios.setdefault(columna, Diccionario()).codificar(df[columna])
+
+    def agregar_bloque(self, df):
+        """Pliega un bloque de filas crudas de perfiles en los acumulados."""
+        if self.columnas_cargo is None:
+            self.columnas_cargo = [c for c in COLUMNAS_CARGO if c in df.columns]
+        self.filas += len(df)
+
+        bloque = pd.DataFrame({'ID_CARGO': df['ID_CARGO'].to_numpy()})
+        for columna in self.columnas_cargo[1:]:
+            bloque[columna] = self._codificar(df, columna)
+        n_competencias = bloque['ID_CARGO'].value_counts(sort=False)
+        bloque = bloque.drop_duplicates('ID_CARGO')
+        bloque['n_competencias'] = bloque['ID_CARGO'].map(n_competencias).to_numpy(np.int64)
+        self._agregar_cargos(bloque)
+
+        competencias = pd.DataFrame({columna: self._codificar(df, columna) for columna in COLUMNAS_CONTEO})
+        conteo = competencias.value_counts(sort=False)
+        self._competencias = conteo if self._competencias is None else self._competencias.add(conteo, fill_value=0)
+
+        self._agregar_pares(claves_pares(competencias['Competencias'].to_numpy(), df['ID_CARGO'].to_numpy()))
+        return self
+
+    def _agregar_pares(self, claves):
+        # Como un contador binario: la corrida nueva se mezcla con la anterior
+        # mientras esta no sea más grande, de modo que quedan O(log bloques) corridas
+        pendientes = self._corridas_pares
+        pendientes.append(claves)
+        while len(pendientes) > 1 and len(pendientes[-2]) <= len(pendientes[-1]):
+            ultima = pendientes.pop()
+            pendientes[-1] = _mezclar(pendientes[-1], ultima)
+
+    def _pares(self):
+        pares = np.zeros(0, dtype=np.int64)
+        for corrida in reversed(self._corridas_pares):
+            pares = _mezclar(corrida, pares)
+        return pares
+
+    def _agregar_cargos(self, bloque):
+        if self._cargos is None:
+            self._cargos = bloque.reset_index(drop=True)
+            return
+        # Un cargo puede quedar partido entre dos bloques: sus filas se suman
+        repetidos = bloque['ID_CARGO'].isin(self._cargos['ID_CARGO']).to_numpy()
+        if repetidos.any():
+            extra = bloque.loc[repetidos].set_index('ID_CARGO')['n_competencias']
+            suma = self._cargos['ID_CARGO'].map(extra).fillna(0).to_numpy(np.int64)
+            self._cargos['n_competencias'] += suma
+        self._cargos = pd.concat([self._cargos, bloque.loc[~repetidos]], ignore_index=True)
+
+    def resultado(self):
+        """Modelo de perfiles con la tabla de cargos, el conteo y el índice de competencias."""
+        if self._cargos is None:
+            raise ValueError('No se ha agregado ningún bloque de perfiles')
+        df_cargos = self._cargos[['ID_CARGO']].copy()
+        for columna in self.columnas_cargo[1:]:
+            df_cargos[columna] = self.diccionarios[columna].categorico(self._cargos[columna].to_numpy())
+        df_cargos['n_competencias'] = self._cargos['n_competencias'].astype('int32')
+
+        codigos = self._competencias.index
+        df_competencias = pd.DataFrame({
+            columna: self.diccionarios[columna].categorico(codigos.get_level_values(columna).to_numpy())
+            for columna in COLUMNAS_CONTEO
+        })
+        df_competencias['filas'] = self._competencias.to_numpy(np.int64)
+        df_competencias = df_competencias.sort_values('filas', ascending=False, ignore_index=True)
+        indice = indice_desde_claves(self._pares(), self.diccionarios['Competencias'].valores, df_cargos['ID_CARGO'].to_numpy())
+        return ModeloPerfiles(cargos=df_cargos, conteo_competencias=df_competencias, indice=indice)
+
+
+def leer_por_bloques(ruta, filas_por_bloque=FILAS_POR_BLOQUE, **kwargs):
+    tipos = fuentes.TIPOS[fuentes.ARCHIVO_PERFILES]
+    return pd.read_csv(ruta, dtype=tipos, chunksize=filas_por_bloque, **kwargs)
+
+
+def ingerir_perfiles(directorio=None, filas_por_bloque=FILAS_POR_BLOQUE):
+    """Lee ``perfiles_referenciados.csv`` por bloques y devuelve el modelo acumulado."""
+    acumulador = AcumuladorPerfiles()
+    acumulador_calidad = calidad.AcumuladorCalidad(fuentes.ARCHIVO_PERFILES)
+    with leer_por_bloques(fuentes.ruta(fuentes.ARCHIVO_PERFILES, directorio), filas_por_bloque) as lector:
+        for bloque in lector:
+            acumulador.agregar_bloque(bloque)
+            acumulador_calidad.agregar_bloque(bloque)
+    calidad.guardar_reporte(acumulador_calidad.resultado(directorio), directorio)
+    return acumulador.resultado()
+
+
+def usar_streaming(directorio=None, umbral=None):
+    """Indica si el archivo de perfiles es lo bastante grande para ingerirlo por bloques."""
+    umbral = UMBRAL_STREAMING if umbral is None else umbral
+    return os.path.getsize(fuentes.ruta(fuentes.ARCHIVO_PERFILES, directorio)) > umbral
@@ -0,0 +1,51 @@
+"""Brechas por programa y por cargo: la oferta de formación se cuenta una vez
+por (municipio, programa, nivel) aunque se repita por cargo o por tipo."""
+import pandas as pd
+
+from talento_tic import brechas
+from talento_tic.divipola import Catalogo
+
+CATALOGO = Catalogo([5001, 11001], ['MEDELLÍN', 'BOGOTÁ'])
+
+
+def _formacion(filas):
+    return pd.DataFrame(filas, columns=['Tipo', 'Cargo u oficio por entrevistados', 'NIVEL', 'PROGRAMA',
+                                        'MUNICIPIO', 'TOTAL_MATRICULADOS_2018'])
+
+
+def _cargos():
+    return pd.DataFrame({
+        'ID_CARGO': [1, 2, 3],
+        'Cargo_identificado': ['ANALISTA DE DATOS', 'ANALISTA DE DATOS', 'DESARROLLADOR'],
+        'Municipio': ['MEDELLÍN', 'MEDELLÍN', 'BOGOTÁ'],
+        'programas_formar_ocupación': ['INGENIERÍA INFORMÁTICA', 'INGENIERÍA DE SISTEMAS', 'INGENIERÍA DE SISTEMAS'],
+    })
+
+
+def test_programas_unidos_suman_su_oferta():
+    # 'INGENIERÍA EN INFORMÁTICA' y 'INGENIERÍA INFORMÁTICA' se unen en un código
+    df_formacion = _formacion([
+        ('CRÍTICO', 'ANALISTA DE DATOS', 'UNIVERSITARIO', 'INGENIERÍA INFORMÁTICA', 'MEDELLÍN', 100),
+        ('ALTA ROTACIÓN', 'ANALISTA DE DATOS', 'UNIVERSITARIO', 'INGENIERÍA INFORMÁTICA', 'MEDELLÍN', 100),
+        ('CRÍTICO', 'DESARROLLADOR', 'UNIVERSITARIO', 'INGENIERÍA INFORMÁTICA', 'MEDELLÍN', 100),
+        ('CRÍTICO', 'ANALISTA DE DATOS', 'UNIVERSITARIO', 'INGENIERÍA EN INFORMÁTICA', 'MEDELLÍN', 40),
+        ('CRÍTICO', 'DESARROLLADOR', 'TECNÓLOGO', 'INGENIERÍA DE SISTEMAS', 'BOGOTÁ', 7),
+    ])
+    df = brechas.brechas_por_programa(_cargos(), df_formacion, CATALOGO).set_index(['MUNICIPIO', 'PROGRAMA'])
+    assert df.loc[('MEDELLÍN', 'INGENIERÍA INFORMÁTICA'), 'Matriculados_2018'] == 140
+    assert df.loc[('MEDELLÍN', 'INGENIERÍA INFORMÁTICA'), 'Cargos_demandados'] == 1
+    assert df.loc[('BOGOTÁ', 'INGENIERÍA DE SISTEMAS'), 'Matriculados_2018'] == 7
+    assert df.loc[('MEDELLÍN', 'INGENIERÍA DE SISTEMAS'), 'Matriculados_2018'] == 0
+
+
+def test_brechas_por_cargo():
+    df_formacion = _formacion([
+        ('CRÍTICO', 'ANALISTA DE DATOS', 'UNIVERSITARIO', 'INGENIERÍA INFORMÁTICA', 'MEDELLÍN', 100),
+        ('ALTA ROTACIÓN', 'ANALISTA DE DATOS', 'UNIVERSITARIO', 'INGENIERÍA INFORMÁTICA', 'MEDELLÍN', 100),
+        ('CRÍTICO', 'ANALISTA DE DATOS', 'TECNÓLOGO', 'INGENIERÍA INFORMÁTICA', 'MEDELLÍN', 30),
+        ('CRÍTICO', 'Analista de Datos', 'UNIVERSITARIO', 'INGENIERÍA DE SISTEMAS', 'MEDELLÍN', 20),
+    ])
+    df = brechas.brechas_por_cargo(_cargos(), df_formacion, CATALOGO).set_index(['MUNICIPIO', 'CARGO'])
+    fila = df.loc[('MEDELLÍN', 'ANALISTA DE DATOS')]
+    assert (fila['Cargos_demandados'], fila['Matriculados_2018'], fila['Brecha']) == (2, 150, -148)
+    assert df.loc[('BOGOTÁ', 'DESARROLLADOR'), 'Matriculados_2018'] == 0
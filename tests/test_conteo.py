@@ -0,0 +1,79 @@
+"""Conteo de distintos por grupo: los métodos exactos deben coincidir con
+``nunique`` y HyperLogLog debe quedar dentro de su error esperado."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from talento_tic.conteo import HyperLogLog, contar_distintos
+
+
+@pytest.fixture
+def cargos():
+    rng = np.random.default_rng(0)
+    filas = 20_000
+    return pd.DataFrame({
+        'Municipio': pd.Categorical(rng.choice(['BOGOTÁ', 'CALI', 'MEDELLÍN', None], filas, p=[0.5, 0.3, 0.15, 0.05])),
+        'Nivel': rng.choice(['PROFESIONAL', 'TÉCNICO', 'TECNÓLOGO'], filas),
+        'ID_CARGO': rng.integers(0, 5_000, filas),
+    })
+
+
+def _esperado(df, por, columna='ID_CARGO'):
+    return df.groupby(por, observed=True)[columna].nunique().rename(columna).reset_index()
+
+
+def _ordenado(df, por):
+    df = df.astype({columna: str for columna in por})
+    return df.sort_values(por, ignore_index=True)
+
+
+@pytest.mark.parametrize('metodo', ['orden', 'mapa_bits', 'auto'])
+@pytest.mark.parametrize('por', [['Municipio'], ['Municipio', 'Nivel']])
+def test_exactos_coinciden_con_nunique(cargos, metodo, por):
+    resultado = contar_distintos(cargos, por, metodo=metodo)
+    pd.testing.assert_frame_equal(_ordenado(resultado, por), _ordenado(_esperado(cargos, por), por),
+                                  check_dtype=False)
+
+
+def test_sin_grupos_vacios_ni_nulos(cargos):
+    resultado = contar_distintos(cargos.iloc[:0], 'Municipio', nombre='n')
+    assert list(resultado.columns) == ['Municipio', 'n']
+    assert len(resultado) == 0
+    assert contar_distintos(cargos, 'Municipio')['Municipio'].notna().all()
+
+
+def test_metodo_desconocido(cargos):
+    with pytest.raises(ValueError):
+        contar_distintos(cargos, 'Municipio', metodo='otro')
+
+
+def test_aproximado_dentro_del_error():
+    # Error estándar de HyperLogLog: 1.04 / sqrt(2^precision), ~1.6 % con 12 bits
+    rng = np.random.default_rng(1)
+    grupos = np.repeat(np.arange(200), rng.integers(1, 3_000, 200))
+    df = pd.DataFrame({'grupo': grupos, 'ID_CARGO': rng.integers(0, 10**9, len(grupos))})
+    aproximado = contar_distintos(df, 'grupo', metodo='aproximado').set_index('grupo')['ID_CARGO']
+    exacto = df.groupby('grupo')['ID_CARGO'].nunique()
+    error = (aproximado.astype(float) / exacto - 1).abs()
+    assert error.max() < 5 * 1.04 / np.sqrt(4096)
+    assert error.mean() < 1.04 / np.sqrt(4096)
+    # Los grupos pequeños quedan en la zona del conteo lineal, casi exacta
+    assert (error[exacto < 200] < 0.02).all()
+
+
+def test_aproximado_coincide_con_contador():
+    rng = np.random.default_rng(2)
+    df = pd.DataFrame({'grupo': rng.integers(0, 3, 30_000), 'ID_CARGO': rng.integers(0, 50_000, 30_000)})
+    resultado = contar_distintos(df, 'grupo', metodo='aproximado', precision=10).set_index('grupo')['ID_CARGO']
+    for grupo, valores in df.groupby('grupo')['ID_CARGO']:
+        assert resultado[grupo] == HyperLogLog(10).agregar(valores.to_numpy()).estimar()
+
+
+def test_contadores_combinables():
+    rng = np.random.default_rng(3)
+    valores = rng.integers(0, 10**9, 50_000)
+    completo = HyperLogLog().agregar(valores)
+    partes = HyperLogLog().agregar(valores[:20_000]).combinar(HyperLogLog().agregar(valores[20_000:]))
+    assert partes.estimar() == completo.estimar()
+    with pytest.raises(ValueError):
+        HyperLogLog(10).combinar(HyperLogLog(12))
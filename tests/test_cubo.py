@@ -0,0 +1,93 @@
+"""Cubo de demanda: las consultas filtradas deben dar los mismos totales que un
+``groupby`` de pandas sobre las filas de perfiles."""
+import pandas as pd
+import pytest
+
+from talento_tic import fuentes
+from talento_tic.cubo import CARGO, MUNICIPIO, NIVEL, TIPO, Cubo, construir_cubo
+from talento_tic.modelo import ModeloPerfiles, normalizar_perfiles
+
+
+@pytest.fixture(scope='module')
+def perfiles():
+    return fuentes.leer_csv(fuentes.ARCHIVO_PERFILES)
+
+
+@pytest.fixture(scope='module')
+def cubo(perfiles):
+    return construir_cubo(normalizar_perfiles(perfiles))
+
+
+def _filtrar(df, filtros):
+    for dimension, valores in filtros.items():
+        df = df[df[dimension].isin(valores)]
+    return df
+
+
+def _cargos_distintos(df, por):
+    return df.groupby(por, observed=True)['ID_CARGO'].nunique()
+
+
+def _serie(df, por, nombre):
+    return df.set_index(por)[nombre].astype('int64').sort_index()
+
+
+def _filtros(perfiles):
+    niveles = perfiles[NIVEL].value_counts().index[:2].tolist()
+    municipios = perfiles[MUNICIPIO].value_counts().index[:3].tolist()
+    tipo = perfiles[TIPO].value_counts().index[0]
+    return [
+        {},
+        {NIVEL: niveles[:1]},
+        {NIVEL: niveles, MUNICIPIO: municipios},
+        {TIPO: [tipo]},
+        {TIPO: [tipo], NIVEL: niveles[:1], MUNICIPIO: municipios[:1]},
+    ]
+
+
+@pytest.mark.parametrize('numero', range(5))
+@pytest.mark.parametrize('por', [[CARGO], [MUNICIPIO], [MUNICIPIO, CARGO]])
+def test_cargos_coinciden_con_groupby(perfiles, cubo, numero, por):
+    filtros = _filtros(perfiles)[numero]
+    resultado = cubo.consultar(por, filtros=filtros, nombre='cargos')
+    esperado = _cargos_distintos(_filtrar(perfiles, filtros), por).rename('cargos').astype('int64')
+    pd.testing.assert_series_equal(_serie(resultado, por, 'cargos'), esperado.sort_index(),
+                                   check_index_type=False, check_categorical=False)
+
+
+def test_cargos_por_tipo_cuentan_cada_cargo_una_vez(perfiles, cubo):
+    # Un cargo con varias competencias del mismo tipo cuenta una vez en ese tipo
+    resultado = cubo.consultar([MUNICIPIO, TIPO], nombre='cargos')
+    esperado = _cargos_distintos(perfiles, [MUNICIPIO, TIPO]).rename('cargos').astype('int64')
+    pd.testing.assert_series_equal(_serie(resultado, [MUNICIPIO, TIPO], 'cargos'), esperado.sort_index(),
+                                   check_index_type=False, check_categorical=False)
+    assert cubo.consultar(filtros={TIPO: list(cubo.etiquetas[TIPO])}) == perfiles['ID_CARGO'].nunique()
+
+
+def test_no_suma_cargos_sobre_varios_tipos():
+    cargos = pd.DataFrame({'ID_CARGO': [1, 2], MUNICIPIO: ['CALI', 'CALI'], CARGO: ['A', 'B'], NIVEL: ['X', 'X']})
+    enlace = pd.DataFrame({'ID_CARGO': [1, 1, 2], 'Competencias': ['p', 'q', 'r'], TIPO: ['DURAS', 'BLANDAS', 'OTRAS']})
+    cubo = construir_cubo(ModeloPerfiles(cargos=cargos, cargo_competencia=enlace))
+    with pytest.raises(ValueError):
+        cubo.consultar(CARGO, filtros={TIPO: ['DURAS', 'BLANDAS']})
+    # Con todos los tipos equivale a no filtrar: el cargo 1 cuenta una vez
+    assert cubo.consultar(filtros={TIPO: ['DURAS', 'BLANDAS', 'OTRAS']}) == 2
+    assert cubo.consultar(TIPO, nombre='cargos')['cargos'].sum() == 3
+
+
+def test_competencias_coinciden_con_enlace(perfiles, cubo):
+    enlace = normalizar_perfiles(perfiles).cargo_competencia
+    cargos = perfiles.drop_duplicates('ID_CARGO').set_index('ID_CARGO')[[NIVEL]]
+    filas = enlace.join(cargos, on='ID_CARGO')
+    resultado = cubo.consultar([NIVEL, TIPO], medida='competencias', nombre='filas')
+    esperado = filas.groupby([NIVEL, TIPO], observed=True).size().rename('filas').astype('int64')
+    pd.testing.assert_series_equal(_serie(resultado, [NIVEL, TIPO], 'filas'), esperado.sort_index(),
+                                   check_index_type=False, check_categorical=False)
+
+
+def test_guardar_y_abrir(perfiles, cubo, tmp_path):
+    cubo.guardar(str(tmp_path / 'cubo'))
+    abierto = Cubo.abrir(str(tmp_path / 'cubo'))
+    filtros = _filtros(perfiles)[4]
+    pd.testing.assert_frame_equal(abierto.consultar(CARGO, filtros=filtros), cubo.consultar(CARGO, filtros=filtros),
+                                  check_categorical=False)
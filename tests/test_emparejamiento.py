@@ -0,0 +1,66 @@
+"""Emparejamiento de nombres: se toleran tildes, conectores y erratas de una
+letra, pero nombres distintos no se unifican."""
+import pandas as pd
+import pytest
+
+from talento_tic.divipola import Catalogo
+from talento_tic.emparejamiento import Emparejador, clave_canonica, unificar
+
+
+def _emparejar(referencia, nombres):
+    emparejador = Emparejador(referencia)
+    posiciones = emparejador.emparejar(pd.Series(nombres))
+    return [referencia[p] if p >= 0 else None for p in posiciones]
+
+
+@pytest.mark.parametrize('nombre, esperado', [
+    ('Ingeniería en Informática', 'INGENIERÍA INFORMÁTICA'),
+    ('INGENIERIA INFORMATICA', 'INGENIERÍA INFORMÁTICA'),
+    ('ASISITENTE EN ROBÓTICA', 'ASISTENTE EN ROBÓTICA'),
+    ('TECNOLOGÍA DE DESARROLLO DE SOFTWARE', 'TECNOLOGÍA EN DESARROLLO DE SOFTWARE'),
+    ('Medellin', 'MEDELLÍN'),
+])
+def test_empareja_variantes(nombre, esperado):
+    referencia = ['INGENIERÍA INFORMÁTICA', 'ASISTENTE EN ROBÓTICA', 'TECNOLOGÍA EN DESARROLLO DE SOFTWARE',
+                  'MEDELLÍN', 'INGENIERÍA ELECTRÓNICA']
+    assert _emparejar(referencia, [nombre]) == [esperado]
+
+
+@pytest.mark.parametrize('nombre', [
+    'INGENIERÍA ELÉCTRICA',
+    'TECNOLOGÍA EN ELECTRICIDAD',
+    'INGENIERÍA ELECTRÓNICA Y TELECOMUNICACIONES',
+])
+def test_no_une_programas_distintos(nombre):
+    referencia = ['INGENIERÍA ELECTRÓNICA', 'TECNOLOGÍA EN ELECTRÓNICA']
+    assert _emparejar(referencia, [nombre]) == [None]
+
+
+def test_no_une_palabras_del_vocabulario():
+    # 'ELÉCTRICA' está a dos ediciones de 'ELECTRÓNICA', pero 'INFORMÁTICO'
+    # está a una de 'INFORMÁTICA': al ser palabra conocida no es una errata
+    referencia = ['INGENIERÍA INFORMÁTICA', 'TÉCNICO INFORMÁTICO']
+    assert _emparejar(referencia, ['INGENIERÍA INFORMÁTICO']) == [None]
+
+
+def test_unificar_separa_electrica_y_electronica():
+    nombres, (demanda, oferta) = unificar(
+        pd.Series(['INGENIERÍA ELECTRÓNICA', 'INGENIERÍA ELÉCTRICA']),
+        pd.Series(['TECNOLOGÍA EN ELECTRICIDAD', 'Ingenieria Electronica', 'INGENIERIA ELECTRICA']),
+    )
+    assert len(set(demanda)) == 2
+    assert oferta[1] == demanda[0]
+    assert oferta[2] == demanda[1]
+    assert oferta[0] not in demanda
+    assert len(nombres) == 3
+
+
+def test_catalogo_no_completa_municipios():
+    catalogo = Catalogo([68679, 99624, 5001], ['SANTA ROSA', 'SANTA ROSALÍA', 'MEDELLÍN'])
+    codigos = catalogo.codificar(pd.Series(['SANTA ROSAL', 'Santa Rosalia', 'MEDELIN', 'MEDELLLIN', None]))
+    assert codigos.tolist() == [-1, 99624, 5001, 5001, -1]
+
+
+def test_clave_canonica():
+    assert clave_canonica('Ingeniería en Informática') == 'INGENIERIA INFORMATICA'
+    assert clave_canonica('BOGOTÁ, D.C.') == 'BOGOTA D C'
@@ -0,0 +1,138 @@
+"""Ingesta incremental: el acumulado por marcas de bytes debe coincidir con
+recalcular todo el archivo desde cero."""
+import pandas as pd
+import pytest
+
+from talento_tic import fuentes, incremental, snapshot
+from talento_tic.indice import construir_indice
+from talento_tic.modelo import normalizar_perfiles
+
+PERFILES = fuentes.ARCHIVO_PERFILES
+GRADUADOS = fuentes.ARCHIVO_GRADUADOS
+
+
+@pytest.fixture
+def lineas_perfiles():
+    with open(fuentes.ruta(PERFILES), encoding='utf-8') as f:
+        return f.read().splitlines(keepends=True)[:3001]
+
+
+@pytest.fixture
+def directorio(tmp_path, monkeypatch):
+    monkeypatch.setattr(snapshot, 'DIRECTORIO_SNAPSHOT', None)
+    return tmp_path
+
+
+def _escribir(directorio, archivo, texto):
+    with open(directorio / archivo, 'w', encoding='utf-8') as f:
+        f.write(texto)
+
+
+def _agregar(directorio, archivo, texto):
+    with open(directorio / archivo, 'a', encoding='utf-8') as f:
+        f.write(texto)
+
+
+def _tablas(modelo):
+    """Tablas del modelo en un orden y con tipos comparables."""
+    cargos = modelo.cargos.astype({c: str for c in modelo.cargos.columns if c not in ('ID_CARGO', 'n_competencias')})
+    cargos = cargos.astype({'ID_CARGO': 'int64', 'n_competencias': 'int64'})
+    conteo = modelo.conteo_competencias.astype({'Competencias': str, 'Tipo_de_Competencia': str, 'filas': 'int64'})
+    frecuencias = modelo.indice.frecuencias()
+    frecuencias.index = frecuencias.index.astype(str)
+    return (cargos.sort_values('ID_CARGO', ignore_index=True),
+            conteo.sort_values(['Competencias', 'Tipo_de_Competencia'], ignore_index=True),
+            frecuencias.sort_index().astype('int64'))
+
+
+def _recalcular(tmp_path, texto):
+    """Modelo de perfiles calculado desde cero sobre ``texto``."""
+    completo = tmp_path / 'completo'
+    completo.mkdir(exist_ok=True)
+    _escribir(completo, PERFILES, texto)
+    modelo = normalizar_perfiles(fuentes.leer_csv(PERFILES, str(completo)))
+    modelo.competencias()
+    modelo.indice = construir_indice(modelo)
+    return modelo
+
+
+def _comparar(modelo, esperado):
+    for tabla, tabla_esperada in zip(_tablas(modelo), _tablas(esperado)):
+        if isinstance(tabla, pd.Series):
+            pd.testing.assert_series_equal(tabla, tabla_esperada, check_names=False)
+        else:
+            pd.testing.assert_frame_equal(tabla, tabla_esperada, check_like=True)
+
+
+def _fuente(directorio):
+    return incremental.FuenteIncremental(PERFILES, incremental.AcumuladorPerfiles, str(directorio), filas_por_bloque=700)
+
+
+def test_sin_cambios(directorio, tmp_path, lineas_perfiles):
+    _escribir(directorio, PERFILES, ''.join(lineas_perfiles))
+    acumulador, nuevas = _fuente(directorio).actualizar()
+    assert nuevas == len(lineas_perfiles) - 1
+
+    acumulador, nuevas = _fuente(directorio).actualizar()
+    assert nuevas == 0
+    _comparar(acumulador.resultado(), _recalcular(tmp_path, ''.join(lineas_perfiles)))
+
+
+def test_filas_agregadas(directorio, tmp_path, lineas_perfiles):
+    _escribir(directorio, PERFILES, ''.join(lineas_perfiles[:1201]))
+    _fuente(directorio).actualizar()
+
+    _agregar(directorio, PERFILES, ''.join(lineas_perfiles[1201:]))
+    acumulador, nuevas = _fuente(directorio).actualizar()
+    assert nuevas == len(lineas_perfiles) - 1201
+    _comparar(acumulador.resultado(), _recalcular(tmp_path, ''.join(lineas_perfiles)))
+
+
+def test_linea_final_incompleta(directorio, tmp_path, lineas_perfiles):
+    _escribir(directorio, PERFILES, ''.join(lineas_perfiles[:1201]))
+    _fuente(directorio).actualizar()
+
+    # La última línea a medio escribir se deja para la próxima lectura
+    ultima = lineas_perfiles[1201]
+    _agregar(directorio, PERFILES, ''.join(lineas_perfiles[1202:]) + ultima[:len(ultima) // 2])
+    acumulador, nuevas = _fuente(directorio).actualizar()
+    assert nuevas == len(lineas_perfiles) - 1202
+    _comparar(acumulador.resultado(), _recalcular(tmp_path, ''.join(lineas_perfiles[:1201] + lineas_perfiles[1202:])))
+
+    _agregar(directorio, PERFILES, ultima[len(ultima) // 2:])
+    acumulador, nuevas = _fuente(directorio).actualizar()
+    assert nuevas == 1
+    _comparar(acumulador.resultado(), _recalcular(tmp_path, ''.join(lineas_perfiles[:1201] + lineas_perfiles[1202:] + [ultima])))
+
+
+def test_archivo_truncado(directorio, tmp_path, lineas_perfiles):
+    _escribir(directorio, PERFILES, ''.join(lineas_perfiles))
+    _fuente(directorio).actualizar()
+
+    _escribir(directorio, PERFILES, ''.join(lineas_perfiles[:801]))
+    acumulador, nuevas = _fuente(directorio).actualizar()
+    assert nuevas == 800
+    _comparar(acumulador.resultado(), _recalcular(tmp_path, ''.join(lineas_perfiles[:801])))
+
+
+def test_archivo_reescrito(directorio, tmp_path, lineas_perfiles):
+    _escribir(directorio, PERFILES, ''.join(lineas_perfiles[:1201]))
+    _fuente(directorio).actualizar()
+
+    # Más largo que antes, pero con otras filas antes de la marca
+    texto = ''.join([lineas_perfiles[0]] + lineas_perfiles[1000:])
+    _escribir(directorio, PERFILES, texto)
+    acumulador, nuevas = _fuente(directorio).actualizar()
+    assert nuevas == len(lineas_perfiles) - 1000
+    _comparar(acumulador.resultado(), _recalcular(tmp_path, texto))
+
+
+def test_graduados_filas_agregadas(directorio):
+    with open(fuentes.ruta(GRADUADOS), encoding='utf-8') as f:
+        lineas = f.read().splitlines(keepends=True)
+    _escribir(directorio, GRADUADOS, ''.join(lineas[:4]))
+    incremental.actualizar_graduados(str(directorio))
+
+    _agregar(directorio, GRADUADOS, ''.join(lineas[4:]))
+    pd.testing.assert_frame_equal(incremental.actualizar_graduados(str(directorio)),
+                                  fuentes.leer_csv(GRADUADOS, str(directorio)))
@@ -0,0 +1,93 @@
+"""Índice invertido: el códec varint de diferencias debe ser reversible y las
+búsquedas Y/O deben coincidir con operaciones de conjuntos sobre las filas."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from talento_tic.indice import IndiceCompetencias, codificar_listas, construir_indice, decodificar_lista
+from talento_tic.modelo import ModeloPerfiles
+
+
+def _decodificar_todas(datos, offsets):
+    return [decodificar_lista(datos, offsets[i], offsets[i + 1]).tolist() for i in range(len(offsets) - 1)]
+
+
+@pytest.mark.parametrize('maximo', [100, 2**14, 2**40])
+def test_codec_ida_y_vuelta(maximo):
+    rng = np.random.default_rng(maximo)
+    n_listas = 50
+    listas = [np.unique(rng.integers(0, maximo, rng.integers(0, 40))) for _ in range(n_listas)]
+    # Listas vacías y diferencias justo en el borde de un byte
+    listas[3] = np.zeros(0, dtype=np.int64)
+    listas[7] = np.array([0, 127, 128, 255, 16511, 16512])
+    numeros = np.repeat(np.arange(n_listas), [len(lista) for lista in listas])
+    datos, offsets, conteo = codificar_listas(numeros, np.concatenate(listas), n_listas)
+
+    assert datos.dtype == np.uint8
+    assert conteo.tolist() == [len(lista) for lista in listas]
+    assert _decodificar_todas(datos, offsets) == [lista.tolist() for lista in listas]
+
+
+def test_codec_sin_elementos():
+    datos, offsets, conteo = codificar_listas([], [], 3)
+    assert len(datos) == 0
+    assert _decodificar_todas(datos, offsets) == [[], [], []]
+    assert conteo.tolist() == [0, 0, 0]
+
+
+@pytest.fixture
+def modelo():
+    rng = np.random.default_rng(0)
+    ids = rng.permutation(np.arange(1, 400)) * 7
+    competencias = [f'COMPETENCIA {i}' for i in range(30)]
+    filas = [(cargo, competencia) for cargo in ids
+             for competencia in rng.choice(competencias, rng.integers(1, 8), replace=False)]
+    # Filas repetidas: el índice guarda cada par una sola vez
+    filas += filas[:50]
+    enlace = pd.DataFrame(filas, columns=['ID_CARGO', 'Competencias'])
+    return ModeloPerfiles(cargos=pd.DataFrame({'ID_CARGO': ids}), cargo_competencia=enlace)
+
+
+def _fuerza_bruta(modelo):
+    posicion = {cargo: i for i, cargo in enumerate(modelo.cargos['ID_CARGO'])}
+    cargos = {}
+    for cargo, competencia in modelo.cargo_competencia.itertuples(index=False):
+        cargos.setdefault(competencia, set()).add(posicion[cargo])
+    return cargos
+
+
+def test_buscar_contra_conjuntos(modelo):
+    indice = construir_indice(modelo)
+    cargos = _fuerza_bruta(modelo)
+    rng = np.random.default_rng(1)
+    nombres = sorted(cargos)
+    for _ in range(200):
+        pedidas = list(rng.choice(nombres, rng.integers(1, 4), replace=False))
+        y = set.intersection(*(cargos[c] for c in pedidas))
+        o = set.union(*(cargos[c] for c in pedidas))
+        assert indice.buscar(pedidas).tolist() == sorted(y)
+        assert indice.buscar(pedidas, todas=False).tolist() == sorted(o)
+
+
+def test_buscar_competencia_inexistente(modelo):
+    indice = construir_indice(modelo)
+    assert len(indice.buscar(['NO EXISTE', 'COMPETENCIA 1'])) == 0
+    assert indice.buscar(['NO EXISTE', 'COMPETENCIA 1'], todas=False).tolist() == indice.cargos('COMPETENCIA 1').tolist()
+    assert len(indice.buscar([])) == 0
+
+
+def test_competencias_y_frecuencias(modelo):
+    indice = construir_indice(modelo)
+    cargos = _fuerza_bruta(modelo)
+    for posicion in (0, 17, len(modelo.cargos) - 1):
+        esperadas = sorted(c for c, posiciones in cargos.items() if posicion in posiciones)
+        assert sorted(indice.competencias_de(posicion)) == esperadas
+    assert indice.frecuencias().to_dict() == {c: len(posiciones) for c, posiciones in cargos.items()}
+
+
+def test_guardar_y_abrir(modelo, tmp_path):
+    indice = construir_indice(modelo)
+    indice.guardar(str(tmp_path / 'indice'))
+    abierto = IndiceCompetencias.abrir(str(tmp_path / 'indice'))
+    assert abierto.buscar(['COMPETENCIA 2', 'COMPETENCIA 5']).tolist() == indice.buscar(['COMPETENCIA 2', 'COMPETENCIA 5']).tolist()
+    assert abierto.ids.tolist() == indice.ids.tolist()
@@ -0,0 +1,84 @@
+"""Matriculados: la variación se calcula sobre totales de celdas distintas y
+las tablas parciales se combinan conservando un valor por celda."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from talento_tic import matricula
+from talento_tic.analitica import variacion_matricula
+
+# Formación repite los matriculados de (programa, nivel, municipio) en cada
+# cargo al que forma el programa y, a veces, en cada tipo de cargo
+FILAS = [
+    ('CRÍTICO', 'ANALISTA', 'UNIVERSITARIO', 'SISTEMAS', 'CALI', 100, 150),
+    ('ALTA ROTACIÓN', 'ANALISTA', 'UNIVERSITARIO', 'SISTEMAS', 'CALI', 100, 150),
+    ('CRÍTICO', 'DESARROLLADOR', 'UNIVERSITARIO', 'SISTEMAS', 'CALI', 100, 150),
+    # Celda con base cero
+    ('CRÍTICO', 'ANALISTA', 'TECNÓLOGO', 'REDES', 'CALI', 0, 20),
+    ('CRÍTICO', 'DESARROLLADOR', 'UNIVERSITARIO', 'SOFTWARE', 'BOGOTÁ', 50, 40),
+]
+
+
+@pytest.fixture
+def formacion():
+    return pd.DataFrame(FILAS, columns=['Tipo', matricula.CARGO, matricula.NIVEL, matricula.PROGRAMA,
+                                        matricula.MUNICIPIO, 'TOTAL_MATRICULADOS_2017', 'TOTAL_MATRICULADOS_2018'])
+
+
+def _por(df, columna):
+    return df.astype({columna: str}).set_index(columna)
+
+
+def test_variacion_ponderada(formacion):
+    sumas = matricula.sumas_matricula(formacion)
+    assert len(sumas) == 4
+
+    # ANALISTA: 100 + 0 → 150 + 20; DESARROLLADOR: 100 + 50 → 150 + 40
+    por_cargo = _por(matricula.variacion(sumas, matricula.CARGO), matricula.CARGO)
+    assert por_cargo.loc['ANALISTA', 'TOTAL_MATRICULADOS_2017'] == 100
+    assert por_cargo.loc['ANALISTA', 'VARIACION_PORCENTUAL_2018_2017'] == pytest.approx(0.70)
+    assert por_cargo.loc['DESARROLLADOR', 'VARIACION_PORCENTUAL_2018_2017'] == pytest.approx(40 / 150)
+
+    # Sin el cargo, SISTEMAS-CALI cuenta una vez: 100 + 0 + 50 → 150 + 20 + 40
+    total = matricula.variacion(sumas)
+    assert total['TOTAL_MATRICULADOS_2017'].iloc[0] == 150
+    assert total['TOTAL_MATRICULADOS_2018'].iloc[0] == 210
+    assert total['VARIACION_PORCENTUAL_2018_2017'].iloc[0] == pytest.approx(0.4)
+
+
+def test_base_cero_no_tiene_variacion(formacion):
+    por_programa = _por(matricula.variacion(matricula.sumas_matricula(formacion), matricula.PROGRAMA),
+                        matricula.PROGRAMA)
+    assert np.isnan(por_programa.loc['REDES', 'VARIACION_PORCENTUAL_2018_2017'])
+    assert por_programa.loc['SISTEMAS', 'VARIACION_PORCENTUAL_2018_2017'] == pytest.approx(0.5)
+    assert por_programa.loc['SOFTWARE', 'VARIACION_PORCENTUAL_2018_2017'] == pytest.approx(-0.2)
+
+
+def test_variacion_matricula_del_tablero(formacion):
+    df, total = variacion_matricula(formacion)
+    df = _por(df, matricula.CARGO)
+    assert df.loc['ANALISTA', 'VARIACION_PORCENTUAL_2018_2017'] == 70.0
+    assert df.loc['DESARROLLADOR', 'VARIACION_PORCENTUAL_2018_2017'] == 26.7
+    assert total == 40.0
+
+
+def _ordenar(df):
+    df = df.astype({d: str for d in matricula.DIMENSIONES})
+    return df.sort_values(list(matricula.DIMENSIONES), ignore_index=True)
+
+
+def test_combinar_partes(formacion):
+    completo = matricula.sumas_matricula(formacion)
+    # Partes que comparten la celda SISTEMAS-CALI-ANALISTA
+    partes = matricula.combinar(matricula.sumas_matricula(formacion.iloc[:2]),
+                                matricula.sumas_matricula(formacion.iloc[1:]))
+    pd.testing.assert_frame_equal(_ordenar(partes), _ordenar(completo), check_dtype=False)
+
+
+def test_combinar_anios(formacion):
+    completo = matricula.sumas_matricula(formacion)
+    anio_2017 = matricula.sumas_matricula(formacion.drop(columns='TOTAL_MATRICULADOS_2018'))
+    anio_2018 = matricula.sumas_matricula(formacion.drop(columns='TOTAL_MATRICULADOS_2017'))
+    combinado = matricula.combinar(anio_2017, anio_2018)
+    assert matricula.anios(combinado) == [2017, 2018]
+    pd.testing.assert_frame_equal(_ordenar(combinado), _ordenar(completo), check_dtype=False)
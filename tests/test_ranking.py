@@ -0,0 +1,76 @@
+"""Top-K por grupo: debe coincidir con ``nlargest(keep='first')`` por grupo,
+también con empates en el corte y con grupos de menos de K filas."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from talento_tic.analitica import filtrar_top_municipios, top_k_por_municipio
+from talento_tic.ranking import K_MAX, rango_por_grupo, recortar_top, top_k_por_grupo
+
+
+def _nlargest(df, grupo, valor, k):
+    partes = [filas.nlargest(k, valor, keep='first') for _, filas in df.groupby(grupo, sort=True)]
+    return pd.concat(partes, ignore_index=True)
+
+
+@pytest.fixture
+def demanda():
+    rng = np.random.default_rng(0)
+    filas = 2_000
+    # Pocos valores distintos para que haya muchos empates
+    return pd.DataFrame({
+        'Municipio': rng.choice([f'M{i:02d}' for i in range(40)], filas),
+        'Cargo_identificado': [f'C{i}' for i in range(filas)],
+        'ID_CARGO': rng.integers(1, 6, filas),
+    })
+
+
+@pytest.mark.parametrize('k', [1, 3, K_MAX, K_MAX + 5])
+def test_coincide_con_nlargest(demanda, k):
+    resultado = top_k_por_grupo(demanda, 'Municipio', 'ID_CARGO', k)
+    esperado = _nlargest(demanda, 'Municipio', 'ID_CARGO', k)
+    pd.testing.assert_frame_equal(resultado.drop(columns='rango'), esperado)
+
+
+def test_empates_en_el_corte():
+    df = pd.DataFrame({'grupo': ['A'] * 5, 'nombre': list('pqrst'), 'valor': [3, 5, 3, 3, 1]})
+    resultado = top_k_por_grupo(df, 'grupo', 'valor', k=2)
+    # De los tres empatados en 3 queda el primero en el orden original
+    assert resultado['nombre'].tolist() == ['q', 'p']
+    assert resultado['rango'].tolist() == [1, 2]
+
+
+def test_grupos_con_menos_de_k_filas():
+    df = pd.DataFrame({'grupo': ['A', 'B', 'B', 'C', 'C', 'C'], 'valor': [1, 2, 9, 4, 4, 7]})
+    resultado = top_k_por_grupo(df, 'grupo', 'valor', k=K_MAX)
+    assert resultado.groupby('grupo').size().to_dict() == {'A': 1, 'B': 2, 'C': 3}
+    assert resultado['rango'].tolist() == [1, 1, 2, 1, 2, 3]
+    assert resultado['valor'].tolist() == [1, 9, 2, 7, 4, 4]
+
+
+def test_sin_filas():
+    df = pd.DataFrame({'grupo': pd.Series([], dtype=str), 'valor': pd.Series([], dtype=float)})
+    orden, rango = rango_por_grupo(df, 'grupo', 'valor')
+    assert len(orden) == len(rango) == 0
+    assert len(top_k_por_grupo(df, 'grupo', 'valor')) == 0
+
+
+@pytest.mark.parametrize('k', [1, 4, K_MAX])
+def test_recortar_equivale_a_calcular_con_k(demanda, k):
+    precalculado = top_k_por_municipio(demanda)
+    pd.testing.assert_frame_equal(recortar_top(precalculado, k).reset_index(drop=True),
+                                  top_k_por_municipio(demanda, k))
+
+
+def test_recortar_con_k_mayor_que_k_max(demanda):
+    # El top precalculado solo llega a K_MAX: pedir más devuelve todo lo precalculado
+    precalculado = top_k_por_municipio(demanda)
+    assert recortar_top(precalculado, K_MAX + 5).equals(precalculado)
+    assert precalculado['rango'].max() == K_MAX
+
+
+def test_filtrar_municipios(demanda):
+    precalculado = top_k_por_municipio(demanda)
+    resultado = filtrar_top_municipios(precalculado, 3, ['M01', 'M02'])
+    assert set(resultado['Municipio']) == {'M01', 'M02'}
+    assert resultado.groupby('Municipio').size().tolist() == [3, 3]
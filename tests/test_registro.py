@@ -0,0 +1,101 @@
+"""Registro de versiones: la versión de una fuente depende solo de su
+contenido, también cuando el archivo crece o se reescribe en el mismo inodo."""
+import os
+
+import pytest
+
+from talento_tic import divipola, fuentes, registro, snapshot
+
+PERFILES = fuentes.ARCHIVO_PERFILES
+
+
+@pytest.fixture
+def directorio(tmp_path, monkeypatch):
+    monkeypatch.setattr(snapshot, 'DIRECTORIO_SNAPSHOT', None)
+    # Bloques pequeños para que los archivos de prueba tengan varios
+    monkeypatch.setattr(registro, 'TAMANO_BLOQUE', 64)
+    datos = tmp_path / 'datos'
+    datos.mkdir()
+    return datos
+
+
+def _lineas(n, desde=0):
+    return ''.join(f'{i},CARGO {i},MUNICIPIO {i % 7}\n' for i in range(desde, desde + n))
+
+
+def _version(directorio, archivo=PERFILES):
+    return registro.version_fuente(archivo, str(directorio))
+
+
+def _version_de_copia(tmp_path, directorio, nombre='copia'):
+    """Versión de un archivo nuevo (otro inodo, sin registro) con el mismo contenido."""
+    copia = tmp_path / nombre
+    copia.mkdir()
+    (copia / PERFILES).write_bytes((directorio / PERFILES).read_bytes())
+    return _version(copia)
+
+
+def test_misma_version_con_mismo_contenido(directorio, tmp_path):
+    (directorio / PERFILES).write_text(_lineas(50), encoding='utf-8')
+    version = _version(directorio)
+    assert _version(directorio) == version
+    # Volver a guardar lo mismo cambia la fecha pero no la versión
+    (directorio / PERFILES).write_text(_lineas(50), encoding='utf-8')
+    assert _version(directorio) == version
+    assert _version_de_copia(tmp_path, directorio) == version
+
+
+def test_filas_agregadas(directorio, tmp_path):
+    (directorio / PERFILES).write_text(_lineas(50), encoding='utf-8')
+    antes = _version(directorio)
+    with open(directorio / PERFILES, 'a', encoding='utf-8') as f:
+        f.write(_lineas(20, desde=50))
+    despues = _version(directorio)
+    assert despues != antes
+    assert despues == _version_de_copia(tmp_path, directorio)
+
+
+def test_bloque_reescrito_y_filas_agregadas(directorio, tmp_path):
+    (directorio / PERFILES).write_text(_lineas(50), encoding='utf-8')
+    _version(directorio)
+    inodo = os.stat(directorio / PERFILES).st_ino
+
+    # Se reescribe un byte del primer bloque en el mismo inodo y luego se agregan filas
+    with open(directorio / PERFILES, 'r+b') as f:
+        f.seek(10)
+        original = f.read(1)
+        f.seek(10)
+        f.write(b'X' if original != b'X' else b'Y')
+    with open(directorio / PERFILES, 'a', encoding='utf-8') as f:
+        f.write(_lineas(20, desde=50))
+    assert os.stat(directorio / PERFILES).st_ino == inodo
+
+    solo_agregadas = tmp_path / 'solo_agregadas'
+    solo_agregadas.mkdir()
+    (solo_agregadas / PERFILES).write_text(_lineas(70), encoding='utf-8')
+    assert _version(directorio) != _version(solo_agregadas)
+    assert _version(directorio) == _version_de_copia(tmp_path, directorio)
+
+
+def test_registro_persistente(directorio):
+    (directorio / PERFILES).write_text(_lineas(50), encoding='utf-8')
+    version = _version(directorio)
+    # Otro proceso (sin la memoria de este) toma la versión del registro en disco
+    registro._memoria.clear()
+    assert _version(directorio) == version
+    assert os.path.exists(os.path.join(snapshot.directorio_snapshot(str(directorio)), registro.ARCHIVO_REGISTRO))
+
+
+def test_divipola_ausente(directorio, monkeypatch):
+    monkeypatch.delenv('TALENTO_TIC_DIVIPOLA', raising=False)
+    assert _version(directorio, divipola.ARCHIVO_DIVIPOLA) == registro.AUSENTE
+    with pytest.raises(FileNotFoundError):
+        _version(directorio, fuentes.ARCHIVO_GRADUADOS)
+
+
+def test_version_de_solo_depende_de_sus_fuentes():
+    versiones = {'a.csv': '1', 'b.csv': '2'}
+    version = registro.version_de(versiones, ['a.csv'])
+    assert registro.version_de({**versiones, 'b.csv': '3'}, ['a.csv']) == version
+    assert registro.version_de({**versiones, 'a.csv': '4'}, ['a.csv']) != version
+    assert registro.version_de(versiones, ['a.csv'], 'incremental') != version